@@ -84,8 +84,6 @@ class Config:
     only be interesting for 'advanced' use cases.
     """
 
-    __pattern_cache = {}
-
     def __init__(self, command_line_args=None, conf_file=None, defaults=None,
                  json_conf=None):
         """
@@ -116,6 +114,23 @@ class Config:
         self.__invoke_dir = os.getcwd()
         self.__cli = command_line_args or {}
         self.__defaults = defaults or {}
+        self.__pattern_cache = {}
+
+    def reload(self):
+        """
+        Returns a new `Config` with the same command line arguments and
+        defaults, reading the configuration file and expanding the
+        source patterns again.
+        """
+        return self.for_conf_file(self.conf_file)
+
+    def for_conf_file(self, conf_file):
+        """
+        Returns a new `Config` with the same command line arguments and
+        defaults, reading @conf_file.
+        """
+        return Config(command_line_args=self.__cli, conf_file=conf_file,
+                      defaults=self.__defaults)
 
     def __abspath(self, path, from_conf):
         if path is None:
@@ -141,7 +156,7 @@ class Config:
             return OrderedSet()
 
         cache_key = self.__get_key(source_patterns, from_conf)
-        all_files = Config.__pattern_cache.get(cache_key, OrderedSet())
+        all_files = self.__pattern_cache.get(cache_key, OrderedSet())
         if all_files:
             return all_files
 
@@ -156,7 +171,7 @@ class Config:
             else:
                 all_files.add(item)
 
-        Config.__pattern_cache[cache_key] = all_files
+        self.__pattern_cache[cache_key] = all_files
 
         return all_files
 
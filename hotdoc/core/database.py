@@ -69,6 +69,8 @@ class Database:
         self.__aliased = defaultdict(list)
         self.__aliases = OrderedDict()
         self.__private_folder = private_folder or '/tmp'
+        self.__journal = None
+        self.__journal_log_start = 0
 
     def add_comment(self, comment):
         """
@@ -81,6 +83,8 @@ class Database:
             return
 
         self.__comments[comment.name] = comment
+        # Comments may be renamed once added
+        self.__record('comment', comment.name, comment)
         self.comment_added_signal(self, comment)
 
     def get_comment(self, name):
@@ -115,10 +119,8 @@ class Database:
             kwargs['filename'] = os.path.abspath(filename)
 
         if unique_name in self.__symbols and not type_ == ProxySymbol:
-            warn('symbol-redefined', "%s(unique_name=%s, filename=%s, project=%s)"
-                 " has already been defined: %s" % (type_.__name__, unique_name, filename,
-                                                    kwargs.get('project_name'),
-                                                    self.get_symbol(unique_name)))
+            self.__warn_redefined(type_, unique_name, filename,
+                                  kwargs.get('project_name'))
             return None
 
         aliases = kwargs.pop('aliases', [])
@@ -139,6 +141,7 @@ class Database:
 
         if not isinstance(symbol, ProxySymbol):
             self.__symbols[unique_name] = symbol
+            self.__record('symbol', unique_name, symbol, aliases)
         self.__aliased[unique_name].extend(aliases)
 
         for alias in self.__aliased[unique_name]:
@@ -146,6 +149,12 @@ class Database:
 
         return symbol
 
+    def __warn_redefined(self, type_, unique_name, filename, project_name):
+        warn('symbol-redefined', "%s(unique_name=%s, filename=%s, project=%s)"
+             " has already been defined: %s" % (type_.__name__, unique_name, filename,
+                                                project_name,
+                                                self.get_symbol(unique_name)))
+
     def rename_symbol(self, unique_name, target):
         sym = self.__symbols.get(target)
         if sym:
@@ -156,10 +165,94 @@ class Database:
             sym.unique_name = unique_name
             del self.__symbols[target]
             self.__symbols[unique_name] = sym
+            self.__record('rename', unique_name, target)
             debug('Renamed symbol with unique name %s to %s' %
                   (target, unique_name))
         return sym
 
+    def __record(self, *change):
+        if self.__journal is not None:
+            self.__journal.append(
+                (len(Logger.journal) - self.__journal_log_start,) + change)
+
+    def start_journal(self):
+        """
+        Starts recording the comments and symbols added to the database,
+        as well as the symbol renames, see `Database.merge_journal`.
+        """
+        self.__journal = []
+        self.__journal_log_start = len(Logger.journal)
+
+    def stop_journal(self):
+        """
+        Stops recording changes.
+
+        Returns:
+            list: the changes recorded since `Database.start_journal`
+                was called.
+        """
+        journal, self.__journal = self.__journal, None
+        return journal
+
+    def merge_journal(self, journal, log_entries=()):
+        """
+        Applies changes recorded by `Database.start_journal` in another
+        process, typically a worker setting up a subproject, in the order
+        they were made.
+
+        Symbols that were defined in the meantime are rejected with the
+        same warning `Database.create_symbol` would have emitted.
+
+        Args:
+            journal (list): the changes returned by `Database.stop_journal`
+            log_entries (list): the entries logged while recording, they
+                are added to the `Logger` journal interleaved with the
+                warnings emitted while merging.
+
+        Returns:
+            set: the unique names of the symbols that were rejected.
+        """
+        rejected = set()
+        n_logged = 0
+
+        for change in journal:
+            log_position, kind, args = change[0], change[1], change[2:]
+            Logger.merge_journal(log_entries[n_logged:log_position])
+            n_logged = max(n_logged, log_position)
+
+            if kind == 'comment':
+                name, comment = args
+                self.__comments[name] = comment
+                self.comment_added_signal(self, comment)
+            elif kind == 'symbol':
+                unique_name, symbol, aliases = args
+                if unique_name in self.__symbols:
+                    self.__warn_redefined(type(symbol), unique_name,
+                                          symbol.filename,
+                                          symbol.project_name)
+                    rejected.add(unique_name)
+                    continue
+                self.__symbols[unique_name] = symbol
+                self.__aliased[unique_name].extend(aliases)
+                for alias in self.__aliased[unique_name]:
+                    self.__aliases[alias] = symbol
+            elif kind == 'rename':
+                unique_name, target = args
+                if target in rejected or target not in self.__symbols:
+                    continue
+                sym = self.__symbols.pop(target)
+                # Symbols created before the journal was started were
+                # renamed in the other process only
+                if sym.unique_name == target:
+                    if sym.display_name == target:
+                        sym.display_name = unique_name
+                    sym.unique_name = unique_name
+                self.__symbols[unique_name] = sym
+
+        Logger.merge_journal(log_entries[n_logged:])
+
+        return rejected
+
     @staticmethod
     def __get_pickle_path(folder, name, create_if_required=False):
         fname = os.path.join(folder, name.lstrip('/'))
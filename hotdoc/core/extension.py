@@ -94,13 +94,16 @@ class Extension(Configurable):
         formatter: formatter.Formatter, may be subclassed.
         argument_prefix (str): Short name of this extension, used as a prefix
             to add to automatically generated command-line arguments.
+        parallel_setup (bool): Set this to True if `Extension.setup` can
+            run in a worker process, see
+            `Extension.supports_parallel_setup`.
     """
     # pylint: disable=unused-argument
     extension_name = "base-extension"
     argument_prefix = ''
     paths_arguments = {}
     path_arguments = {}
-    written_out_sitemaps = set()
+    parallel_setup = False
 
     def __init__(self, app, project):
         """Constructor for `Extension`.
@@ -392,6 +395,55 @@ class Extension(Configurable):
         """
         pass
 
+    def finalize(self):
+        """
+        Called when the application is finalized, extension subclasses
+        should implement this to disconnect from the signals that
+        outlive it, such as `inclusions.include_signal`.
+        """
+        pass
+
+    def supports_parallel_setup(self):
+        """
+        Override this to tell whether `Extension.setup` can be run in a
+        worker process, when setting up subprojects in parallel.
+
+        This is only possible if everything `Extension.setup` produces
+        ends up either in the `database.Database`, in the pages returned
+        by `Extension.make_pages`, or in the state returned by
+        `Extension.get_setup_state`.
+
+        The default implementation returns `Extension.parallel_setup`,
+        or True if `Extension.setup` is not overriden.
+
+        Returns:
+            bool: Whether setup can run in a worker process.
+        """
+        # pylint: disable=comparison-with-callable
+        return self.parallel_setup or type(self).setup == Extension.setup
+
+    def get_setup_state(self):
+        """
+        Override this to return the state, which must be picklable, that
+        `Extension.restore_setup` needs once `Extension.setup` has run in
+        a worker process.
+        """
+        return None
+
+    def restore_setup(self, state):
+        """
+        Called instead of `Extension.setup` in the main process when
+        setup ran in a worker process.
+
+        The default implementation calls `Extension.setup`, which suits
+        extensions that only connect to signals there.
+
+        Args:
+            state: the object returned by `Extension.get_setup_state`
+                in the worker process.
+        """
+        self.setup()
+
     @staticmethod
     def get_dependencies():
         """
@@ -689,14 +741,15 @@ class Extension(Configurable):
         """
         Banana banana
         """
-        if opath not in self.written_out_sitemaps:
-            Extension.formatted_sitemap = self.formatter.format_navigation(
+        written_out_sitemaps = self.formatter.context.written_out_sitemaps
+        if opath not in written_out_sitemaps:
+            formatted_sitemap = self.formatter.format_navigation(
                 self.app.project)
-            if Extension.formatted_sitemap:
-                with open(opath, 'w') as _:
-                    _.write(Extension.formatted_sitemap)
+            if formatted_sitemap:
+                self.formatter.context.output_manifest.write(
+                    opath, formatted_sitemap)
 
-        self.written_out_sitemaps.add(opath)
+        written_out_sitemaps.add(opath)
 
     # pylint: disable=too-many-locals
     def write_out_page(self, output, page):
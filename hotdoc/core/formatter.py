@@ -41,7 +41,6 @@ import appdirs
 from lxml import etree
 
 # pylint: disable=import-error
-from wheezy.template.engine import Engine
 from wheezy.template.ext.core import CoreExtension
 from wheezy.template.ext.code import CodeExtension
 from wheezy.template.loader import FileLoader
@@ -57,6 +56,10 @@ from hotdoc.core.exceptions import HotdocException
 from hotdoc.utils.loggable import Logger, warn, debug
 from hotdoc.utils.configurable import Configurable
 from hotdoc.utils.signals import Signal
+from hotdoc.utils.templates import CachingEngine
+from hotdoc.utils.assets import AssetSync, COPY_MODES, CHECK_MODES
+from hotdoc.utils.bundles import AssetBundler
+from hotdoc.utils.output import OutputManifest
 
 
 class FormatterBadLinkException(HotdocException):
@@ -133,23 +136,75 @@ class SymbolDescriptions:
         self.name = name
 
 
+def _create_engine(searchpath):
+    """
+    Creates a template engine looking up templates in @searchpath,
+    with the compiled templates cached in the user cache folder.
+    """
+    engine = CachingEngine(
+        loader=FileLoader(searchpath, encoding='UTF-8'),
+        extensions=[CoreExtension(), CodeExtension()],
+        cache_dir=os.path.join(appdirs.user_cache_dir("hotdoc", "hotdoc"),
+                               'templates'))
+    # https://github.com/akornatskyy/wheezy.template/issues/68#issuecomment-1441529466
+    engine.compiler.source_lineno = 0
+    engine.global_vars.update({'e': html.escape})
+    return engine
+
+
+# pylint: disable=too-many-instance-attributes
+# pylint: disable=too-few-public-methods
+class FormattingContext:
+    """
+    The state shared by the formatters of all the projects an
+    `Application` builds: the theme, the template engines and the
+    assets the formatted pages reference.
+
+    Each application has its own context, building a project thus does
+    not leak into the next projects built in the same process.
+
+    Args:
+        engines: dict, template engines by search path, shared with
+            the contexts of other applications so that they reuse the
+            templates they compiled.
+    """
+
+    def __init__(self, engines=None):
+        self.__engines = engines if engines is not None else {}
+        self.theme_path = None
+        self.theme_meta = {}
+        self.extra_theme_path = None
+        self.engine = None
+        # Engines of the extensions providing their own templates,
+        # by extension name
+        self.extension_engines = {}
+        self.all_scripts = set()
+        self.all_stylesheets = set()
+        self.get_extra_files_signal = Signal()
+        self.written_out_sitemaps = set()
+        self.output_manifest = OutputManifest()
+        self.asset_sync = AssetSync()
+        # Only set with --html-bundle-assets
+        self.asset_bundler = None
+
+    def get_engine(self, searchpath):
+        """
+        Returns a template engine looking up templates in @searchpath.
+        """
+        key = tuple(searchpath)
+        engine = self.__engines.get(key)
+        if engine is None:
+            engine = _create_engine(searchpath)
+            self.__engines[key] = engine
+        return engine
+
+
 # pylint: disable=too-many-instance-attributes
 class Formatter(Configurable):
     """
     Takes care of rendering the documentation symbols and comments into HTML
     pages.
     """
-    theme_path = None
-    theme_meta = {}
-    extra_theme_path = None
-    add_anchors = False
-    number_headings = False
-    engine = None
-    ext_engine = None
-    all_scripts = set()
-    all_stylesheets = set()
-    get_extra_files_signal = Signal()
-    initialized = False
 
     def __init__(self, extension):
         """
@@ -159,6 +214,7 @@ class Formatter(Configurable):
         Configurable.__init__(self)
 
         self.extension = extension
+        self.context = extension.app.formatting_context
 
         self._symbol_formatters = {
             FunctionSymbol: self._format_function,
@@ -198,6 +254,7 @@ class Formatter(Configurable):
         self.add_anchors = False
         self.number_headings = False
         self.writing_page_signal = Signal()
+        self.written_page_signal = Signal()
         self.formatting_page_signal = Signal()
         self.formatting_symbol_signal = Signal()
         self._order_by_parent = False
@@ -275,7 +332,7 @@ class Formatter(Configurable):
 
         extra_files = self._get_extra_files()
 
-        for ex_files in Formatter.get_extra_files_signal(self):
+        for ex_files in self.context.get_extra_files_signal(self):
             extra_files.extend(ex_files)
 
         for src, dest in extra_files:
@@ -284,10 +341,8 @@ class Formatter(Configurable):
             destdir = os.path.dirname(dest)
             if not os.path.exists(destdir):
                 os.makedirs(destdir)
-            if os.path.isfile(src):
-                shutil.copy(src, dest)
-            elif os.path.isdir(src):
-                recursive_overwrite(src, dest)
+            if os.path.exists(src):
+                self.context.asset_sync.sync(src, dest)
 
     def format_page(self, page):
         """
@@ -305,7 +360,7 @@ class Formatter(Configurable):
 
     # pylint: disable=no-self-use
     def __init_section_numbers(self, root):
-        if not Formatter.number_headings:
+        if not self.number_headings:
             return {}
 
         targets = []
@@ -328,7 +383,7 @@ class Formatter(Configurable):
 
     # pylint: disable=no-self-use
     def __update_section_number(self, target, section_numbers):
-        if not Formatter.number_headings or target.tag not in section_numbers:
+        if not self.number_headings or target.tag not in section_numbers:
             return None
 
         prev = section_numbers.get('prev')
@@ -476,9 +531,12 @@ class Formatter(Configurable):
         self.__validate_html(self.extension.project, page, doc_root)
 
         self.writing_page_signal(self, page, full_path, doc_root)
-        with open(full_path, 'w', encoding='utf-8') as _:
-            transformed = str(self.__page_transform(doc_root))
-            _.write('<!DOCTYPE html>\n%s' % transformed)
+        transformed = self.__page_transform(doc_root)
+        contents = '<!DOCTYPE html>\n%s' % str(transformed)
+        self.context.output_manifest.write(full_path, contents)
+        # Handlers get the serialized page, not its tree, which lacks the
+        # whitespace the serializer adds
+        self.written_page_signal(self, page, full_path, contents)
 
     def cache_page(self, page):
         """
@@ -654,7 +712,8 @@ class Formatter(Configurable):
         page.output_attrs['html']['extra_html'] = []
         page.output_attrs['html']['edit_button'] = ''
         page.output_attrs['html']['extra_footer_html'] = []
-        if Formatter.add_anchors:
+        page.output_attrs['html']['meta'] = {}
+        if self.add_anchors:
             page.output_attrs['html']['scripts'].add(
                 os.path.join(HERE, 'assets', 'css.escape.js'))
 
@@ -713,15 +772,15 @@ class Formatter(Configurable):
             self.get_output_folder(page),
             os.path.dirname(page.link.ref)))
 
-        if Formatter.extra_theme_path:
-            js_dir = os.path.join(Formatter.extra_theme_path, 'js')
+        if self.context.extra_theme_path:
+            js_dir = os.path.join(self.context.extra_theme_path, 'js')
             try:
                 for _ in os.listdir(js_dir):
                     scripts.append(os.path.join(js_dir, _))
             except OSError:
                 pass
 
-            css_dir = os.path.join(Formatter.extra_theme_path, 'css')
+            css_dir = os.path.join(self.context.extra_theme_path, 'css')
             try:
                 for _ in os.listdir(css_dir):
                     stylesheets.append(os.path.join(css_dir, _))
@@ -733,6 +792,15 @@ class Formatter(Configurable):
         dark_stylesheets = page.output_attrs['html']['dark-stylesheets']
         light_stylesheets = page.output_attrs['html']['light-stylesheets']
 
+        bundler = self.context.asset_bundler
+        if bundler:
+            # The bundles are copied instead of the files they are made of
+            scripts, stylesheets, dark_stylesheets, light_stylesheets = [
+                [bundler.get_bundle(paths, extension)] if paths else []
+                for paths, extension in (
+                    (scripts, '.js'), (stylesheets, '.css'),
+                    (dark_stylesheets, '.css'), (light_stylesheets, '.css'))]
+
         scripts_basenames = [os.path.basename(script)
                              for script in scripts]
         stylesheets_basenames = [os.path.basename(stylesheet)
@@ -742,10 +810,10 @@ class Formatter(Configurable):
         light_stylesheets_basenames = [os.path.basename(stylesheet)
                                        for stylesheet in light_stylesheets]
 
-        Formatter.all_stylesheets.update(stylesheets)
-        Formatter.all_stylesheets.update(dark_stylesheets)
-        Formatter.all_stylesheets.update(light_stylesheets)
-        Formatter.all_scripts.update(scripts)
+        self.context.all_stylesheets.update(stylesheets)
+        self.context.all_stylesheets.update(dark_stylesheets)
+        self.context.all_stylesheets.update(light_stylesheets)
+        self.context.all_scripts.update(scripts)
 
         out = template.render(
             {'page': page,
@@ -755,7 +823,7 @@ class Formatter(Configurable):
              'light_stylesheets': light_stylesheets_basenames,
              'rel_path': rel_path,
              'attrs': page.output_attrs['html'],
-             'meta': {},
+             'meta': page.output_attrs['html']['meta'],
              'symbols_details': symbols_details,
              'sections_details': by_sections,
              'in_toplevel': self.extension.project.is_toplevel}
@@ -998,16 +1066,16 @@ class Formatter(Configurable):
     def _get_extra_files(self):
         res = []
 
-        if Formatter.theme_path:
-            res.extend(self.__get_theme_files(Formatter.theme_path))
-        if Formatter.extra_theme_path:
-            res.extend(self.__get_theme_files(Formatter.extra_theme_path))
+        if self.context.theme_path:
+            res.extend(self.__get_theme_files(self.context.theme_path))
+        if self.context.extra_theme_path:
+            res.extend(self.__get_theme_files(self.context.extra_theme_path))
 
-        for script_path in Formatter.all_scripts:
+        for script_path in self.context.all_scripts:
             dest = os.path.join('js', os.path.basename(script_path))
             res.append((script_path, dest))
 
-        for stylesheet_path in Formatter.all_stylesheets:
+        for stylesheet_path in self.context.all_stylesheets:
             dest = os.path.join('css', os.path.basename(stylesheet_path))
             res.append((stylesheet_path, dest))
 
@@ -1036,6 +1104,29 @@ class Formatter(Configurable):
         group.add_argument("--html-number-headings", action="store_true",
                            dest="html_number_headings",
                            help="Enable html headings numbering")
+        group.add_argument("--assets-copy-mode", action="store",
+                           dest="assets_copy_mode", choices=COPY_MODES,
+                           help="How to copy the assets to the output, "
+                           "hardlinks and reflinks fall back to copies "
+                           "where not supported. Hardlinked assets must "
+                           "not be modified in place, as they are shared "
+                           "with the theme and the installed extensions",
+                           default='copy')
+        group.add_argument("--assets-check", action="store",
+                           dest="assets_check", choices=CHECK_MODES,
+                           help="How to tell whether assets copied by "
+                           "previous runs are up to date: by comparing "
+                           "their sizes and modification times, or their "
+                           "contents",
+                           default='mtime')
+        group.add_argument("--html-bundle-assets", action="store_true",
+                           dest="html_bundle_assets",
+                           help="Concatenate the scripts and the "
+                           "stylesheets of each page in bundles named "
+                           "after the hash of their contents, shared by "
+                           "the pages with the same assets. Bundles are "
+                           "minified when rjsmin and rcssmin are "
+                           "installed")
 
     def __download_theme(self, uri):
         sha = urllib.parse.parse_qs(uri.query).get('sha256')
@@ -1100,7 +1191,7 @@ class Formatter(Configurable):
 
     def parse_toplevel_config(self, config):
         """Parse @config to setup @self state."""
-        if not Formatter.initialized:
+        if self.context.engine is None:
             html_theme = config.get('html_theme', 'default')
 
             if html_theme != 'default':
@@ -1126,34 +1217,34 @@ class Formatter(Configurable):
 
             if os.path.exists(theme_meta_path):
                 with open(theme_meta_path, 'r') as _:
-                    Formatter.theme_meta = json.loads(_.read())
+                    self.context.theme_meta = json.loads(_.read())
 
             searchpath = []
             self.__load_theme_templates(searchpath, HERE)
 
-            Formatter.theme_path = html_theme
+            self.context.theme_path = html_theme
             if html_theme:
                 self.__load_theme_templates(searchpath, html_theme)
 
-            Formatter.extra_theme_path = config.get_path('html_extra_theme')
-            if Formatter.extra_theme_path:
+            self.context.extra_theme_path = config.get_path('html_extra_theme')
+            if self.context.extra_theme_path:
                 self.__load_theme_templates(searchpath,
-                                            Formatter.extra_theme_path)
-
-            Formatter.engine = Engine(
-                loader=FileLoader(searchpath, encoding='UTF-8'),
-                extensions=[CoreExtension(), CodeExtension()])
-            # https://github.com/akornatskyy/wheezy.template/issues/68#issuecomment-1441529466
-            Formatter.engine.compiler.source_lineno = 0
-            Formatter.engine.global_vars.update({'e': html.escape})
+                                            self.context.extra_theme_path)
 
-            Formatter.initialized = True
+            self.context.engine = self.context.get_engine(searchpath)
+            self.context.asset_sync = AssetSync(
+                config.get('assets_copy_mode', 'copy'),
+                config.get('assets_check', 'mtime'),
+                self.context.output_manifest)
+            if config.get('html_bundle_assets'):
+                self.context.asset_bundler = AssetBundler(os.path.join(
+                    self.extension.app.private_folder, 'bundles'))
 
     def get_template(self, name):
         """
         Banana banana
         """
-        return Formatter.engine.get_template(name)
+        return self.context.engine.get_template(name)
 
     def parse_config(self, config):
         """Banana banana
@@ -19,12 +19,20 @@
 """
 Banana banana
 """
-from hotdoc.utils.signals import Signal
+import os
+import json
 import urllib.parse
+from hotdoc.utils.signals import Signal
 from hotdoc.utils.loggable import Logger, warn
-from hotdoc.core.exceptions import MissingLinkException
+from hotdoc.core.exceptions import MissingLinkException, HotdocException
 Logger.register_warning_code('mandatory-link-not-found', MissingLinkException,
                              domain='links')
+Logger.register_warning_code('invalid-link-inventory', HotdocException,
+                             domain='links')
+
+
+# Written at the root of the html output, see `LinkInventory`
+LINK_INVENTORY = 'hotdoc-links.json'
 
 
 def dict_to_html_attrs(dict_):
@@ -190,3 +198,129 @@ class LinkResolver:
 
         self.add_link(link)
         return link
+
+
+class LinkInventory:
+    """
+    Maps the unique names of the symbols and the names of the projects
+    documented by other hotdoc builds to their pages.
+
+    Each build writes such an inventory, see `LinkInventory.dumps`,
+    other projects can then link to it by connecting `get_link_cb`
+    to `LinkResolver.get_link_signal`. Inventories are only loaded
+    on the first lookup.
+
+    The inventories written by the shards of @project_name, see
+    `hotdoc run --shard`, link to pages merged in the same html output.
+    """
+
+    # Bump this whenever the format of the inventory changes
+    VERSION = 1
+
+    def __init__(self, paths, html_dir, project_name=None):
+        self.paths = paths
+        self.html_dir = html_dir
+        self.project_name = project_name
+        self.__links = None
+
+    @staticmethod
+    def gather_links(project):
+        """
+        Returns a name -> (ref, title) dict of the links to the pages
+        and symbols of @project and its subprojects, the refs being
+        relative to the root of the html output.
+        """
+        links = {}
+        root = project.tree.root
+        formatter = project.extensions[root.extension_name].formatter
+        links[project.project_name] = (
+            os.path.join(formatter.get_output_folder(root), root.link.ref),
+            root.title)
+
+        for page in project.tree.get_pages().values():
+            subproj = project.subprojects.get(page.name)
+            if subproj:
+                links.update(LinkInventory.gather_links(subproj))
+                continue
+
+            formatter = project.extensions[page.extension_name].formatter
+            prefix = formatter.get_output_folder(page)
+            for sym in page.symbols:
+                if sym is None:
+                    continue
+                for link in [sym.link] + sym.get_extra_links():
+                    if link.ref and link.id_ not in links:
+                        links[link.id_] = (os.path.join(prefix, link.ref),
+                                           link.title)
+
+        return links
+
+    @staticmethod
+    def dumps(project, base_url=None, shard=None):
+        """
+        Serializes the inventory of @project and its subprojects.
+
+        Args:
+            base_url: str, the URL the documentation will be hosted at,
+                if any.
+            shard: tuple, the (I, N) shard of @project the inventory
+                is written by, if any.
+        """
+        return json.dumps({'version': LinkInventory.VERSION,
+                           'project': project.project_name,
+                           'base_url': base_url,
+                           'shard': shard,
+                           'links': LinkInventory.gather_links(project)},
+                          separators=(',', ':'))
+
+    def __load(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as _:
+                inventory = json.load(_)
+        except (OSError, ValueError) as exc:
+            warn('invalid-link-inventory',
+                 'Could not load link inventory %s: %s' % (path, exc))
+            return
+
+        if inventory.get('version') != LinkInventory.VERSION:
+            warn('invalid-link-inventory',
+                 'Link inventory %s has an unsupported version' % path)
+            return
+
+        base_url = inventory.get('base_url')
+        if inventory.get('shard') and \
+                inventory.get('project') == self.project_name:
+            # Refs are relative to the html output the shards are merged in
+            base_url = ''
+        elif base_url:
+            if not base_url.endswith('/'):
+                base_url += '/'
+        else:
+            # Assume both documentations are installed next to each other
+            base_url = os.path.relpath(os.path.dirname(path),
+                                       self.html_dir)
+
+        for name, (ref, title) in inventory['links'].items():
+            if name not in self.__links:
+                self.__links[name] = (base_url, ref, title)
+
+    def get_link_cb(self, link_resolver, name):
+        """
+        Banana banana
+        """
+        if self.__links is None:
+            self.__links = {}
+            for path in self.paths:
+                self.__load(path)
+
+        link = self.__links.get(name)
+        if link is None:
+            return None
+
+        base_url, ref, title = link
+        if urllib.parse.urlparse(base_url).netloc:
+            ref = urllib.parse.urljoin(base_url, ref)
+        else:
+            ref = os.path.join(base_url, ref)
+
+        return Link(ref, title, name)
@@ -23,7 +23,8 @@ import os
 import io
 import re
 import linecache
-import shutil
+import pickle
+import multiprocessing
 import urllib.parse
 
 from collections import OrderedDict
@@ -35,7 +36,7 @@ from hotdoc.core.extension import Extension
 from hotdoc.core.comment import Tag
 from hotdoc.core.config import Config
 from hotdoc.core.tree import Tree
-from hotdoc.utils.loggable import info, error
+from hotdoc.utils.loggable import info, error, Logger
 from hotdoc.utils.configurable import Configurable
 from hotdoc.utils.utils import OrderedSet
 from hotdoc.utils.signals import Signal
@@ -50,11 +51,51 @@ LANG_MAPPING = {
 }
 
 
+# Subprojects being set up in worker processes, which inherit this list
+# when forked
+_PARALLEL_SUBPROJECTS = []
+
+
+def _setup_subproject_in_worker(index):
+    proj = _PARALLEL_SUBPROJECTS[index]
+    database = proj.app.database
+
+    # The main process prints what we log when merging our results
+    Logger.silent = True
+    log_start = len(Logger.journal)
+    n_fatal_warnings = Logger.n_fatal_warnings
+    database.start_journal()
+
+    # pylint: disable=broad-except
+    try:
+        proj.setup_tree()
+
+        pages = proj.tree.get_pages()
+        for page in pages.values():
+            # ASTs can't be pickled, pages are parsed again when resolving
+            page.ast = None
+
+        return pickle.dumps({
+            'journal': database.stop_journal(),
+            'log': Logger.journal[log_start:],
+            'n_fatal_warnings': Logger.n_fatal_warnings - n_fatal_warnings,
+            'pages': pages,
+            'root': next(name for name, page in pages.items()
+                         if page is proj.tree.root),
+            'extensions': {name: ext.get_setup_state()
+                           for name, ext in proj.extensions.items()}})
+    except Exception:
+        # The main process will set the subproject up again, reporting
+        # the issue
+        return None
+
+
 class CoreExtension(Extension):
     """
     Banana banana
     """
     extension_name = 'core'
+    parallel_setup = True
 
     def format_page(self, page, link_resolver, output):
         proj = self.project.subprojects.get(page.name)
@@ -114,6 +155,7 @@ class Project(Configurable):
 
     def __init__(self, app, dependency_map=None):
         self.app = app
+        self.config = None
         self.tree = None
         self.include_paths = None
         self.extensions = OrderedDict()
@@ -123,6 +165,10 @@ class Project(Configurable):
         self.sanitized_name = None
         self.sitemap_path = None
         self.subprojects = {}
+        # Subprojects set up by the other shards, see `hotdoc run --shard`
+        self.other_shards_subprojects = OrderedSet()
+        self.subprojects_jobs = 1
+        self.__pending_subprojects = []
         self.extra_asset_folders = OrderedSet()
         self.extra_assets = {}
 
@@ -164,6 +210,10 @@ class Project(Configurable):
         Banana banana
         """
         self.formatted_signal.clear()
+        for ext in self.extensions.values():
+            ext.finalize()
+        for proj in self.subprojects.values():
+            proj.finalize()
 
     # pylint: disable=no-self-use
     def get_private_folder(self):
@@ -172,10 +222,25 @@ class Project(Configurable):
         """
         return self.app.private_folder
 
+    def get_persistent_folder(self):
+        """
+        Returns a folder in the private folder whose contents are kept
+        across builds, for caches.
+        """
+        return self.app.persistent_folder
+
     def setup(self):
         """
         Banana banana
         """
+        self.setup_tree()
+        self.__resolve_symbols()
+
+    def setup_tree(self):
+        """
+        Sets up the extensions and the subprojects, and builds the tree,
+        without resolving its symbols.
+        """
         info('Setting up %s' % self.project_name, 'project')
 
         for extension in list(self.extensions.values()):
@@ -185,9 +250,94 @@ class Project(Configurable):
         sitemap = SitemapParser().parse(self.sitemap_path)
         self.tree.build(sitemap, self.extensions)
 
+        self.__setup_subprojects()
+
+    def __resolve_symbols(self):
         info("Resolving symbols", 'resolution')
         self.tree.resolve_symbols(self.app.database, self.app.link_resolver)
 
+    def __setup_subprojects(self):
+        # Subprojects are set up in sitemap order, consecutive subprojects
+        # supporting it in parallel, see Project.__setup_in_parallel
+        pending, self.__pending_subprojects = self.__pending_subprojects, []
+        batch = []
+        for proj in pending:
+            if self.subprojects_jobs != 1 and proj.__supports_parallel_setup():
+                batch.append(proj)
+                continue
+
+            self.__setup_in_parallel(batch)
+            batch = []
+            proj.setup()
+
+        self.__setup_in_parallel(batch)
+
+    def __supports_parallel_setup(self):
+        if not all(ext.supports_parallel_setup()
+                   for ext in self.extensions.values()):
+            return False
+
+        # Nested subprojects are set up by their parent
+        try:
+            with io.open(self.sitemap_path, 'r', encoding='utf-8') as _:
+                return not any(line.strip().endswith('.json') for line in _)
+        except OSError:
+            return False
+
+    def __setup_in_parallel(self, projects):
+        """
+        Workers are forked to set up @projects and build their trees,
+        recording what they add to the database. Their results are then
+        merged in order, the outcome being the same as if @projects had
+        been set up one after the other.
+        """
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            context = None
+
+        if len(projects) < 2 or context is None:
+            for proj in projects:
+                proj.setup()
+            return
+
+        jobs = min(self.subprojects_jobs or os.cpu_count() or 1,
+                   len(projects))
+        info('Setting up %d subprojects with %d jobs' %
+             (len(projects), jobs), 'project')
+
+        _PARALLEL_SUBPROJECTS[:] = projects
+        try:
+            with context.Pool(jobs) as pool:
+                results = pool.map(_setup_subproject_in_worker,
+                                   range(len(projects)), chunksize=1)
+        finally:
+            del _PARALLEL_SUBPROJECTS[:]
+
+        for proj, result in zip(projects, results):
+            if result is None:
+                proj.setup()
+            else:
+                proj.__merge_setup(pickle.loads(result))
+
+    def __merge_setup(self, result):
+        rejected = self.app.database.merge_journal(
+            result['journal'], result['log'])
+        Logger.n_fatal_warnings += result['n_fatal_warnings']
+
+        # These symbols were defined by a previous subproject, as when
+        # setting up serially they can't be listed in our pages
+        for page in result['pages'].values():
+            for name in rejected:
+                page.symbol_names.discard(name)
+
+        self.tree.set_pages(result['pages'], result['root'])
+
+        for name, extension in self.extensions.items():
+            extension.restore_setup(result['extensions'][name])
+
+        self.__resolve_symbols()
+
     def format(self, link_resolver, output):
         """
         Banana banana
@@ -222,17 +372,40 @@ class Project(Configurable):
             "--extra-assets",
             help="Extra asset folders to copy in the output",
             action='append', dest='extra_assets', default=[])
+        group.add_argument(
+            "--subprojects-jobs", action="store", type=int,
+            dest="subprojects_jobs", default=1,
+            help="Number of subprojects to set up in parallel, "
+            "0 for one per CPU")
 
     def add_subproject(self, fname, conf_path):
         """Creates and adds a new subproject."""
+        if self.__is_in_other_shard(fname):
+            return
+
         config = Config(conf_file=conf_path)
         proj = Project(self.app,
                        dependency_map=self.dependency_map)
         proj.parse_name_from_config(config)
         proj.parse_config(config)
-        proj.setup()
+        # Set up once the tree is built, see Project.__setup_subprojects
+        self.__pending_subprojects.append(proj)
         self.subprojects[fname] = proj
 
+    def __is_in_other_shard(self, fname):
+        # The subprojects of the toplevel project are assigned to shards
+        # in a round-robin manner, in sitemap order
+        if not self.is_toplevel or not self.app.shard:
+            return False
+
+        index, n_shards = self.app.shard
+        position = len(self.subprojects) + len(self.other_shards_subprojects)
+        if position % n_shards == index - 1:
+            return False
+
+        self.other_shards_subprojects.add(fname)
+        return True
+
     def get_page_for_symbol(self, unique_name):
         """
         Banana banana
@@ -261,6 +434,7 @@ class Project(Configurable):
     # pylint: disable=arguments-differ
     def parse_config(self, config, toplevel=False):
         """Parses @config setting up @self state."""
+        self.config = config
         self.sitemap_path = config.get_path('sitemap')
 
         if self.sitemap_path is None:
@@ -281,6 +455,14 @@ class Project(Configurable):
 
         self.is_toplevel = toplevel
 
+        if toplevel:
+            self.subprojects_jobs = config.get('subprojects_jobs', 1)
+            if not isinstance(self.subprojects_jobs, int) or \
+                    self.subprojects_jobs < 0:
+                error('invalid-config',
+                      'Invalid number of subprojects jobs: %s' %
+                      self.subprojects_jobs)
+
         self.tree = Tree(self, self.app)
 
         self.__create_extensions()
@@ -314,11 +496,20 @@ class Project(Configurable):
             destdir = os.path.dirname(dest)
             if not os.path.exists(destdir):
                 os.makedirs(destdir)
-            shutil.copyfile(src, dest)
+            self.app.formatting_context.asset_sync.sync_file(src, dest)
 
         for proj in self.subprojects.values():
             proj.write_extra_assets(output)
 
+    def write_out_assets(self, output):
+        """
+        Copies the extra assets of the project and its subprojects,
+        and the assets of the theme.
+        """
+        ext = self.extensions.get(self.tree.root.extension_name)
+        self.write_extra_assets(output)
+        ext.formatter.copy_assets(os.path.join(output, 'html', 'assets'))
+
     def write_out(self, output):
         """Banana banana
         """
@@ -328,9 +519,7 @@ class Project(Configurable):
         ext = self.extensions.get(self.tree.root.extension_name)
 
         self.tree.write_out(output)
-
-        self.write_extra_assets(output)
-        ext.formatter.copy_assets(os.path.join(output, 'html', 'assets'))
+        self.write_out_assets(output)
 
         # Just in case the sitemap root isn't named index
         ext_folder = ext.formatter.get_output_folder(self.tree.root)
@@ -339,10 +528,12 @@ class Project(Configurable):
 
         default_index_path = os.path.join(output, 'html', 'index.html')
 
-        if not os.path.exists(default_index_path):
-            with open(default_index_path, 'w', encoding='utf8') as _:
-                _.write('<meta http-equiv="refresh" content="0; url=%s"/>' %
-                        index_path)
+        if self.tree.root not in self.tree.skipped_pages and \
+                not os.path.exists(default_index_path):
+            self.app.formatting_context.output_manifest.write(
+                default_index_path,
+                '<meta http-equiv="refresh" content="0; url=%s"/>' %
+                index_path)
 
         self.written_out_signal(self)
 
@@ -377,5 +568,7 @@ class Project(Configurable):
             loc = etree.SubElement(url, 'loc')
             loc.text = urllib.parse.urljoin(hostname, link)
 
-        doc.write(os.path.join(output, 'html', 'sitemap.xml'), xml_declaration=True,
-                  encoding='utf-8', pretty_print=True)
+        self.app.formatting_context.output_manifest.write(
+            os.path.join(output, 'html', 'sitemap.xml'),
+            etree.tostring(doc, xml_declaration=True, encoding='utf-8',
+                           pretty_print=True))
@@ -16,8 +16,11 @@
 # along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
 # pylint: disable=missing-docstring
+import pickle
+
 from hotdoc.tests.fixtures import HotdocTest
 from hotdoc.core.database import Database, RedefinedSymbolException
+from hotdoc.core.comment import Comment
 from hotdoc.core.symbols import FunctionSymbol
 from hotdoc.utils.loggable import Logger
 
@@ -39,3 +42,45 @@ class TestDatabase(HotdocTest):
         Logger.fatal_warnings = False
         Logger.silent = False
         Logger.reset()
+
+    def test_merge_journal(self):
+        other = Database(None)
+        other.create_symbol(FunctionSymbol, unique_name='renamed')
+
+        Logger.silent = True
+        log_start = len(Logger.journal)
+        other.start_journal()
+        other.create_symbol(
+            FunctionSymbol, unique_name='foo', aliases=['foo_alias'])
+        other.create_symbol(FunctionSymbol, unique_name='bar')
+        other.add_comment(Comment(name='foo'))
+        # Added under its name at that time, like the gst extension does
+        renamed_comment = Comment(name='element-qux')
+        other.add_comment(renamed_comment)
+        renamed_comment.name = 'qux'
+        other.rename_symbol('baz', 'renamed')
+        Logger.info('after the changes', 'core')
+        journal = other.stop_journal()
+        log = Logger.journal[log_start:]
+        journal, log = pickle.loads(pickle.dumps((journal, log)))
+        Logger.reset()
+        Logger.silent = True
+
+        self.database.create_symbol(FunctionSymbol, unique_name='bar')
+        self.database.create_symbol(FunctionSymbol, unique_name='renamed')
+
+        rejected = self.database.merge_journal(journal, log)
+
+        self.assertEqual(rejected, {'bar'})
+        self.assertIs(self.database.get_symbol('foo_alias'),
+                      self.database.get_symbol('foo'))
+        self.assertEqual(self.database.get_comment('foo').name, 'foo')
+        self.assertEqual(self.database.get_comment('element-qux').name, 'qux')
+        self.assertIsNone(self.database.get_symbol('renamed'))
+        self.assertEqual(self.database.get_symbol('baz').unique_name, 'baz')
+        # Merged log entries and warnings are interleaved
+        self.assertEqual([issue.code for issue in Logger.get_issues()],
+                         ['symbol-redefined'])
+        self.assertEqual(Logger.journal[-1].message, 'after the changes')
+        Logger.silent = False
+        Logger.reset()
@@ -283,6 +283,40 @@ class TestTree(unittest.TestCase):
         index = pages.get('index.markdown')
         self.assertEqual(index.title, u'My documentation')
 
+    def test_update_pages(self):
+        self.__create_test_layout(output=self.__output_dir)
+        html_dir = os.path.join(self.__output_dir, 'html')
+        pages = self.app.project.tree.get_pages()
+        old_page = pages['core_page.markdown']
+
+        for name in ('index.html', 'core_page.html', 'page_y.html'):
+            os.remove(os.path.join(html_dir, name))
+
+        path = self.__create_md_file(
+            'core_page.markdown',
+            (u'---\n'
+             'title: My updated page\n'
+             '...\n'
+             '# My non-extension page\n'))
+        self.assertTrue(self.app.update_pages({path}))
+
+        page = pages['core_page.markdown']
+        self.assertIsNot(page, old_page)
+        self.assertEqual(page.title, 'My updated page')
+
+        # The page and the index listing it are written out again
+        self.assertTrue(os.path.exists(
+            os.path.join(html_dir, 'core_page.html')))
+        self.assertTrue(os.path.exists(
+            os.path.join(html_dir, 'index.html')))
+        self.assertFalse(os.path.exists(
+            os.path.join(html_dir, 'page_y.html')))
+        self.assertFalse(self.app.project.tree.skipped_pages)
+
+        # Sources cannot be updated on their own
+        self.assertFalse(self.app.update_pages(
+            {os.path.join(self.__src_dir, 'source_a.test')}))
+
     def test_page_output_path(self):
         conf = {'project_name': 'test',
                 'project_version': '1.0'}
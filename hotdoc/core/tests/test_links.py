@@ -23,11 +23,15 @@
 # pylint: disable=too-many-instance-attributes
 import unittest
 import os
+import json
 import shutil
 
 from hotdoc.core.database import Database
-from hotdoc.core.links import LinkResolver, Link, dict_to_html_attrs
+from hotdoc.core.exceptions import HotdocException
+from hotdoc.core.links import (LinkResolver, Link, LinkInventory,
+                               dict_to_html_attrs)
 from hotdoc.core.symbols import (FunctionSymbol, ParameterSymbol, StructSymbol)
+from hotdoc.utils.loggable import Logger
 from hotdoc.utils.utils import OrderedDict
 
 
@@ -41,3 +45,92 @@ class TestLinkUtils(unittest.TestCase):
         d['foo'] = None
         d['bar'] = None
         self.assertEqual(dict_to_html_attrs(d), 'foo="None" bar="None"')
+
+
+class TestLinkInventory(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__test_dir = os.path.abspath(os.path.join(here, 'tmp-inventory'))
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        os.mkdir(self.__test_dir)
+        Logger.fatal_warnings = True
+        Logger.raise_on_fatal_warnings = True
+        Logger.silent = True
+
+    def tearDown(self):
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        Logger.fatal_warnings = False
+        Logger.raise_on_fatal_warnings = False
+        Logger.silent = False
+        Logger.reset()
+
+    def __create_inventory(self, folder, base_url, links, version=1,
+                           shard=None):
+        folder = os.path.join(self.__test_dir, folder)
+        os.makedirs(folder)
+        path = os.path.join(folder, 'hotdoc-links.json')
+        with open(path, 'w') as _:
+            json.dump({'version': version,
+                       'project': 'other',
+                       'base_url': base_url,
+                       'shard': shard,
+                       'links': links}, _)
+        return path
+
+    def test_lookup(self):
+        hosted = self.__create_inventory(
+            'hosted', 'https://example.com/doc',
+            {'foo': ['other/foo.html#foo', 'foo()'],
+             'other': ['other/index.html', 'Other']})
+        installed = self.__create_inventory(
+            os.path.join('installed', 'html'), None,
+            {'foo': ['installed/foo.html#foo', 'foo()'],
+             'bar': ['installed/bar.html#bar', 'bar']})
+
+        inventory = LinkInventory(
+            [hosted, installed],
+            os.path.join(self.__test_dir, 'output', 'html'))
+
+        link = inventory.get_link_cb(None, 'foo')
+        self.assertEqual(link.ref, 'https://example.com/doc/other/foo.html#foo')
+        self.assertEqual(link.title, 'foo()')
+        self.assertEqual(link.id_, 'foo')
+
+        link = inventory.get_link_cb(None, 'bar')
+        self.assertEqual(link.ref, '../../installed/html/installed/bar.html#bar')
+
+        self.assertEqual(inventory.get_link_cb(None, 'other').ref,
+                         'https://example.com/doc/other/index.html')
+        self.assertIsNone(inventory.get_link_cb(None, 'baz'))
+
+    def test_shard_lookup(self):
+        path = self.__create_inventory(
+            os.path.join('shard2', 'html'), 'https://example.com/doc',
+            {'foo': ['sub2/foo.html#foo', 'foo()']}, shard=[2, 2])
+        html_dir = os.path.join(self.__test_dir, 'shard1', 'html')
+
+        # Shards of the same project are merged in the same output
+        inventory = LinkInventory([path], html_dir, 'other')
+        self.assertEqual(inventory.get_link_cb(None, 'foo').ref,
+                         'sub2/foo.html#foo')
+
+        inventory = LinkInventory([path], html_dir, 'mine')
+        self.assertEqual(inventory.get_link_cb(None, 'foo').ref,
+                         'https://example.com/doc/sub2/foo.html#foo')
+
+    def test_invalid_version(self):
+        path = self.__create_inventory('hosted', None, {}, version=0)
+        inventory = LinkInventory([path], self.__test_dir)
+        with self.assertRaises(HotdocException):
+            inventory.get_link_cb(None, 'foo')
+
+    def test_link_resolver_fallback(self):
+        path = self.__create_inventory(
+            'hosted', 'https://example.com/', {'foo': ['foo.html#foo', None]})
+        inventory = LinkInventory([path], self.__test_dir)
+        database = Database(None)
+        link_resolver = LinkResolver(database)
+        link_resolver.get_link_signal.connect_after(inventory.get_link_cb)
+        link = link_resolver.get_named_link('foo')
+        self.assertEqual(link.ref, 'https://example.com/foo.html#foo')
+        self.assertIs(link_resolver.get_named_link('foo'), link)
@@ -25,10 +25,27 @@ import os
 from hotdoc.tests.fixtures import HotdocTest
 from hotdoc.core.exceptions import ConfigError
 from hotdoc.core.project import Project, CoreExtension
+from hotdoc.core.extension import Extension
 from hotdoc.core.config import Config
+from hotdoc.core.symbols import FunctionSymbol
 from hotdoc.utils.loggable import Logger
 
 
+class SymbolsExtension(Extension):
+    extension_name = 'test-symbols'
+    parallel_setup = True
+
+    def setup(self):
+        super(SymbolsExtension, self).setup()
+        self.create_symbol(
+            FunctionSymbol,
+            unique_name='%s-function' % self.project.project_name)
+        self.create_symbol(FunctionSymbol, unique_name='shared-function')
+
+    def restore_setup(self, state):
+        pass
+
+
 class TestProject(HotdocTest):
 
     def setUp(self):
@@ -37,6 +54,7 @@ class TestProject(HotdocTest):
         self.extension_classes = {CoreExtension.extension_name: CoreExtension}
         self.private_folder = self.private_folder
         self.output = self._output_dir
+        self.shard = None
         Logger.silent = True
         self.project = None
 
@@ -152,6 +170,76 @@ class TestProject(HotdocTest):
             proj_output, 'subassets', 'fake_asset.md')))
         '''
 
+    def __setup_subprojects(self, jobs):
+        self.extension_classes[SymbolsExtension.extension_name] = \
+            SymbolsExtension
+        sitemap = ['index.markdown']
+        for name in ('subproject1', 'subproject2', 'subproject3'):
+            sitemap.append('\t%s.json' % name)
+            sub_sm_path = self._create_sitemap(
+                '%s.txt' % name, '%s.markdown' % name)
+            sub_index_path = self._create_md_file(
+                '%s.markdown' % name, '# %s' % name)
+            self._create_conf_file('%s.json' % name,
+                                   {'index': sub_index_path,
+                                    'sitemap': sub_sm_path,
+                                    'project_name': name,
+                                    'project_version': '0.2'})
+        sm_path = self._create_sitemap('sitemap.txt', '\n'.join(sitemap))
+        index_path = self._create_md_file('index.markdown', '# Project')
+
+        proj = Project(self)
+        self.project = proj
+        conf = Config({'sitemap': sm_path,
+                       'index': index_path,
+                       'project_name': 'test-project',
+                       'project_version': '0.1',
+                       'subprojects_jobs': jobs,
+                       'output': self._output_dir})
+        proj.parse_name_from_config(conf)
+        proj.parse_config(conf, toplevel=True)
+        proj.setup()
+        return proj
+
+    def test_parallel_subprojects(self):
+        Logger.reset()
+        Logger.silent = True
+        self.__setup_subprojects(1)
+        serial_issues = Logger.get_issues()
+        serial_symbols = {
+            name: sym.project_name
+            for name, sym in self.database.get_all_symbols().items()}
+
+        self.tearDown()
+        self.setUp()
+        Logger.reset()
+        Logger.silent = True
+        proj = self.__setup_subprojects(2)
+
+        self.assertEqual(Logger.get_issues(), serial_issues)
+        self.assertEqual(len(serial_issues), 3)
+        self.assertDictEqual(
+            {name: sym.project_name
+             for name, sym in self.database.get_all_symbols().items()},
+            serial_symbols)
+        self.assertEqual(serial_symbols['shared-function'], 'test-project')
+
+        for name in ('subproject1', 'subproject2', 'subproject3'):
+            subproj = proj.subprojects['%s.json' % name]
+            self.assertEqual(os.path.basename(subproj.tree.root.source_file),
+                             '%s.markdown' % name)
+
+    def test_shard_subprojects(self):
+        self.shard = (2, 2)
+        proj = self.__setup_subprojects(1)
+
+        self.assertEqual(list(proj.subprojects), ['subproject2.json'])
+        self.assertEqual(list(proj.other_shards_subprojects),
+                         ['subproject1.json', 'subproject3.json'])
+        symbols = self.database.get_all_symbols()
+        self.assertIn('subproject2-function', symbols)
+        self.assertNotIn('subproject1-function', symbols)
+
     # FIXME: reenable with a different testing strategy
     # pylint: disable=pointless-string-statement
     '''
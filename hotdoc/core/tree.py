@@ -402,6 +402,10 @@ class Tree:
         cmark.hotdoc_to_ast(u'', self, None)
         self.__extensions = {}
 
+        # Pages formatted and written out by another run,
+        # see `hotdoc run --shard`
+        self.skipped_pages = set()
+
     def __fill_dep_map(self):
         for page in list(self.__all_pages.values()):
             for sym_name in page.symbol_names:
@@ -586,6 +590,47 @@ class Tree:
         """
         return self.__all_pages
 
+    def set_pages(self, pages, root_name):
+        """
+        Sets the pages of a tree built in another process.
+
+        Args:
+            pages (dict): the pages as returned by `Tree.get_pages`
+            root_name (str): the name of the root page
+        """
+        self.__all_pages = pages
+        self.root = pages[root_name]
+
+    def update_page(self, name, database, link_resolver):
+        """
+        Parses the markdown page @name again and resolves its symbols.
+
+        Returns:
+            Page: the new page, or None if the page cannot be updated
+                on its own, for example if it documents symbols.
+        """
+        old_page = self.__all_pages[name]
+        if old_page.generated or old_page.symbol_names:
+            return None
+
+        source_file, include_path = find_file(name, self.project.include_paths)
+        if source_file != old_page.source_file:
+            return None
+
+        page = self.parse_page(source_file, include_path,
+                               old_page.extension_name)
+        if page.symbol_names:
+            return None
+
+        page.subpages = old_page.subpages
+        page.pre_sorted = old_page.pre_sorted
+        self.__all_pages[name] = page
+        if self.root is old_page:
+            self.root = page
+
+        page.resolve_symbols(self, database, link_resolver)
+        return page
+
     def __update_dep_map(self, page, symbols):
         for sym in symbols:
             if not isinstance(sym, Symbol):
@@ -636,7 +681,8 @@ class Tree:
         self.__extensions = extensions
 
         for page in self.walk():
-            self.format_page(page, link_resolver, output, extensions)
+            if page not in self.skipped_pages:
+                self.format_page(page, link_resolver, output, extensions)
 
         self.__extensions = None
         link_resolver.get_link_signal.disconnect(self.__get_link_cb)
@@ -645,5 +691,7 @@ class Tree:
         """Banana banana
         """
         for page in self.walk():
+            if page in self.skipped_pages:
+                continue
             ext = self.project.extensions[page.extension_name]
             ext.write_out_page(output, page)
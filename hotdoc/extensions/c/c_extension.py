@@ -613,17 +613,21 @@ Parse C source files to extract comments and symbols.
 class CExtension(Extension):
     extension_name = 'c-extension'
     argument_prefix = 'c'
-    connected = False
+    parallel_setup = True
 
     def __init__(self, app, project):
         Extension.__init__(self, app, project)
         self.project = project
         self.flags = []
-        if not CExtension.connected:
+        if project.is_toplevel:
             inclusions.include_signal.connect(self.__include_file_cb)
-            CExtension.connected = True
         self.scanner = ClangScanner(self.app, self.project, self)
 
+    def finalize(self):
+        super().finalize()
+        if self.project.is_toplevel:
+            inclusions.include_signal.disconnect(self.__include_file_cb)
+
     def __include_file_cb(self, include_path, line_ranges, symbol_name):
         if not include_path.endswith(".c") or not symbol_name:
             return None
@@ -683,6 +687,9 @@ class CExtension(Extension):
         self.scanner.scan(self.sources, self.flags, False, ['*.h'],
                           all_sources=self.sources)
 
+    def restore_setup(self, state):
+        gather_links()
+
     def format_page(self, page, link_resolver, output):
         link_resolver.get_link_signal.connect(search_online_links)
         super().format_page(page, link_resolver, output)
@@ -35,6 +35,7 @@ Logger.register_warning_code('missing-since-marker', HotdocSourceException,
 
 class CheckMissingSinceMarkersExtension(Extension):
     extension_name = 'check-missing-since-markers'
+    parallel_setup = True
 
     def __init__(self, app, project):
         Extension.__init__(self, app, project)
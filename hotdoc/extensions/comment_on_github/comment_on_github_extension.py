@@ -2,7 +2,6 @@ import os
 
 from hotdoc.core.extension import Extension
 from hotdoc.core.tree import Page
-from hotdoc.core.formatter import Formatter
 from schema import Schema, SchemaError, And, Use, Optional
 
 PNAME = 'comment-on-github'
@@ -14,6 +13,7 @@ Page.meta_schema[Optional('github-issue-id')] = And(int)
 class CommentOnGithubExtension(Extension):
     extension_name = PNAME
     argument_prefix = PNAME
+    parallel_setup = True
 
     def __init__(self, app, project):
         self.__repo = None
@@ -37,7 +37,10 @@ class CommentOnGithubExtension(Extension):
     def parse_toplevel_config(self, config):
         super().parse_toplevel_config(config)
         template_path = os.path.join(HERE, 'templates')
-        Formatter.engine.loader.searchpath.append(template_path)
+        # The engine may be shared with other applications
+        searchpath = self.formatter.context.engine.loader.searchpath
+        if template_path not in searchpath:
+            searchpath.append(template_path)
 
     def __formatting_page_cb(self, formatter, page):
         if self.__repo is None:
@@ -48,7 +51,8 @@ class CommentOnGithubExtension(Extension):
         if issue_id is None:
             return
 
-        template = Formatter.engine.get_template('github_comments.html')
+        template = formatter.context.engine.get_template(
+            'github_comments.html')
 
         formatted = template.render(
             {'issue_id': str(issue_id), 'repo': self.__repo})
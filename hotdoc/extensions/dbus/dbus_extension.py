@@ -175,6 +175,7 @@ Parse DBus XML files and extract symbols and comments.
 class DBusExtension(Extension):
     extension_name = 'dbus-extension'
     argument_prefix = 'dbus'
+    parallel_setup = True
 
     def __init__(self, app, project):
         Extension.__init__(self, app, project)
@@ -187,6 +188,10 @@ class DBusExtension(Extension):
 
         self.scanner = DBusScanner(self.app, self.project, self, self.sources)
 
+    def restore_setup(self, state):
+        # Everything the scanner produces ends up in the database
+        pass
+
     def create_symbol(self, *args, **kwargs):
         kwargs['language'] = 'dbus'
         return super(DBusExtension, self).create_symbol(
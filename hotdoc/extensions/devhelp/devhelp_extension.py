@@ -31,7 +31,6 @@ from hotdoc.core.symbols import (
     FieldSymbol, MethodSymbol, EnumMemberSymbol, ConstructorSymbol,
     ActionSignalSymbol)
 from hotdoc.core.extension import Extension
-from hotdoc.utils.utils import recursive_overwrite
 
 DESCRIPTION =\
     """
@@ -76,13 +75,12 @@ TYPE_MAP = {
 class DevhelpExtension(Extension):
     extension_name = 'devhelp-extension'
     argument_prefix = 'devhelp'
-
-    activated = False
-    __connected = False
-    __resolved_symbols_map = {}
+    parallel_setup = True
 
     def __init__(self, app, project):
         Extension.__init__(self, app, project)
+        self.activated = False
+        self.__resolved_symbols_map = {}
         self.__ext_languages = defaultdict(set)
         self.__online = None
 
@@ -97,7 +95,7 @@ class DevhelpExtension(Extension):
         html_path = os.path.join(self.app.output, 'html')
         relpath = os.path.relpath(path, html_path)
 
-        DevhelpExtension.__resolved_symbols_map[relpath] = [
+        self.__resolved_symbols_map[relpath] = [
             FormattedSymbol(DevhelpExtension.__map_type_to_category(type(sym)),
                             sym.link.ref, sym.link.title)
             for sym in page.symbols]
@@ -151,7 +149,7 @@ class DevhelpExtension(Extension):
         root.append(chapter_node)
 
         funcs_node = etree.Element('functions')
-        for _, symbols in DevhelpExtension.__resolved_symbols_map.items():
+        for _, symbols in self.__resolved_symbols_map.items():
             for sym in symbols:
                 if sym.type_ is None:
                     continue
@@ -169,8 +167,10 @@ class DevhelpExtension(Extension):
             os.makedirs(opath)
 
         tree = etree.ElementTree(root)
-        tree.write(index_path, pretty_print=True,
-                   encoding='utf-8', xml_declaration=True)
+        self.formatter.context.output_manifest.write(
+            index_path, etree.tostring(tree, pretty_print=True,
+                                       encoding='utf-8',
+                                       xml_declaration=True))
 
         return opath
 
@@ -184,6 +184,8 @@ class DevhelpExtension(Extension):
             ignored.add('fonts')
         elif path.endswith('/assets/js'):
             ignored.add('search')
+        elif path.endswith('/assets/css'):
+            ignored.add('devhelp.css')
         return ignored
 
     # pylint: disable=no-self-use
@@ -191,12 +193,13 @@ class DevhelpExtension(Extension):
         html_path = os.path.join(app.output, 'html')
         dh_html_path = os.path.join(
             app.output, 'devhelp', 'books', self.project.sanitized_name)
-        recursive_overwrite(html_path, dh_html_path, self.__ignore_cb)
+        app.formatting_context.asset_sync.sync(html_path, dh_html_path,
+                                               self.__ignore_cb)
 
         # Remove some stuff not relevant in devhelp
-        with open(os.path.join(dh_html_path, 'assets', 'css',
-                               'devhelp.css'), 'w') as _:
-            _.write('[data-hotdoc-role="navigation"] {display: none;}\n')
+        app.formatting_context.output_manifest.write(
+            os.path.join(dh_html_path, 'assets', 'css', 'devhelp.css'),
+            '[data-hotdoc-role="navigation"] {display: none;}\n')
 
     @staticmethod
     def __formatting_page_cb(formatter, page):
@@ -205,21 +208,24 @@ class DevhelpExtension(Extension):
 
     def setup(self):
         super(DevhelpExtension, self).setup()
-        if not DevhelpExtension.activated:
+        # The toplevel project's instance indexes the symbols of all
+        # the pages
+        toplevel = self.app.project.extensions[self.extension_name]
+        if not toplevel.activated:
             return
 
         for ext in self.project.extensions.values():
-            ext.formatter.writing_page_signal.connect(self.__writing_page_cb)
+            ext.formatter.writing_page_signal.connect(
+                toplevel.__writing_page_cb)
             ext.formatter.formatting_page_signal.connect(
                 self.__formatting_page_cb)
 
-        if DevhelpExtension.__connected:
+        if self is not toplevel:
             return
 
         self.project.written_out_signal.connect_after(
             self.__project_written_out_cb)
         self.app.formatted_signal.connect_after(self.__formatted_cb)
-        DevhelpExtension.__connected = True
 
     @staticmethod
     def add_arguments(parser):
@@ -240,7 +246,7 @@ class DevhelpExtension(Extension):
 
     def parse_toplevel_config(self, config):
         super(DevhelpExtension, self).parse_toplevel_config(config)
-        DevhelpExtension.activated = bool(
+        self.activated = bool(
             config.get('devhelp_activate', False))
 
 
@@ -20,6 +20,7 @@ class EditOnGitHubExtension(Extension):
     """Extension to upload generated doc to a git repository"""
     extension_name = PNAME
     argument_prefix = PNAME
+    parallel_setup = True
 
     def __init__(self, app, project):
         self.__repo = None
@@ -65,9 +66,11 @@ class EditOnGitHubExtension(Extension):
             ext.formatter.formatting_page_signal.connect(
                 self.__formatting_page_cb)
 
-        for ext in list(self.project.extensions.values()):
-            template_path = os.path.join(HERE, 'html_templates')
-            ext.formatter.engine.loader.searchpath.append(template_path)
+        template_path = os.path.join(HERE, 'html_templates')
+        # The engine may be shared with other applications
+        searchpath = self.formatter.context.engine.loader.searchpath
+        if template_path not in searchpath:
+            searchpath.append(template_path)
 
     def __get_repo_root(self, page):
         if self.__repo_root:
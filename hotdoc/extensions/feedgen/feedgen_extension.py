@@ -19,14 +19,13 @@ Page.meta_schema[Optional('feedgen-updated')] = And(date)
 class FeedgenExtension(Extension):
     extension_name = PNAME
     argument_prefix = PNAME
-
-    activated = False
-    __connected = False
-    __base_url = None
-    __feed = FeedGenerator()
+    parallel_setup = True
 
     def __init__(self, app, project):
         self.__repo = None
+        self.activated = False
+        self.base_url = None
+        self.__feed = FeedGenerator()
         Extension.__init__(self, app, project)
 
     @staticmethod
@@ -48,9 +47,9 @@ class FeedgenExtension(Extension):
 
     def parse_toplevel_config(self, config):
         super().parse_toplevel_config(config)
-        FeedgenExtension.activated = bool(
+        self.activated = bool(
             config.get('feedgen_activate', False))
-        FeedgenExtension.base_url = config.get('feedgen_base_url')
+        self.base_url = config.get('feedgen_base_url')
 
     def __writing_page_cb(self, formatter, page, path, lxml_tree):
         if not page.meta.get('add-to-feedgen', True):
@@ -71,11 +70,11 @@ class FeedgenExtension(Extension):
         else:
             updated = None
 
-        entry = FeedgenExtension.__feed.add_entry()
+        entry = self.__feed.add_entry()
 
-        if FeedgenExtension.base_url is not None:
+        if self.base_url is not None:
             href = urllib.parse.urljoin(
-                FeedgenExtension.base_url, page.link.ref)
+                self.base_url, page.link.ref)
         else:
             href = page.link.ref
 
@@ -93,35 +92,37 @@ class FeedgenExtension(Extension):
     def __project_written_out_cb(self, project):
         html_dir = os.path.join(self.app.output, 'html')
 
-        FeedgenExtension.__feed.id(
-            FeedgenExtension.base_url or project.project_name)
-        FeedgenExtension.__feed.title(project.project_name)
+        self.__feed.id(
+            self.base_url or project.project_name)
+        self.__feed.title(project.project_name)
 
-        if FeedgenExtension.base_url is not None:
-            FeedgenExtension.__feed.link(
-                href=FeedgenExtension.base_url,
+        if self.base_url is not None:
+            self.__feed.link(
+                href=self.base_url,
                 type='text/html')
-            FeedgenExtension.__feed.link(
+            self.__feed.link(
                 href=urllib.parse.urljoin(
-                    FeedgenExtension.base_url, 'feed.xml'),
+                    self.base_url, 'feed.xml'),
                 rel='self',
                 type='application/atom+xml')
 
-        FeedgenExtension.__feed.atom_file(
+        self.__feed.atom_file(
             os.path.join(html_dir, 'feed.xml'), pretty=True)
 
     def setup(self):
         super(FeedgenExtension, self).setup()
-        if not FeedgenExtension.activated:
+        # The toplevel project's instance generates the feed of all
+        # the pages
+        toplevel = self.app.project.extensions[self.extension_name]
+        if not toplevel.activated:
             return
 
         for ext in self.project.extensions.values():
-            ext.formatter.writing_page_signal.connect(self.__writing_page_cb)
+            ext.formatter.writing_page_signal.connect(
+                toplevel.__writing_page_cb)
 
-        if FeedgenExtension.__connected:
+        if self is not toplevel:
             return
 
         self.project.written_out_signal.connect_after(
             self.__project_written_out_cb)
-
-        FeedgenExtension.__connected = True
@@ -17,11 +17,6 @@
 # along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
-import html
-from wheezy.template.engine import Engine
-from wheezy.template.ext.core import CoreExtension
-from wheezy.template.ext.code import CodeExtension
-from wheezy.template.loader import FileLoader
 from hotdoc.core.formatter import Formatter
 from hotdoc.core.symbols import *
 import lxml.etree
@@ -35,7 +30,6 @@ PYTHON_VARIADIC_LINK = 'https://docs.python.org/dev/tutorial/controlflow.html#ar
 
 class GIFormatter(Formatter):
     sitemap_language = None
-    engine = None
 
     def __init__(self, gi_extension):
         Formatter.__init__(self, gi_extension)
@@ -55,7 +49,7 @@ class GIFormatter(Formatter):
         self.__annotation_parser = GIAnnotationParser()
 
     def format_annotations(self, annotations):
-        template = self.engine.get_template('gi_annotations.html')
+        template = self.get_template('gi_annotations.html')
         return template.render({'annotations': annotations})
 
     def __add_attrs(self, symbol, **kwargs):
@@ -92,7 +86,7 @@ class GIFormatter(Formatter):
         return self.__wrap_in_language(symbol, langs_docs)
 
     def _format_flags(self, flags):
-        template = self.engine.get_template('gi_flags.html')
+        template = self.get_template('gi_flags.html')
         out = template.render({'flags': flags})
         return out
 
@@ -240,7 +234,7 @@ class GIFormatter(Formatter):
                                                is_pointer, title)
 
         if type(function) == ActionSignalSymbol:
-            template = self.engine.get_template(
+            template = self.get_template(
                 language + '_action_prototype.html')
             res = template.render({
                 'return_value': function.return_value,
@@ -248,7 +242,7 @@ class GIFormatter(Formatter):
                 'parameters': params})
         else:
             c_name = function.make_name()
-            template = self.engine.get_template(language + '_prototype.html')
+            template = self.get_template(language + '_prototype.html')
 
             if type(function) == SignalSymbol:
                 comment = "%s callback for the '%s' signal" % (
@@ -285,7 +279,7 @@ class GIFormatter(Formatter):
         members_list = self._format_members_list(
             struct.members, 'Attributes', struct)
 
-        template = self.engine.get_template("python_compound.html")
+        template = self.get_template("python_compound.html")
         out = template.render({"symbol": struct,
                                "members_list": members_list})
         return out
@@ -311,7 +305,7 @@ class GIFormatter(Formatter):
         if language == 'c':
             return Formatter._format_constant(self, constant)
 
-        template = self.engine.get_template('constant.html')
+        template = self.get_template('constant.html')
         out = template.render({'symbol': constant,
                                'definition': None,
                                'constant': constant})
@@ -359,17 +353,15 @@ class GIFormatter(Formatter):
         return None
 
     def get_template(self, name):
-        return GIFormatter.engine.get_template(name)
+        return self.context.extension_engines[
+            self.extension.extension_name].get_template(name)
 
     def parse_toplevel_config(self, config):
         super().parse_toplevel_config(config)
-        if GIFormatter.engine is None:
+        engines = self.context.extension_engines
+        if self.extension.extension_name not in engines:
             module_path = os.path.dirname(__file__)
             searchpath = [os.path.join(
-                module_path, "html_templates")] + Formatter.engine.loader.searchpath
-            GIFormatter.engine = Engine(
-                loader=FileLoader(searchpath, encoding='UTF-8'),
-                extensions=[CoreExtension(), CodeExtension()])
-            # https://github.com/akornatskyy/wheezy.template/issues/68#issuecomment-1441529466
-            GIFormatter.engine.compiler.source_lineno = 0
-            GIFormatter.engine.global_vars.update({'e': html.escape})
+                module_path, "html_templates")] + self.context.engine.loader.searchpath
+            engines[self.extension.extension_name] = self.context.get_engine(
+                searchpath)
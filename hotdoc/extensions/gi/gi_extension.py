@@ -48,7 +48,7 @@ from hotdoc.extensions.gi.utils import *
 from hotdoc.extensions.gi.node_cache import (
     SMART_FILTERS, get_klass_parents,
     get_klass_children, cache_nodes, type_description_from_node,
-    is_introspectable, is_callback_type)
+    is_introspectable, is_callback_type, reset_caches)
 from hotdoc.extensions.gi.symbols import GIClassSymbol, GIInterfaceSymbol, GIStructSymbol
 
 
@@ -130,6 +130,15 @@ class GIExtension(Extension):
 
     # Chained-up vmethod overrides
 
+    def parse_toplevel_config(self, config):
+        super(GIExtension, self).parse_toplevel_config(config)
+        # The gir caches are shared by the projects of an application,
+        # but must not leak into the next one, eg with --batch or --watch
+        ALL_GIRS.clear()
+        reset_caches()
+        for lang_type in get_language_classes():
+            lang_type.reset()
+
     def parse_config(self, config):
         super(GIExtension, self).parse_config(config)
         ALL_GIRS.update({os.path.basename(s): s for s in self.sources})
@@ -190,6 +199,10 @@ class GIExtension(Extension):
         self.__scan_sources()
         self.__create_macro_symbols()
 
+    def supports_parallel_setup(self):
+        # Scanning sources fills the global GIR caches
+        return not self.sources
+
     def format_page(self, page, link_resolver, output):
         link_resolver.get_link_signal.connect(search_online_links)
 
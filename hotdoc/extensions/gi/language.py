@@ -50,6 +50,15 @@ class Language(Configurable):
         if self.language_name not in ALIASES:
             ALIASES[self.language_name] = {}
 
+    @classmethod
+    def reset(cls):
+        """
+        Forgets the aliases added by previous applications.
+        Extension subclasses caching translations should chain up
+        and forget them too.
+        """
+        ALIASES.pop(cls.language_name, None)
+
     def get_fundamental(self, name):
         """
         Get the Link for the specified fundamental
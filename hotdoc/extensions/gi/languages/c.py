@@ -33,6 +33,11 @@ class CLanguage(Language):
     def __init__(self):
         Language.__init__(self)
 
+    @classmethod
+    def reset(cls):
+        super().reset()
+        TRANSLATED.clear()
+
     def make_translations(self, unique_name, node):
         if node.tag == core_ns('member'):
             TRANSLATED[unique_name] = unique_name
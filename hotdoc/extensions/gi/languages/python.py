@@ -34,6 +34,11 @@ class PythonLanguage(Language):
     def __init__(self):
         Language.__init__(self)
 
+    @classmethod
+    def reset(cls):
+        super().reset()
+        TRANSLATED.clear()
+
     @classmethod
     def _create_fundamentals(cls):
         string_link = \
@@ -2,7 +2,6 @@ import os
 import re
 from collections import defaultdict
 from lxml import etree
-import networkx as nx
 from hotdoc.core.symbols import QualifiedSymbol
 from hotdoc.core.exceptions import BadInclusionException
 from hotdoc.extensions.gi.utils import *
@@ -44,7 +43,20 @@ def __generate_smart_filters(id_prefixes, sym_prefixes, node):
                           (ns_prefix, sym_prefix)).upper())
 
 
-__HIERARCHY_GRAPH = nx.DiGraph()
+__HIERARCHY_GRAPH = None
+
+
+def __get_hierarchy_graph():
+    global __HIERARCHY_GRAPH
+
+    if __HIERARCHY_GRAPH is None:
+        # Importing networkx is slow, and only needed once gir files
+        # are parsed
+        # pylint: disable=import-outside-toplevel
+        import networkx as nx
+        __HIERARCHY_GRAPH = nx.DiGraph()
+
+    return __HIERARCHY_GRAPH
 
 
 ALL_GI_TYPES = {}
@@ -80,6 +92,22 @@ def __find_gir_file(gir_name, all_girs):
 __TRANSLATED_NAMES = {l: {} for l in OUTPUT_LANGUAGES}
 
 
+def reset_caches():
+    """
+    Forgets the gir files parsed by previous applications, and the
+    types and names cached from them.
+    """
+    global __HIERARCHY_GRAPH
+
+    __HIERARCHY_GRAPH = None
+    SMART_FILTERS.clear()
+    ALL_GI_TYPES.clear()
+    ALL_CALLBACK_TYPES.clear()
+    __PARSED_GIRS.clear()
+    for names in __TRANSLATED_NAMES.values():
+        names.clear()
+
+
 def get_field_c_name_components(node, components):
     parent = node.getparent()
     if parent.tag != core_ns('namespace'):
@@ -100,17 +128,17 @@ def __update_hierarchies(cur_ns, node, gi_name):
     parent_name = node.attrib.get('parent')
     if not parent_name:
         # fundamental
-        __HIERARCHY_GRAPH.add_node(gi_name)
+        __get_hierarchy_graph().add_node(gi_name)
         return
 
     if not '.' in parent_name:
         parent_name = '%s.%s' % (cur_ns, parent_name)
 
-    __HIERARCHY_GRAPH.add_edge(parent_name, gi_name)
+    __get_hierarchy_graph().add_edge(parent_name, gi_name)
 
 
 def __get_parent_link_recurse(gi_name, res):
-    parents = list(__HIERARCHY_GRAPH.predecessors(gi_name))
+    parents = list(__get_hierarchy_graph().predecessors(gi_name))
     if parents:
         __get_parent_link_recurse(list(parents)[0], res)
     ctype_name = ALL_GI_TYPES[gi_name]
@@ -126,7 +154,7 @@ def get_klass_parents(gi_name):
     the parents of the klass-like symbol named gi_name
     '''
     res = []
-    parents = list(__HIERARCHY_GRAPH.predecessors(gi_name))
+    parents = list(__get_hierarchy_graph().predecessors(gi_name))
     if not parents:
         return []
     __get_parent_link_recurse(parents[0], res)
@@ -139,7 +167,7 @@ def get_klass_children(gi_name):
     the children of the klass-like symbol named gi_name
     '''
     res = {}
-    children = __HIERARCHY_GRAPH.successors(gi_name)
+    children = __get_hierarchy_graph().successors(gi_name)
     for gi_name in children:
         ctype_name = ALL_GI_TYPES[gi_name]
         qs = QualifiedSymbol(type_tokens=[Link(None, ctype_name, ctype_name)])
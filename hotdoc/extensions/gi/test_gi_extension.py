@@ -161,3 +161,21 @@ class TestNodeCaching(unittest.TestCase):
         self.assertEqual(type_desc.gi_name, 'utf8')
         self.assertEqual(type_desc.c_name, 'gchar***')
         self.assertEqual(type_desc.nesting_depth, 2)
+
+    def test_reset_caches(self):
+        test_data = GIR_TEMPLATE % TEST_GREETER_LIST_GREETS
+        gir_root = etree.fromstring(test_data)
+        pythonlang = PYTHON_LANG.get_language_classes()[0]()
+        CACHE_MODULE.cache_nodes(gir_root, [], {pythonlang})
+        self.assertEqual(
+            pythonlang.get_translation('test_greeter_list_greets'),
+            'Test.list_greets')
+        CACHE_MODULE.reset_caches()
+        type(pythonlang).reset()
+        self.assertIsNone(
+            pythonlang.get_translation('test_greeter_list_greets'))
+        # Parsed again by the next application
+        CACHE_MODULE.cache_nodes(gir_root, [], {pythonlang})
+        self.assertEqual(
+            pythonlang.get_translation('test_greeter_list_greets'),
+            'Test.list_greets')
@@ -79,6 +79,7 @@ class GitUploadExtension(Extension):
     """Extension to upload generated doc to a git repository"""
     extension_name = 'git-upload'
     argument_prefix = 'git-upload'
+    parallel_setup = True
 
     activated = False
 
@@ -19,15 +19,9 @@
 
 import re
 import os
-import json
-import html
 
 from tempfile import TemporaryDirectory
 
-from wheezy.template.engine import Engine
-from wheezy.template.ext.core import CoreExtension
-from wheezy.template.ext.code import CodeExtension
-from wheezy.template.loader import FileLoader
 from hotdoc.extensions import gi
 from hotdoc.extensions.gi.languages import CLanguage
 from hotdoc.core.links import Link
@@ -44,6 +38,7 @@ from hotdoc.core.comment import Comment
 from hotdoc.extensions.gi.gi_extension import WritableFlag, ReadableFlag, \
     ConstructFlag, ConstructOnlyFlag
 from hotdoc.extensions.gi.symbols import GIClassSymbol, GIInterfaceSymbol
+from hotdoc.extensions.gst.plugin_cache import GstPluginCache
 
 
 DESCRIPTION =\
@@ -304,8 +299,6 @@ class GstPadTemplateSymbol(Symbol):
 
 
 class GstFormatter(Formatter):
-    engine = None
-
     def __init__(self, extension):
         self.__tmpdir = TemporaryDirectory()
         with open(os.path.join(self.__tmpdir.name, "padtemplate.html"), "w") as _:
@@ -351,20 +344,18 @@ class GstFormatter(Formatter):
         return Formatter._format_parameter_symbol(self, parameter)
 
     def get_template(self, name):
-        return GstFormatter.engine.get_template(name)
+        return self.context.extension_engines[
+            self.extension.extension_name].get_template(name)
 
     def parse_toplevel_config(self, config):
         super().parse_toplevel_config(config)
-        if GstFormatter.engine is None:
+        engines = self.context.extension_engines
+        if self.extension.extension_name not in engines:
             gi_extension_path = os.path.dirname(gi.__file__)
             searchpath = [os.path.join(gi_extension_path, "html_templates"),
-                          self.__tmpdir.name] + Formatter.engine.loader.searchpath
-            GstFormatter.engine = Engine(
-                loader=FileLoader(searchpath, encoding='UTF-8'),
-                extensions=[CoreExtension(), CodeExtension()])
-            # https://github.com/akornatskyy/wheezy.template/issues/68#issuecomment-1441529466
-            GstFormatter.engine.compiler.source_lineno = 0
-            GstFormatter.engine.global_vars.update({'e': html.escape})
+                          self.__tmpdir.name] + self.context.engine.loader.searchpath
+            engines[self.extension.extension_name] = self.context.get_engine(
+                searchpath)
 
     def __del__(self):
         self.__tmpdir.cleanup()
@@ -455,18 +446,18 @@ class GstFormatter(Formatter):
     def _format_plugins_symbol(self, symbol):
         for plugin in symbol.plugins:
             self.__populate_plugin_infos(plugin)
-        template = self.engine.get_template('plugins.html')
+        template = self.get_template('plugins.html')
         return template.render({'symbol': symbol,
                                 'unique_feature': self.extension.unique_feature})
 
     def _format_plugin_symbol(self, symbol):
         self.__populate_plugin_infos(symbol)
-        template = self.engine.get_template('plugin.html')
+        template = self.get_template('plugin.html')
         return template.render({'symbol': symbol,
                                 'unique_feature': self.extension.unique_feature})
 
     def _format_pad_template_symbol(self, symbol):
-        template = self.engine.get_template('padtemplate.html')
+        template = self.get_template('padtemplate.html')
         symbol.object_type.rendered_link = self._format_linked_symbol(
             symbol.object_type)
         return template.render({'symbol': symbol})
@@ -474,7 +465,7 @@ class GstFormatter(Formatter):
     def _format_element_symbol(self, symbol):
         hierarchy = self._format_hierarchy(symbol)
 
-        template = self.engine.get_template('element.html')
+        template = self.get_template('element.html')
         interfaces = []
         for interface in symbol.interfaces:
             interfaces.append(self._format_linked_symbol(interface))
@@ -482,7 +473,7 @@ class GstFormatter(Formatter):
                                 'interfaces': interfaces})
 
     def _format_name_constant_value(self, symbol):
-        template = self.engine.get_template('enumtemplate.html')
+        template = self.get_template('enumtemplate.html')
         return template.render({'symbol': symbol})
 
     def _format_enum(self, enum):
@@ -491,7 +482,7 @@ class GstFormatter(Formatter):
         return res
 
     def format_flags(self, flags):
-        template = self.engine.get_template('gi_flags.html')
+        template = self.get_template('gi_flags.html')
         out = template.render({'flags': flags})
         return out
 
@@ -501,13 +492,14 @@ class GstExtension(Extension):
     extension_name = 'gst-extension'
     argument_prefix = 'gst'
     __dual_links = {}  # Maps myelement:XXX to GstMyElement:XXX
-    __parsed_cfiles = set()
-    __caches = {}  # cachefile -> dict
-    __all_plugins_symbols = set()
 
     def __init__(self, app, project):
         super().__init__(app, project)
-        self.cache = {}
+        # Only used on the toplevel project's instance, see __get_toplevel
+        self.__parsed_cfiles = set()
+        self.__caches = {}  # cachefile -> GstPluginCache
+        self.__all_plugins_symbols = set()
+        self.cache = None
         self.c_sources = []
         self.cache_file = None
         self.plugin = None
@@ -515,6 +507,7 @@ class GstExtension(Extension):
         self.__raw_comment_parser = GtkDocParser(
             project, section_file_matching=False)
         self.__plugins = None
+        self.__plugin_symbols = []
         self.__toplevel_comments = OrderedSet()
         self.list_plugins_page = None
         # If we have a plugin with only one element, we render it on the plugin
@@ -557,11 +550,12 @@ class GstExtension(Extension):
         gather_links()
 
         comment_parser = GtkDocParser(self.project, False)
-        to_parse_sources = set(self.c_sources) - GstExtension.__parsed_cfiles
+        toplevel = self.__get_toplevel()
+        to_parse_sources = set(self.c_sources) - toplevel.__parsed_cfiles
 
         CCommentExtractor(self, comment_parser).parse_comments(
             to_parse_sources)
-        GstExtension.__parsed_cfiles.update(self.c_sources)
+        toplevel.__parsed_cfiles.update(self.c_sources)
 
         self.debug("Parsing plugin %s, (cache file %s)" %
                    (self.plugin, self.cache_file))
@@ -580,13 +574,14 @@ class GstExtension(Extension):
             elif pname.startswith('gst'):
                 pname = pname[3:]
             try:
-                plugin_node = {pname: self.cache[pname]}
+                plugin_nodes = [(pname, self.cache[pname])]
             except KeyError:
                 error('setup-issue', "Plugin %s not found" % pname)
         else:
-            plugin_node = self.cache
+            # Plugins are decoded one at a time
+            plugin_nodes = self.cache.items()
 
-        for libfile, plugin in plugin_node.items():
+        for libfile, plugin in plugin_nodes:
             plugin_sym = self.__parse_plugin(libfile, plugin)
             if not plugin_sym:
                 continue
@@ -603,6 +598,42 @@ class GstExtension(Extension):
 
         super().setup()
 
+    def __get_toplevel(self):
+        # The toplevel project's instance holds the state shared by the
+        # instances of all the projects
+        return self.app.project.extensions[self.extension_name]
+
+    def supports_parallel_setup(self):
+        # The list of all plugins can only be made once every plugin
+        # has been parsed
+        return self.list_plugins_page is None
+
+    def get_setup_state(self):
+        # Pickled at once, so __plugins stays one of __plugin_symbols
+        return {'plugin_symbols': self.__plugin_symbols,
+                'plugins': self.__plugins,
+                'unique_feature': self.unique_feature,
+                'on_index_symbols': self.__on_index_symbols,
+                'toplevel_comments': self.__toplevel_comments}
+
+    def restore_setup(self, state):
+        gi_extension = self.project.extensions.get('gi-extension')
+        self.gi_languages = [
+            lang.language_name for lang in gi_extension.languages]
+
+        if not self.cache_file:
+            return
+
+        gather_links()
+        toplevel = self.__get_toplevel()
+        toplevel.__parsed_cfiles.update(self.c_sources)
+        self.__plugin_symbols = state['plugin_symbols']
+        self.__plugins = state['plugins']
+        self.unique_feature = state['unique_feature']
+        self.__on_index_symbols = state['on_index_symbols']
+        self.__toplevel_comments = state['toplevel_comments']
+        toplevel.__all_plugins_symbols.update(self.__plugin_symbols)
+
     def _get_comment_smart_key(self, comment):
         try:
             return comment.title.description
@@ -647,7 +678,7 @@ class GstExtension(Extension):
         page.extension_name = self.extension_name
 
         page.symbol_names.add(self.__plugins.unique_name)
-        self.__plugins.plugins = self.__all_plugins_symbols
+        self.__plugins.plugins = self.__get_toplevel().__all_plugins_symbols
 
         return smart_pages
 
@@ -681,19 +712,13 @@ class GstExtension(Extension):
         self.list_plugins_page = config.get('gst_list_plugins_page', None)
         info('Parsing config!')
 
-        self.cache = {}
+        self.cache = None
         if self.cache_file:
-            self.cache = GstExtension.__caches.get(self.cache_file)
-            if not self.cache:
-                try:
-                    with open(self.cache_file) as _:
-                        self.cache = json.load(_)
-                except FileNotFoundError:
-                    pass
-
-                if self.cache is None:
-                    self.cache = {}
-                GstExtension.__caches[self.cache_file] = self.cache
+            caches = self.__get_toplevel().__caches
+            self.cache = caches.get(self.cache_file)
+            if self.cache is None:
+                self.cache = GstPluginCache(self.cache_file)
+                caches[self.cache_file] = self.cache
 
         super().parse_config(config)
 
@@ -1111,7 +1136,8 @@ class GstExtension(Extension):
         if not plugin:
             return None
 
-        self.__all_plugins_symbols.add(plugin)
+        self.__get_toplevel().__all_plugins_symbols.add(plugin)
+        self.__plugin_symbols.append(plugin)
 
         if self.plugin:
             self.__plugins = plugin
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2018 Thibault Saunier <tsaunier@igalia.com>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Lazy access to the plugins described in a GStreamer plugins cache file.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+import appdirs
+
+from hotdoc.utils.loggable import debug, error
+
+
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+
+def _skip_whitespace(text, idx):
+    return _WHITESPACE_RE.match(text, idx).end()
+
+
+def _expect(text, idx, char):
+    if text[idx] != char:
+        raise ValueError("Expecting '%s' at position %d" % (char, idx))
+    return idx + 1
+
+
+def index_plugins(path):
+    """
+    Scans the plugins cache file at @path and returns a list of
+    (plugin name, start offset, end offset) tuples, the offsets delimiting
+    in bytes the JSON description of each plugin.
+
+    Plugins are decoded one at a time, the cache is never fully
+    materialized.
+
+    Raises:
+        ValueError: if the file is not a valid plugins cache.
+    """
+    with open(path, 'rb') as _:
+        data = _.read()
+
+    text = data.decode('utf-8')
+    ascii_only = len(text) == len(data)
+    del data
+
+    # Converting character offsets to byte offsets is only required
+    # when the cache contains non-ascii characters
+    last_char = last_byte = 0
+
+    def byte_offset(char_offset):
+        nonlocal last_char, last_byte
+        if ascii_only:
+            return char_offset
+        last_byte += len(text[last_char:char_offset].encode('utf-8'))
+        last_char = char_offset
+        return last_byte
+
+    decoder = json.JSONDecoder()
+    res = []
+
+    try:
+        idx = _expect(text, _skip_whitespace(text, 0), '{')
+        idx = _skip_whitespace(text, idx)
+        if text[idx] == '}':
+            return res
+
+        while True:
+            name, idx = decoder.raw_decode(text, idx)
+            if not isinstance(name, str):
+                raise ValueError("Expecting a plugin name at position %d" %
+                                 idx)
+            idx = _skip_whitespace(text, idx)
+            idx = _skip_whitespace(text, _expect(text, idx, ':'))
+            start = idx
+            _, idx = decoder.raw_decode(text, idx)
+            res.append((name, byte_offset(start), byte_offset(idx)))
+
+            idx = _skip_whitespace(text, idx)
+            if text[idx] == '}':
+                break
+            idx = _skip_whitespace(text, _expect(text, idx, ','))
+    except IndexError as exc:
+        raise ValueError("Unexpected end of file") from exc
+
+    return res
+
+
+class GstPluginCache:
+    """
+    Read-only, mapping-like view of a GStreamer plugins cache file.
+
+    The description of a plugin is only decoded when it is requested,
+    thanks to an index mapping plugin names to byte ranges in the cache
+    file. That index is persisted in the user cache directory, and only
+    regenerated when the cache file changes.
+    """
+
+    # Bump this whenever the format of the persisted index changes
+    INDEX_VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.__index = None
+
+    def __get_index_path(self):
+        key = hashlib.sha256(
+            os.path.abspath(self.path).encode('utf-8')).hexdigest()
+        return os.path.join(appdirs.user_cache_dir("hotdoc", "hotdoc"),
+                            'gst-plugins-cache-indexes', '%s.json' % key)
+
+    def __load_persisted_index(self, index_path, stamp):
+        try:
+            with open(index_path, 'r', encoding='utf-8') as _:
+                persisted = json.load(_)
+        except (OSError, ValueError):
+            return None
+
+        if persisted.get('version') != GstPluginCache.INDEX_VERSION or \
+                persisted.get('stamp') != stamp:
+            return None
+
+        return persisted['plugins']
+
+    # pylint: disable=no-self-use
+    def __persist_index(self, index_path, stamp, plugins):
+        tmp_path = '%s.%d.tmp' % (index_path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as _:
+                json.dump({'version': GstPluginCache.INDEX_VERSION,
+                           'stamp': stamp,
+                           'plugins': plugins}, _)
+            os.replace(tmp_path, index_path)
+        except OSError as exc:
+            debug('Could not persist gst plugins cache index at %s: %s' %
+                  (index_path, exc))
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def __get_index(self):
+        if self.__index is not None:
+            return self.__index
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.__index = {}
+            return self.__index
+
+        stamp = [stat.st_mtime, stat.st_size]
+        index_path = self.__get_index_path()
+        plugins = self.__load_persisted_index(index_path, stamp)
+
+        if plugins is None:
+            debug('Indexing gst plugins cache %s' % self.path)
+            try:
+                plugins = index_plugins(self.path)
+            except ValueError as exc:
+                error('setup-issue',
+                      'Could not parse gst plugins cache %s: %s' %
+                      (self.path, exc))
+            self.__persist_index(index_path, stamp, plugins)
+
+        self.__index = {name: (start, end) for name, start, end in plugins}
+        return self.__index
+
+    def __len__(self):
+        return len(self.__get_index())
+
+    def __contains__(self, name):
+        return name in self.__get_index()
+
+    def __iter__(self):
+        return iter(self.__get_index())
+
+    def __getitem__(self, name):
+        start, end = self.__get_index()[name]
+        with open(self.path, 'rb') as _:
+            _.seek(start)
+            return json.loads(_.read(end - start))
+
+    def keys(self):
+        """
+        Returns the names of the plugins in the cache.
+        """
+        return self.__get_index().keys()
+
+    def items(self):
+        """
+        Yields (plugin name, plugin description) tuples, decoding the
+        descriptions one at a time.
+        """
+        index = self.__get_index()
+        if not index:
+            return
+
+        with open(self.path, 'rb') as _:
+            for name, (start, end) in index.items():
+                _.seek(start)
+                yield name, json.loads(_.read(end - start))
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from hotdoc.run_hotdoc import run
+from hotdoc.utils.loggable import Logger
+
+
+def _make_plugin(name, elements):
+    return {
+        'description': 'The %s plugin' % name,
+        'filename': 'gst%s' % name,
+        'license': 'LGPL',
+        'package': 'GStreamer',
+        'source': 'gstreamer',
+        'other-types': {},
+        'elements': {
+            element: {
+                'author': 'Someone',
+                'description': 'The %s element' % element,
+                'hierarchy': ['Gst%s' % element.title(), 'GstElement',
+                              'GObject'],
+                'klass': 'Generic',
+                'long-name': element,
+                'rank': 'none',
+            } for element in elements}}
+
+
+PLUGINS = {
+    'single': _make_plugin('single', ['lonelysink']),
+    'double': _make_plugin('double', ['firstsrc', 'secondsrc']),
+}
+
+
+class TestGstExtension(unittest.TestCase):
+    def setUp(self):
+        self.__tmpdir = tempfile.mkdtemp()
+        self.__orig_cwd = os.getcwd()
+        self.__orig_cache_home = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.__tmpdir, 'cache')
+        self.__cache_path = self.__write_file(
+            'gst_plugins_cache.json', json.dumps(PLUGINS))
+
+    def tearDown(self):
+        os.chdir(self.__orig_cwd)
+        if self.__orig_cache_home is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.__orig_cache_home
+        shutil.rmtree(self.__tmpdir)
+
+    def __write_file(self, name, contents):
+        path = os.path.join(self.__tmpdir, name)
+        with open(path, 'w', encoding='utf-8') as _:
+            _.write(contents)
+        return path
+
+    def __build(self, jobs):
+        sitemap = ['index.markdown']
+        for plugin in PLUGINS:
+            sitemap.append('\t%s.json' % plugin)
+            self.__write_file('%s.md' % plugin, '# %s\n' % plugin)
+            self.__write_file('%s.txt' % plugin, 'gst-index\n')
+            self.__write_file('%s.json' % plugin, json.dumps({
+                'project_name': plugin,
+                'project_version': '1.0',
+                'sitemap': '%s.txt' % plugin,
+                'include_paths': [self.__tmpdir],
+                'gst_index': '%s.md' % plugin,
+                'gst_cache_file': self.__cache_path,
+                'gst_plugin_name': plugin}))
+        index_path = self.__write_file('index.markdown', '# Plugins\n')
+        sitemap_path = self.__write_file('sitemap.txt', '\n'.join(sitemap))
+
+        # Each build has its own private folder
+        build_dir = os.path.join(self.__tmpdir, 'build-%d' % jobs)
+        os.mkdir(build_dir)
+        os.chdir(build_dir)
+        output = os.path.join(build_dir, 'output')
+        Logger.reset()
+        Logger.silent = True
+        self.assertEqual(run(['--index', index_path,
+                              '--output', output,
+                              '--project-name', 'gst-plugins',
+                              '--project-version', '1.0',
+                              '--sitemap', sitemap_path,
+                              '--subprojects-jobs', str(jobs),
+                              'run']), 0)
+
+        html_dir = os.path.join(output, 'html')
+        pages = {}
+        for plugin in PLUGINS:
+            for name in os.listdir(os.path.join(html_dir, plugin)):
+                if name.endswith('.html'):
+                    with open(os.path.join(html_dir, plugin, name),
+                              encoding='utf-8') as _:
+                        pages[os.path.join(plugin, name)] = _.read()
+        return pages
+
+    def test_parallel_subprojects(self):
+        serial_pages = self.__build(1)
+        self.assertIn('lonelysink', serial_pages['single/single.html'])
+        self.assertDictEqual(self.__build(2), serial_pages)
+
+
+if __name__ == '__main__':
+    unittest.main()
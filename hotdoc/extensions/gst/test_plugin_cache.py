@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2018 Thibault Saunier <tsaunier@igalia.com>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from collections import OrderedDict
+
+from hotdoc.extensions.gst.plugin_cache import GstPluginCache, index_plugins
+
+
+PLUGINS = OrderedDict([
+    ('coreelements', {
+        'description': 'GStreamer core elements',
+        'elements': {'fakesink': {'author': 'Erik Walthinsen'}},
+    }),
+    ('audiotestsrc', {
+        'description': 'Créé un signal audio, «avec des accents»',
+        'elements': {},
+    }),
+    ('empty', {}),
+])
+
+
+class TestGstPluginCache(unittest.TestCase):
+    def setUp(self):
+        self.__tmpdir = tempfile.mkdtemp()
+        self.__cache_path = os.path.join(self.__tmpdir, 'gst_plugins_cache.json')
+        self.__orig_cache_home = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.__tmpdir, 'cache')
+
+    def tearDown(self):
+        if self.__orig_cache_home is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.__orig_cache_home
+        shutil.rmtree(self.__tmpdir)
+
+    def __write_cache(self, plugins, indent=None):
+        with open(self.__cache_path, 'w', encoding='utf-8') as _:
+            json.dump(plugins, _, indent=indent, ensure_ascii=False)
+
+    def test_index_plugins(self):
+        for indent in (None, 4):
+            self.__write_cache(PLUGINS, indent=indent)
+            with open(self.__cache_path, 'rb') as _:
+                data = _.read()
+
+            index = index_plugins(self.__cache_path)
+            self.assertEqual([name for name, _, _ in index], list(PLUGINS))
+            for name, start, end in index:
+                self.assertEqual(json.loads(data[start:end]), PLUGINS[name])
+
+    def test_lookup(self):
+        self.__write_cache(PLUGINS)
+
+        cache = GstPluginCache(self.__cache_path)
+        self.assertEqual(len(cache), 3)
+        self.assertIn('audiotestsrc', cache)
+        self.assertNotIn('videotestsrc', cache)
+        self.assertEqual(cache['audiotestsrc'], PLUGINS['audiotestsrc'])
+        self.assertEqual(list(cache.items()), list(PLUGINS.items()))
+
+        with self.assertRaises(KeyError):
+            _ = cache['videotestsrc']
+
+    def test_index_is_reused(self):
+        self.__write_cache(PLUGINS)
+        GstPluginCache(self.__cache_path).keys()
+
+        # The persisted index is used as long as the cache file is unchanged
+        cache = GstPluginCache(self.__cache_path)
+        self.assertEqual(cache['empty'], {})
+
+        plugins = OrderedDict(PLUGINS)
+        plugins['videotestsrc'] = {'description': 'Video test source'}
+        self.__write_cache(plugins, indent=2)
+        cache = GstPluginCache(self.__cache_path)
+        self.assertEqual(list(cache.keys()), list(plugins))
+        self.assertEqual(cache['videotestsrc'], plugins['videotestsrc'])
+
+    def test_missing_cache(self):
+        cache = GstPluginCache(os.path.join(self.__tmpdir, 'nope.json'))
+        self.assertFalse(cache)
+        self.assertEqual(list(cache.items()), [])
@@ -25,7 +25,6 @@ from collections import namedtuple, OrderedDict
 from schema import Schema, SchemaError, And, Use, Optional
 
 from hotdoc.core.extension import Extension
-from hotdoc.core.formatter import Formatter
 from hotdoc.core.tree import Page
 from hotdoc.core.exceptions import HotdocException
 from hotdoc.utils.loggable import error, Logger
@@ -130,11 +129,11 @@ ALL_LICENSES = {
 class LicenseExtension(Extension):
     extension_name = 'license-extension'
     argument_prefix = 'license'
-    connected = False
-    installed_assets = set()
+    parallel_setup = True
 
     def __init__(self, app, project):
         Extension.__init__(self, app, project)
+        self.installed_assets = set()
         self.default_license = None
         self.default_code_samples_license = None
         self.default_copyright_holders = []
@@ -188,7 +187,7 @@ class LicenseExtension(Extension):
                 self.__extra_copyrights_for_page(page))
 
     def license_content(self, page, license_, designation):
-        template = Formatter.engine.get_template('license.html')
+        template = self.formatter.context.engine.get_template('license.html')
         if license_.logo_path:
             logo_path = os.path.join(
                 'assets', os.path.basename(license_.logo_path))
@@ -201,9 +200,12 @@ class LicenseExtension(Extension):
              'content_designation': designation})
         page.output_attrs['html']['extra_footer_html'].insert(0, formatted)
 
-        LicenseExtension.installed_assets.add(license_.plain_text_path)
+        # The toplevel project's instance installs the assets of all
+        # the pages
+        toplevel = self.app.project.extensions[self.extension_name]
+        toplevel.installed_assets.add(license_.plain_text_path)
         if license_.logo_path:
-            LicenseExtension.installed_assets.add(license_.logo_path)
+            toplevel.installed_assets.add(license_.logo_path)
 
     def __formatting_page_cb(self, formatter, page):
         # hotdoc doesn't claim a copyright
@@ -212,7 +214,8 @@ class LicenseExtension(Extension):
 
         copyrights = self.__copyrights_for_page(page)
         if copyrights:
-            template = Formatter.engine.get_template('copyrights.html')
+            template = formatter.context.engine.get_template(
+                'copyrights.html')
             formatted = template.render({'copyrights': copyrights})
             page.output_attrs['html']['extra_footer_html'].insert(0, formatted)
 
@@ -231,7 +234,7 @@ class LicenseExtension(Extension):
 
     def __get_extra_files_cb(self, formatter):
         res = []
-        for asset in LicenseExtension.installed_assets:
+        for asset in self.installed_assets:
             src = asset
             dest = os.path.basename(src)
             res.append((src, dest))
@@ -240,7 +243,8 @@ class LicenseExtension(Extension):
     def __formatted_cb(self, project):
         assets_licenses = []
 
-        licensing = OrderedDict(Formatter.theme_meta.get('assets', {}))
+        licensing = OrderedDict(
+            self.formatter.context.theme_meta.get('assets', {}))
         for name, extension in self.app.extension_classes.items():
             licensing.update(extension.get_assets_licensing())
 
@@ -255,7 +259,7 @@ class LicenseExtension(Extension):
                 license = info['license']
                 if license in ALL_LICENSES:
                     license = ALL_LICENSES[license]
-                    LicenseExtension.installed_assets.add(
+                    self.installed_assets.add(
                         license.plain_text_path)
                     licensing_text += ['is licensed under the [{} ({})]({}) license.'.format(
                         license.full_name, license.short_name, license.url)]
@@ -276,11 +280,10 @@ class LicenseExtension(Extension):
             ext.formatter.formatting_page_signal.connect(
                 self.__formatting_page_cb)
 
-        if not LicenseExtension.connected:
-            Formatter.get_extra_files_signal.connect(
+        if self.project.is_toplevel:
+            self.formatter.context.get_extra_files_signal.connect(
                 self.__get_extra_files_cb)
-            self.app.project.formatted_signal.connect(self.__formatted_cb)
-            LicenseExtension.connected = True
+            self.project.formatted_signal.connect(self.__formatted_cb)
 
     @staticmethod
     def add_arguments(parser):
@@ -304,7 +307,10 @@ class LicenseExtension(Extension):
     def parse_toplevel_config(self, config):
         super().parse_toplevel_config(config)
         template_path = os.path.join(HERE, 'html_templates')
-        Formatter.engine.loader.searchpath.append(template_path)
+        # The engine may be shared with other applications
+        searchpath = self.formatter.context.engine.loader.searchpath
+        if template_path not in searchpath:
+            searchpath.append(template_path)
 
     def parse_config(self, config):
         super(LicenseExtension, self).parse_config(config)
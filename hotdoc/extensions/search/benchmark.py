@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark of the writing of the search index, and of the size of the
+search trie, on a synthetic site.
+
+    python3 -m hotdoc.extensions.search.benchmark --pages 2000 \\
+        --fragment-bundles 0 64 256 --jobs 1 4 --trie-prefix-lengths 0 1 2
+
+With --trace-memory, the peak memory usage of building and writing the
+index is measured, excluding the memory of the pages.
+
+With --symbols, the index of that number of symbol names is also built
+and written, as with the --search-symbols-only option.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import statistics
+import string
+import tempfile
+import time
+import tracemalloc
+from itertools import groupby
+
+from hotdoc.extensions.search.indexer import (
+    SearchIndex, MAX_RECORDS, tokenize)
+from hotdoc.extensions.search.trie import (
+    Trie, encode_js, encode_shard_js, get_shard_name)
+from hotdoc.utils.output import OutputManifest
+
+
+def make_pages(n_pages, n_sections, n_words, seed=0):
+    """
+    Returns @n_pages synthetic pages, see `indexer.parse_page`, with
+    @n_sections sections of a few paragraphs each, using a vocabulary
+    of @n_words words.
+    """
+    rand = random.Random(seed)
+    vocabulary = set()
+    while len(vocabulary) < n_words:
+        prefix = rand.choice(('gst_', 'gtk_', 'g_', '', '', ''))
+        vocabulary.add(prefix + ''.join(
+            rand.choice(string.ascii_lowercase)
+            for _ in range(rand.randint(3, 12))))
+    vocabulary = sorted(vocabulary)
+    pages = []
+    for i in range(n_pages):
+        entries = []
+        for j in range(n_sections):
+            for node_type in ('h2', 'p', 'p', 'ul'):
+                tokens = rand.sample(vocabulary, 12)
+                entries.append(['section-%d' % j, node_type, 'default',
+                                ['Page %d' % i, 'Section %d' % j],
+                                ' '.join(tokens), tokens])
+        pages.append(('page-%d.html' % i,
+                      {'title': 'Page %d' % i, 'entries': entries}))
+    return pages, vocabulary
+
+
+def measure(pages, fragment_bundles, max_records, jobs):
+    """
+    Builds and writes the index of @pages twice in a temporary folder,
+    and returns the times it took, the number of files and the disk
+    usage.
+    """
+    html_dir = tempfile.mkdtemp(prefix='hotdoc-search-benchmark-')
+    try:
+        # The second time, nothing changed, files are only compared
+        times = []
+        for _ in range(2):
+            start = time.perf_counter()
+            index = SearchIndex(fragment_bundles, max_records)
+            for rel_path, page in pages:
+                index.add_page(rel_path, page)
+            index.write(html_dir, OutputManifest(), jobs)
+            times.append(time.perf_counter() - start)
+
+        n_files = 0
+        usage = 0
+        for root, _, files in os.walk(html_dir):
+            for name in files:
+                stat = os.stat(os.path.join(root, name))
+                n_files += 1
+                usage += stat.st_blocks * 512
+    finally:
+        shutil.rmtree(html_dir)
+
+    return times[0], times[1], n_files, usage
+
+
+def measure_symbols(vocabulary, n_symbols, fragment_bundles):
+    """
+    Builds and writes the index of @n_symbols symbols named after the
+    words of @vocabulary, 100 per page, in a temporary folder, and
+    returns the times building and writing it took.
+    """
+    html_dir = tempfile.mkdtemp(prefix='hotdoc-search-benchmark-')
+    try:
+        start = time.perf_counter()
+        index = SearchIndex(fragment_bundles)
+        for i in range(n_symbols):
+            name = '%s_%d' % (vocabulary[i % len(vocabulary)], i)
+            index.add_url('page-%d.html#%s' % (i // 100, name),
+                          'Page %d' % (i // 100), 'symbol',
+                          ['Page %d' % (i // 100)], name,
+                          tokenize(name, ()))
+        built = time.perf_counter()
+        index.write(html_dir, OutputManifest())
+        written = time.perf_counter()
+    finally:
+        shutil.rmtree(html_dir)
+
+    return built - start, written - built
+
+
+def measure_trie(words, prefix_length):
+    """
+    Returns the number of shards the trie of @words is split in for
+    @prefix_length, 0 meaning a single trie, along with the total size
+    of the scripts holding them, gzipped and not, and the gzipped size
+    of what the client downloads before its first lookup: the whole
+    trie, or the index of the shards and the median shard.
+    """
+    if prefix_length:
+        groups = groupby(sorted(words), key=lambda word: word[:prefix_length])
+    else:
+        groups = [('', words)]
+
+    sizes = []
+    compressed_sizes = []
+    shards = {}
+    for prefix, shard_words in groups:
+        trie = Trie()
+        for word in shard_words:
+            trie.add_word(word)
+        if prefix_length:
+            contents = encode_shard_js(prefix, trie.encode())
+        else:
+            contents = encode_js(trie.encode())
+        contents = contents.encode('utf-8')
+        shards[prefix] = get_shard_name(prefix)
+        sizes.append(len(contents))
+        compressed_sizes.append(len(gzip.compress(contents)))
+
+    first_lookup = statistics.median_low(compressed_sizes)
+    if prefix_length:
+        first_lookup += len(gzip.compress(json.dumps(
+            {'prefix_length': prefix_length,
+             'shards': shards}).encode('utf-8')))
+
+    return len(sizes), sum(sizes), sum(compressed_sizes), first_lookup
+
+
+def main():
+    """
+    Banana banana
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--sections', type=int, default=10)
+    parser.add_argument('--words', type=int, default=20000)
+    parser.add_argument('--fragment-bundles', type=int, nargs='+',
+                        default=[0, 64, 256])
+    parser.add_argument('--max-records', type=int, nargs='+',
+                        default=[MAX_RECORDS])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1])
+    parser.add_argument('--trie-prefix-lengths', type=int, nargs='+',
+                        default=[0, 1, 2, 3])
+    parser.add_argument('--bandwidth', type=float, default=10,
+                        help='The bandwidth of the clients, in Mbit/s, to '
+                        'estimate the time before their first lookup')
+    parser.add_argument('--symbols', type=int, default=0,
+                        help='Also measure the index of this number of '
+                        'symbol names')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Measure the peak memory usage, which makes '
+                        'the index much slower to write')
+    args = parser.parse_args()
+
+    pages, vocabulary = make_pages(args.pages, args.sections, args.words)
+    print('%d pages, %d sections' % (args.pages,
+                                     args.pages * args.sections))
+    print('%8s %8s %5s %10s %12s %8s %11s %11s' % (
+        'bundles', 'records', 'jobs', 'write (s)', 'rewrite (s)', 'files',
+        'disk (MiB)', 'peak (MiB)'))
+    for fragment_bundles in args.fragment_bundles:
+        for max_records in args.max_records:
+            for jobs in args.jobs:
+                if args.trace_memory:
+                    tracemalloc.start()
+                first, second, n_files, usage = measure(
+                    pages, fragment_bundles, max_records, jobs)
+                peak = '-'
+                if args.trace_memory:
+                    peak = '%.1f' % (
+                        tracemalloc.get_traced_memory()[1] / 1024 / 1024)
+                    tracemalloc.stop()
+                print('%8d %8d %5d %10.2f %12.2f %8d %11.1f %11s' % (
+                    fragment_bundles, max_records, jobs, first, second,
+                    n_files, usage / 1024 / 1024, peak))
+
+    if args.symbols:
+        print()
+        print('%d symbols' % args.symbols)
+        print('%8s %10s %10s' % ('bundles', 'build (s)', 'write (s)'))
+        for fragment_bundles in args.fragment_bundles:
+            build, write = measure_symbols(vocabulary, args.symbols,
+                                           fragment_bundles)
+            print('%8d %10.2f %10.2f' % (fragment_bundles, build, write))
+
+    # Tokenization also indexes the words in lower case
+    words = sorted(set(vocabulary) | {word.lower() for word in vocabulary})
+    print()
+    print('%d words' % len(words))
+    print('%7s %7s %11s %11s %19s %11s' % (
+        'prefix', 'shards', 'size (KiB)', 'gzip (KiB)',
+        'first lookup (KiB)', 'latency (ms)'))
+    for prefix_length in args.trie_prefix_lengths:
+        n_shards, size, compressed_size, first_lookup = measure_trie(
+            words, prefix_length)
+        print('%7d %7d %11.1f %11.1f %19.1f %11.0f' % (
+            prefix_length, n_shards, size / 1024, compressed_size / 1024,
+            first_lookup / 1024,
+            first_lookup * 8 / (args.bandwidth * 1e6) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+/*
+ * Loading of the search fragments packed in bundles, see the
+ * --search-fragment-bundles option of hotdoc's search extension.
+ *
+ * Copyright 2026 Collabora Ltd.
+ *
+ * This library is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU Lesser General Public
+ * License as published by the Free Software Foundation; either
+ * version 2.1 of the License, or (at your option) any later version.
+ *
+ * This library is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public
+ * License along with this library; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+ */
+
+/*
+ * hotdoc_fetch_fragment(fragments_dir, url) calls
+ * fragment_downloaded_cb({url: url, fragment: ...}), like the script of
+ * a fragment written to its own file does.
+ *
+ * Over HTTP, the fragment alone is fetched with a range request, using
+ * the offsets listed in the index. Otherwise, or if the server ignores
+ * the range, the whole bundle holding the fragment is loaded once.
+ */
+
+var fragments_index = undefined;
+var fragments_waiting_index = [];
+var fragments_bundles = {};
+var fragments_waiting_bundles = {};
+
+function fragments_load_script(src) {
+	var script = document.createElement('script');
+	script.type = 'text/javascript';
+	script.src = src;
+	document.getElementsByTagName('head')[0].appendChild(script);
+}
+
+function fragments_index_downloaded_cb(index) {
+	fragments_index = index;
+
+	var waiting = fragments_waiting_index;
+	fragments_waiting_index = [];
+	for (var i = 0; i < waiting.length; i++) {
+		hotdoc_fetch_fragment(waiting[i][0], waiting[i][1]);
+	}
+}
+
+function fragments_bundle_downloaded_cb(bundle, fragments) {
+	var by_url = {};
+	for (var i = 0; i < fragments.length; i++) {
+		by_url[fragments[i].url] = fragments[i];
+	}
+	fragments_bundles[bundle] = by_url;
+
+	var waiting = fragments_waiting_bundles[bundle] || [];
+	delete fragments_waiting_bundles[bundle];
+	for (var i = 0; i < waiting.length; i++) {
+		fragment_downloaded_cb(by_url[waiting[i]]);
+	}
+}
+
+function fragments_load_bundle(fragments_dir, bundle, url) {
+	if (fragments_bundles[bundle] !== undefined) {
+		fragment_downloaded_cb(fragments_bundles[bundle][url]);
+		return;
+	}
+
+	if (fragments_waiting_bundles[bundle] === undefined) {
+		fragments_waiting_bundles[bundle] = [url];
+		fragments_load_script(fragments_dir + '/bundle-' + bundle + '.js');
+	} else {
+		fragments_waiting_bundles[bundle].push(url);
+	}
+}
+
+function fragments_fetch_range(fragments_dir, url, location) {
+	var bundle = location[0];
+	var start = location[1];
+	var end = start + location[2] - 1;
+	var request = new XMLHttpRequest();
+
+	request.open('GET', fragments_dir + '/bundle-' + bundle + '.js');
+	request.responseType = 'arraybuffer';
+	request.setRequestHeader('Range', 'bytes=' + start + '-' + end);
+	request.onload = function() {
+		if (request.status != 206) {
+			fragments_load_bundle(fragments_dir, bundle, url);
+			return;
+		}
+		var text = new TextDecoder('utf-8').decode(request.response);
+		fragment_downloaded_cb(JSON.parse(text));
+	};
+	request.onerror = function() {
+		fragments_load_bundle(fragments_dir, bundle, url);
+	};
+	request.send();
+}
+
+function hotdoc_fetch_fragment(fragments_dir, url) {
+	if (fragments_index === undefined) {
+		if (fragments_waiting_index.length == 0) {
+			fragments_load_script(fragments_dir + '/index.js');
+		}
+		fragments_waiting_index.push([fragments_dir, url]);
+		return;
+	}
+
+	var location = fragments_index.fragments[url];
+	if (location === undefined) {
+		return;
+	}
+
+	if (fragments_bundles[location[0]] === undefined &&
+			window.location.protocol.indexOf('http') == 0) {
+		fragments_fetch_range(fragments_dir, url, location);
+	} else {
+		fragments_load_bundle(fragments_dir, location[0], url);
+	}
+}
@@ -0,0 +1,755 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Construction of the search index.
+
+Each page is parsed into a list of entries, one per heading, paragraph,
+list or table of its sections, holding the text of the element and the
+words found in it. Entries only depend on the contents of the page, and
+are cached by `PageCache` across builds so that only the pages that
+changed need to be parsed again.
+
+The index is then made of:
+
+- a file per word in the search folder, listing the urls of the sections
+  where it was found, with their context.
+- a fragment file per section, holding its text. Alternatively, the
+  fragments can be packed in a fixed number of bundles, along with an
+  index of the offset of each fragment in its bundle, see
+  `SearchIndex.write`.
+- the trie of all the words, in dumped.trie and trie_index.js.
+  Optionally, the trie is also split in shards by prefix, see
+  `SearchIndex.write`.
+
+These files have the layout the search client of the theme expects. The
+word and fragment files are written in the format of the former C
+indexer, the fragment bundles and trie shards are only written when
+enabled.
+"""
+
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+
+from lxml import etree
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from hotdoc.extensions.search.trie import (
+    Trie, encode_js, encode_shard_js, get_shard_name)
+from hotdoc.utils.loggable import debug
+from hotdoc.utils.sqlite_utils import LazyConnection
+
+
+# Bump this whenever the entries produced by `parse_page` change
+CACHE_VERSION = 3
+
+# The number of postings and fragments `SearchIndex` buffers in memory
+MAX_RECORDS = 500000
+
+HTML_PARSER = etree.HTMLParser(encoding='utf-8', recover=True)
+
+SECTIONS_XPATH = etree.XPath('./div[@id]')
+
+# The elements indexed in each section, in that order
+CONTENT_XPATHS = [etree.XPath(selector) for selector in (
+    './/*[self::h1 or self::h2 or self::h3 or self::h4 or self::h5 or '
+    'self::h6]',
+    './/*[self::p]',
+    './/*[self::ul]',
+    './/*[self::table]')]
+
+SECTION_TAGS = ('h6', 'h5', 'h4', 'h3', 'h2', 'h1')
+
+TOKEN_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_.\-]*')
+
+NODE_TYPE_PRIORITIES = {
+    'symbol': 7,
+    'h1': 6,
+    'h2': 5,
+    'h3': 4,
+    'h4': 3,
+    'h5': 2,
+    'h6': 1,
+}
+
+
+def load_stop_words(path):
+    """
+    Returns the set of the words listed in the file at @path, which
+    are not indexed.
+    """
+    with open(path, 'r', encoding='utf-8') as _:
+        return set(_.read().splitlines())
+
+
+def tokenize(text, stop_words):
+    """
+    Returns the words found in @text, in order of appearance and
+    without duplicates. Words with upper case letters are also
+    returned in lower case.
+    """
+    tokens = {}
+    for match in TOKEN_RE.finditer(text):
+        token = match.group()
+        if token[-1] == '.':
+            token = token[:-1]
+        lower = token.lower()
+        if lower in stop_words:
+            continue
+        tokens[token] = None
+        tokens[lower] = None
+
+    return list(tokens)
+
+
+def _is_element(node):
+    return isinstance(node.tag, str)
+
+
+def _first_element_child(elem):
+    if elem is None:
+        return None
+
+    for child in elem:
+        if _is_element(child):
+            return child
+
+    return None
+
+
+def _next_element(elem):
+    elem = elem.getnext()
+    while elem is not None and not _is_element(elem):
+        elem = elem.getnext()
+    return elem
+
+
+def _previous_element(elem):
+    elem = elem.getprevious()
+    while elem is not None and not _is_element(elem):
+        elem = elem.getprevious()
+    return elem
+
+
+def _get_text(elem):
+    return ''.join(elem.itertext())
+
+
+def _get_root(html):
+    if html.get('id') is not None:
+        return html
+
+    main = html.xpath("//div[@id='main']")
+    if not main:
+        return None
+
+    return main[0]
+
+
+def _get_title(html):
+    # The title is looked up after the first element of the head
+    elem = _first_element_child(_first_element_child(html))
+    while elem is not None:
+        elem = _next_element(elem)
+        if elem is not None and elem.tag == 'title':
+            return _get_text(elem)
+
+    return None
+
+
+def _get_sections(elem):
+    sections = []
+    level = 0
+    while elem is not None and level < len(SECTION_TAGS):
+        if elem.tag in SECTION_TAGS[level:]:
+            sections.insert(0, _get_text(elem))
+            level = SECTION_TAGS.index(elem.tag) + 1
+
+        previous = _previous_element(elem)
+        elem = previous if previous is not None else elem.getparent()
+
+    return sections
+
+
+def _get_context(elem):
+    language = 'default'
+    while True:
+        if language == 'default':
+            classes = (elem.get('class') or '').split(' ')
+            if 'gi-symbol' in classes and len(classes) > 1:
+                language = classes[1][10:]
+
+        id_ = elem.get('id')
+        if id_ is not None:
+            return id_, language, _get_sections(elem)
+
+        previous = _previous_element(elem)
+        elem = previous if previous is not None else elem.getparent()
+
+
+def parse_page(html, stop_words):
+    """
+    Parses the entries of a page.
+
+    Args:
+        html: lxml.etree._Element, the root element of the page.
+        stop_words: set, the words not to index.
+
+    Returns:
+        dict: the title of the page and its entries, each entry being
+            a list of the id of the section it belongs to, its node
+            type, its language, the titles of the sections containing
+            it, its text and its words.
+    """
+    page = {'title': None, 'entries': []}
+    root = _get_root(html)
+    if root is None:
+        return page
+
+    sections = SECTIONS_XPATH(root)
+    if not sections:
+        return page
+
+    page['title'] = _get_title(html)
+    for section in sections:
+        for xpath in CONTENT_XPATHS:
+            for elem in xpath(section):
+                id_, language, section_titles = _get_context(elem)
+                if elem.get('data-hotdoc-id') is not None:
+                    node_type = 'symbol'
+                else:
+                    node_type = elem.tag
+                text = _get_text(elem)
+                page['entries'].append(
+                    [id_, node_type, language, section_titles, text,
+                     tokenize(text, stop_words)])
+
+    return page
+
+
+def parse_page_contents(contents, stop_words):
+    """
+    Parses the entries of a page from its serialized @contents, see
+    `parse_page`.
+    """
+    html = etree.fromstring(contents, HTML_PARSER)
+    if html is None:
+        return {'title': None, 'entries': []}
+    return parse_page(html, stop_words)
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def _read_run(path):
+    with open(path, 'r', encoding='utf-8') as _:
+        for line in _:
+            yield json.loads(line)
+
+
+def _write_run(path, records):
+    with open(path, 'w', encoding='utf-8') as _:
+        for record in records:
+            _.write(_dumps(record))
+            _.write('\n')
+
+
+def _write_precompressed(writer, path, contents):
+    if isinstance(contents, str):
+        contents = contents.encode('utf-8')
+
+    writer.write(path, contents)
+    # No timestamp, so that unchanged files are left untouched
+    writer.write(path + '.gz', gzip.compress(contents, mtime=0))
+    paths = [path, path + '.gz']
+    if brotli is not None:
+        writer.write(path + '.br', brotli.compress(contents))
+        paths.append(path + '.br')
+    return paths
+
+
+def _posting_key(posting):
+    return posting[0], posting[1]
+
+
+def _fragment_key(fragment):
+    return fragment[0], fragment[1]
+
+
+class _Writer:
+    """
+    Writes files with an `OutputManifest` from a pool of @jobs threads,
+    with a bounded number of pending writes.
+    """
+
+    def __init__(self, output_manifest, jobs):
+        self.__output_manifest = output_manifest
+        self.__jobs = jobs
+        self.__executor = None
+        self.__pending = deque()
+        if jobs > 1:
+            self.__executor = ThreadPoolExecutor(jobs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        try:
+            while self.__pending:
+                self.__pending.popleft().result()
+        finally:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+
+    def write(self, path, contents):
+        """
+        Writes @contents to @path, see `OutputManifest.write`.
+        """
+        if self.__executor is None:
+            self.__output_manifest.write(path, contents)
+            return
+
+        if len(self.__pending) >= self.__jobs * 8:
+            self.__pending.popleft().result()
+        self.__pending.append(self.__executor.submit(
+            self.__output_manifest.write, path, contents))
+
+
+class SearchIndex:
+    """
+    Gathers the entries of the indexed pages, and writes the index.
+
+    Postings, that is the contexts of each word in each section, and
+    fragments are buffered in memory. Whenever more than @max_records
+    of them are buffered, they are sorted and spilled to a run file in
+    a temporary folder, and the runs are merged when writing the index,
+    so that memory usage does not grow with the size of the site.
+
+    Args:
+        fragment_bundles: int, see `SearchIndex.write`.
+        trie_prefix_length: int, see `SearchIndex.write`.
+        max_records: int, the number of postings and fragments buffered
+            before being spilled to disk.
+        tmp_dir: str, the folder to create the temporary folder in.
+    """
+
+    def __init__(self, fragment_bundles=0, trie_prefix_length=0,
+                 max_records=MAX_RECORDS, tmp_dir=None):
+        self.fragment_bundles = fragment_bundles
+        self.trie_prefix_length = trie_prefix_length
+        self.max_records = max_records
+        self.__tmp_dir = tmp_dir
+        self.__runs_dir = None
+        # [[token, url, node_type, priority, page, sections, languages]]
+        self.__postings = []
+        # [[bundle, url, fragment]]
+        self.__fragments = []
+        self.__runs = []
+        self.__n_fragments = 0
+
+    def __get_bundle(self, url):
+        if not self.fragment_bundles:
+            return 0
+        # Stable across builds, so that editing a page only changes the
+        # bundles holding its fragments
+        return zlib.crc32(url.encode('utf-8')) % self.fragment_bundles
+
+    def add_page(self, rel_path, page):
+        """
+        Adds the entries of @page, see `parse_page`, written at @rel_path
+        in the html folder.
+        """
+        title = page['title']
+        fragments = defaultdict(list)
+        # {token: {url: [node_type, priority, languages]}}
+        urls = defaultdict(dict)
+        sections = {}
+        for id_, node_type, language, entry_sections, text, tokens in \
+                page['entries']:
+            url = '%s#%s' % (rel_path, id_)
+            fragments[url] += [text, '\n']
+            priority = NODE_TYPE_PRIORITIES.get(node_type, 0)
+            for token in tokens:
+                context = urls[token].get(url)
+                if context is None:
+                    urls[token][url] = [node_type, priority, {language}]
+                    sections[token, url] = entry_sections
+                    continue
+
+                # The last of the entries with the highest priority wins
+                if priority >= context[1]:
+                    context[0] = node_type
+                    context[1] = priority
+                context[2].add(language)
+
+        for url, texts in fragments.items():
+            self.__fragments.append([self.__get_bundle(url), url,
+                                     ''.join(texts)])
+        self.__n_fragments += len(fragments)
+
+        for token, token_urls in urls.items():
+            for url, (node_type, priority, languages) in token_urls.items():
+                self.__postings.append(
+                    [token, url, node_type, priority, title,
+                     sections[token, url], sorted(languages)])
+
+        self.__spill_if_needed()
+
+    def add_url(self, url, title, node_type, sections, text, tokens):
+        """
+        Adds the section at @url, of the page titled @title, holding
+        @text, in which @tokens were found, without parsing any page.
+
+        Urls must only be added once.
+        """
+        self.__fragments.append([self.__get_bundle(url), url, text + '\n'])
+        self.__n_fragments += 1
+        priority = NODE_TYPE_PRIORITIES.get(node_type, 0)
+        for token in tokens:
+            self.__postings.append([token, url, node_type, priority, title,
+                                    sections, ['default']])
+
+        self.__spill_if_needed()
+
+    def __spill_if_needed(self):
+        if len(self.__postings) + len(self.__fragments) > self.max_records:
+            self.__spill()
+
+    def __spill(self):
+        if self.__runs_dir is None:
+            self.__runs_dir = tempfile.mkdtemp(prefix='search-runs-',
+                                               dir=self.__tmp_dir)
+
+        self.__postings.sort(key=_posting_key)
+        self.__fragments.sort(key=_fragment_key)
+        path = os.path.join(self.__runs_dir, '%d' % len(self.__runs))
+        _write_run(path + '.postings', self.__postings)
+        _write_run(path + '.fragments', self.__fragments)
+        self.__runs.append(path)
+        self.__postings = []
+        self.__fragments = []
+
+    def __merge(self, suffix, buffered, key):
+        # Runs are passed in the order they were spilled, which merge
+        # preserves for equal keys
+        buffered.sort(key=key)
+        return heapq.merge(
+            *[_read_run(path + suffix) for path in self.__runs], buffered,
+            key=key)
+
+    @staticmethod
+    def __format_urls(postings):
+        urls = []
+        for url, url_postings in groupby(postings, key=lambda p: p[1]):
+            _, _, node_type, priority, page, sections, languages = next(
+                url_postings)
+            languages = set(languages)
+            # Only when a page was added several times
+            for _, _, p_node_type, p_priority, _, _, p_languages in \
+                    url_postings:
+                if p_priority >= priority:
+                    node_type = p_node_type
+                    priority = p_priority
+                languages.update(p_languages)
+            urls.append({'url': url,
+                         'node_type': node_type,
+                         'page': page,
+                         'sections': sections,
+                         'context': {'gi-language': sorted(languages)}})
+        return urls
+
+    def __write_fragments(self, fragments_dir, writer):
+        paths = []
+        for _, url, fragment in self.__merge(
+                '.fragments', self.__fragments, _fragment_key):
+            path = os.path.join(fragments_dir,
+                                (url + '.fragment').replace('#', '-'))
+            writer.write(
+                path, 'fragment_downloaded_cb(%s);' % _dumps(
+                    {'url': url, 'fragment': fragment}))
+            paths.append(path)
+        return paths
+
+    def __write_bundles(self, fragments_dir, writer):
+        paths = []
+        offsets = {}
+        for bundle, fragments in groupby(
+                self.__merge('.fragments', self.__fragments, _fragment_key),
+                key=lambda f: f[0]):
+            chunks = [('fragments_bundle_downloaded_cb(%d,[' %
+                       bundle).encode('utf-8')]
+            offset = len(chunks[0])
+            for i, (_, url, fragment) in enumerate(fragments):
+                if i:
+                    chunks.append(b',\n')
+                    offset += 2
+                chunk = _dumps({'url': url,
+                                'fragment': fragment}).encode('utf-8')
+                offsets[url] = [bundle, offset, len(chunk)]
+                chunks.append(chunk)
+                offset += len(chunk)
+            chunks.append(b']);')
+
+            path = os.path.join(fragments_dir, 'bundle-%d.js' % bundle)
+            writer.write(path, b''.join(chunks))
+            paths.append(path)
+
+        path = os.path.join(fragments_dir, 'index.js')
+        writer.write(
+            path, 'fragments_index_downloaded_cb(%s);' % _dumps(
+                {'bundles': self.fragment_bundles, 'fragments': offsets}))
+        paths.append(path)
+        return paths
+
+    def __write_trie_shards(self, trie_dir, tokens, writer):
+        paths = []
+        prefixes = []
+        # Tokens are sorted, so the words of each shard follow each other
+        for prefix, words in groupby(
+                tokens, key=lambda token: token[:self.trie_prefix_length]):
+            trie = Trie()
+            for word in words:
+                trie.add_word(word)
+            data = trie.encode()
+            path = os.path.join(trie_dir, get_shard_name(prefix))
+            paths += _write_precompressed(writer, path + '.trie', data)
+            paths += _write_precompressed(writer, path + '.js',
+                                          encode_shard_js(prefix, data))
+            prefixes.append(prefix)
+
+        paths += _write_precompressed(
+            writer, os.path.join(trie_dir, 'index.js'),
+            'trie_shards_index_downloaded_cb(%s);' % _dumps(
+                {'prefix_length': self.trie_prefix_length,
+                 'shards': {prefix: get_shard_name(prefix)
+                            for prefix in prefixes}}))
+        return paths
+
+    def write(self, html_dir, output_manifest, jobs=1):
+        """
+        Writes the index in @html_dir with @output_manifest, see
+        `hotdoc.utils.output.OutputManifest`.
+
+        When `fragment_bundles` is 0, each fragment is written to its
+        own file. Otherwise, it is the number of bundles the fragments
+        are packed in. Bundles are scripts calling
+        `fragments_bundle_downloaded_cb(bundle, [fragment, ...])`, and
+        the index.js script next to them calls
+        `fragments_index_downloaded_cb` with, for each url, the bundle it
+        was packed in and the offset and length in bytes of its fragment
+        in that bundle. The fragments can thus either be loaded by
+        bundle, or fetched one by one with HTTP range requests.
+
+        When `trie_prefix_length` is not 0, the trie is also split in
+        shards holding the words starting with the same first
+        `trie_prefix_length` letters, in the assets/js/trie folder. Each
+        shard is written as a raw .trie file, and as a script calling
+        `trie_shard_downloaded_cb(prefix, base64_data)`, along with
+        their gzip, and brotli when available, precompressed variants.
+        The index.js script next to them calls
+        `trie_shards_index_downloaded_cb` with the prefix length and the
+        file names of the shards.
+
+        Args:
+            html_dir: str, the html output folder.
+            output_manifest: `hotdoc.utils.output.OutputManifest`, used
+                to write the index files.
+            jobs: int, the number of threads writing the files.
+
+        The index can only be written once.
+
+        Returns:
+            list: the paths of the index files, relative to @html_dir.
+        """
+        search_dir = os.path.join(html_dir, 'assets', 'js', 'search')
+        fragments_dir = os.path.join(search_dir, 'hotdoc_fragments')
+        trie = Trie()
+        tokens = []
+
+        try:
+            with _Writer(output_manifest, jobs) as writer:
+                if self.fragment_bundles:
+                    paths = self.__write_bundles(fragments_dir, writer)
+                else:
+                    paths = self.__write_fragments(fragments_dir, writer)
+
+                for token, postings in groupby(
+                        self.__merge('.postings', self.__postings,
+                                     _posting_key),
+                        key=lambda p: p[0]):
+                    path = os.path.join(search_dir, token)
+                    writer.write(
+                        path, 'urls_downloaded_cb(%s);' % _dumps(
+                            {'token': token,
+                             'urls': self.__format_urls(postings)}))
+                    paths.append(path)
+                    trie.add_word(token)
+                    tokens.append(token)
+
+                data = trie.encode()
+                writer.write(os.path.join(html_dir, 'dumped.trie'), data)
+                writer.write(
+                    os.path.join(html_dir, 'assets', 'js', 'trie_index.js'),
+                    encode_js(data))
+
+                if self.trie_prefix_length:
+                    paths += self.__write_trie_shards(
+                        os.path.join(html_dir, 'assets', 'js', 'trie'),
+                        tokens, writer)
+        finally:
+            if self.__runs_dir is not None:
+                shutil.rmtree(self.__runs_dir, ignore_errors=True)
+                self.__runs_dir = None
+
+        debug('Indexed %d words in %d fragments, spilled %d runs' % (
+            len(tokens), self.__n_fragments, len(self.__runs)), 'search')
+
+        # All the paths were joined to html_dir, relpath is much slower
+        prefix = os.path.join(html_dir, '')
+        return [path[len(prefix):] for path in paths]
+
+
+class PageCache:
+    """
+    Stores the entries of the pages indexed by the previous builds, by
+    hash of their contents, along with the paths of the files the
+    index was made of, in an SQLite database.
+
+    Args:
+        path: str, the path of the database.
+        stop_words: set, the words not indexed, the cache is discarded
+            when they change.
+    """
+
+    def __init__(self, path, stop_words):
+        self.path = path
+        self.__stop_words = stop_words
+        self.__key = hashlib.sha1(
+            '\n'.join(sorted(stop_words)).encode('utf-8')).hexdigest()
+        self.__db = LazyConnection(self.__create_schema, 'search cache',
+                                   domain='search')
+        # {rel_path: digest}
+        self.__used_pages = OrderedDict()
+
+    def __get_db(self):
+        return self.__db.get(self.path)
+
+    def __create_schema(self, db):
+        version = db.execute('PRAGMA user_version').fetchone()[0]
+        if version == CACHE_VERSION:
+            row = db.execute(
+                "SELECT value FROM meta WHERE name = 'stop_words'").fetchone()
+            if row is not None and row[0] == self.__key:
+                return
+
+        with db:
+            db.execute('DROP TABLE IF EXISTS pages')
+            db.execute('DROP TABLE IF EXISTS meta')
+            db.execute('CREATE TABLE pages '
+                       '(digest TEXT PRIMARY KEY, page TEXT NOT NULL)')
+            db.execute('CREATE TABLE meta '
+                       '(name TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            db.execute("INSERT INTO meta (name, value) "
+                       "VALUES ('stop_words', ?)", (self.__key,))
+            db.execute('PRAGMA user_version = %d' % CACHE_VERSION)
+
+    @property
+    def outputs(self):
+        """
+        The paths of the index files written by the previous build,
+        relative to the html folder.
+        """
+        row = self.__get_db().execute(
+            "SELECT value FROM meta WHERE name = 'outputs'").fetchone()
+        if row is None:
+            return []
+        return json.loads(row[0])
+
+    def __load(self, digest):
+        row = self.__get_db().execute(
+            'SELECT page FROM pages WHERE digest = ?', (digest,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def get(self, rel_path, contents):
+        """
+        Returns the entries of the page at @rel_path, parsing it if its
+        @contents changed since the previous build.
+
+        Pages are indexed from their in-memory bytes, not from their tree,
+        as the serializer adds whitespace the tree does not have, so that
+        the entries do not depend on where the page comes from.
+
+        Args:
+            rel_path: str, the path of the page in the html folder.
+            contents: str or bytes, the contents of the page, str is
+                encoded to UTF-8.
+        """
+        if isinstance(contents, str):
+            contents = contents.encode('utf-8')
+
+        digest = hashlib.sha1(contents).hexdigest()
+        page = self.__load(digest)
+        if page is None:
+            page = parse_page_contents(contents, self.__stop_words)
+            self.__get_db().execute(
+                'INSERT INTO pages (digest, page) VALUES (?, ?)',
+                (digest, _dumps(page)))
+        self.__used_pages[rel_path] = digest
+        return page
+
+    def get_pages(self):
+        """
+        Yields the path and entries of each page passed to `get`, read
+        back one at a time from the database.
+        """
+        for rel_path, digest in self.__used_pages.items():
+            yield rel_path, self.__load(digest)
+
+    def save(self, outputs):
+        """
+        Saves the entries of the pages used by this build, and the
+        paths of the index files, relative to the html folder.
+        """
+        db = self.__get_db()
+        with db:
+            db.execute('CREATE TEMP TABLE IF NOT EXISTS used_pages '
+                       '(digest TEXT PRIMARY KEY)')
+            db.execute('DELETE FROM used_pages')
+            db.executemany('INSERT OR IGNORE INTO used_pages VALUES (?)',
+                           ((digest,) for digest in
+                            self.__used_pages.values()))
+            db.execute('DELETE FROM pages WHERE digest NOT IN '
+                       '(SELECT digest FROM used_pages)')
+            db.execute("INSERT OR REPLACE INTO meta (name, value) "
+                       "VALUES ('outputs', ?)", (json.dumps(outputs),))
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Queries of a built search index, without a browser.
+
+`SearchClient` looks words up in dumped.trie like search.js does, then
+ranks the sections they were found in, so that the search results and
+the time it takes to compute them can be measured headlessly, see
+`hotdoc search-query`.
+"""
+
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+from hotdoc.extensions.search.indexer import NODE_TYPE_PRIORITIES
+from hotdoc.extensions.search.trie import FrozenTrie
+
+
+# The number of completions and submatches search.js looks up
+MAX_WORDS = 5
+
+# The maximum edit distance of the corrections search.js looks up
+MAX_COST = 2
+
+
+def _read_jsonp(path):
+    with open(path, 'r', encoding='utf-8') as _:
+        contents = _.read()
+    return json.loads(contents[contents.index('(') + 1:contents.rindex(')')])
+
+
+class SearchClient:
+    """
+    Answers search queries over the index written in @html_dir, see
+    `indexer.SearchIndex.write`.
+    """
+
+    def __init__(self, html_dir):
+        self.html_dir = html_dir
+        self.__search_dir = os.path.join(html_dir, 'assets', 'js', 'search')
+        self.__fragments_dir = os.path.join(self.__search_dir,
+                                            'hotdoc_fragments')
+        self.__fragments_index = None
+        with open(os.path.join(html_dir, 'dumped.trie'), 'rb') as _:
+            self.trie = FrozenTrie(_.read())
+
+    def lookup_words(self, query):
+        """
+        Returns the words of the index matching @query, in the order
+        search.js lists them: @query itself if it was indexed, its
+        completions, or, for queries of more than 3 letters, the words
+        containing it and the closest corrections.
+        """
+        node = self.trie.lookup_node(query)
+        if node is not None and self.trie.is_final(node):
+            return [query]
+
+        if node is not None:
+            return self.trie.lookup_completions(node, MAX_WORDS)
+
+        if len(query) <= 3:
+            return []
+
+        words = self.trie.lookup_submatches(query, MAX_WORDS)
+        if len(words) < MAX_WORDS:
+            corrections = self.trie.search(query, MAX_COST)
+            words += sorted(corrections, key=corrections.get)
+        return words
+
+    def get_urls(self, word):
+        """
+        Returns the urls of the sections @word was found in, as listed
+        in its token file, that is sorted by url.
+        """
+        try:
+            return _read_jsonp(os.path.join(self.__search_dir,
+                                            word))['urls']
+        except FileNotFoundError:
+            return []
+
+    def query(self, query):
+        """
+        Returns the urls of the sections matching @query, see
+        `SearchClient.get_urls`, along with the `token` they were found
+        for.
+
+        The sections of each word follow those of the previous words,
+        sorted by node type priority, the sections of symbols first, then
+        those of headings by level, then by url. Sections are only
+        listed for the first word they were found for.
+        """
+        results = []
+        seen = set()
+        for word in self.lookup_words(query):
+            urls = sorted(
+                self.get_urls(word),
+                key=lambda url: -NODE_TYPE_PRIORITIES.get(url['node_type'],
+                                                          0))
+            for url in urls:
+                if url['url'] in seen:
+                    continue
+                seen.add(url['url'])
+                results.append(dict(url, token=word))
+        return results
+
+    def get_fragment(self, url):
+        """
+        Returns the text of the section at @url, or None.
+        """
+        index_path = os.path.join(self.__fragments_dir, 'index.js')
+        if self.__fragments_index is None and os.path.exists(index_path):
+            self.__fragments_index = _read_jsonp(index_path)['fragments']
+
+        try:
+            if self.__fragments_index is None:
+                return _read_jsonp(os.path.join(
+                    self.__fragments_dir,
+                    (url + '.fragment').replace('#', '-')))['fragment']
+
+            location = self.__fragments_index.get(url)
+            if location is None:
+                return None
+            bundle, offset, length = location
+            with open(os.path.join(self.__fragments_dir,
+                                   'bundle-%d.js' % bundle), 'rb') as _:
+                _.seek(offset)
+                return json.loads(_.read(length).decode('utf-8'))['fragment']
+        except FileNotFoundError:
+            return None
+
+
+def measure_query(client, query, repeat=1):
+    """
+    Returns the results of @query with @client, along with the median
+    time it took to compute them over @repeat runs, in seconds.
+    """
+    times = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        results = client.query(query)
+        times.append(time.perf_counter() - start)
+    return results, statistics.median(times)
+
+
+def search_query(config):
+    """
+    Prints the results of the search queries of @config, and the time
+    it took to compute them, over the index in the output folder.
+    """
+    output = config.get_path('output')
+    if output is None:
+        print('The output folder of the documentation is needed to query '
+              'its search index')
+        return 1
+
+    try:
+        client = SearchClient(os.path.join(output, 'html'))
+    except OSError as exc:
+        print('Could not load the search index: %s' % exc)
+        return 1
+
+    queries = config.get('search_queries') or \
+        [line.strip() for line in sys.stdin if line.strip()]
+    max_results = config.get('search_max_results')
+    repeat = config.get('search_query_repeat')
+
+    latencies = []
+    for query in queries:
+        results, latency = measure_query(client, query, repeat)
+        latencies.append(latency)
+        print('%s: %d results in %.2f ms' % (query, len(results),
+                                              latency * 1000))
+        for result in results[:max_results]:
+            print('  %s [%s] %s' % (result['url'], result['node_type'],
+                                    ' > '.join(result['sections'])))
+
+    if len(latencies) > 1:
+        latencies.sort()
+        print('%d queries, median %.2f ms, 95th percentile %.2f ms, '
+              'max %.2f ms' % (
+                  len(latencies),
+                  statistics.median(latencies) * 1000,
+                  latencies[math.ceil(0.95 * len(latencies)) - 1] * 1000,
+                  latencies[-1] * 1000))
+
+    return 0
@@ -19,11 +19,11 @@
 # pylint: disable=missing-docstring
 
 import os
-import shutil
-import multiprocessing
-from lxml import etree
-from hotdoc.parsers import search
+import posixpath
 from hotdoc.core.extension import Extension
+from hotdoc.extensions.search.indexer import (
+    SearchIndex, PageCache, load_stop_words, tokenize)
+from hotdoc.utils.loggable import error
 from hotdoc.utils.setup_utils import symlink
 
 DESCRIPTION =\
@@ -37,60 +37,152 @@ HERE = os.path.dirname(__file__)
 
 class SearchExtension(Extension):
     extension_name = 'search'
-    connected = False
-
-    __connected_all_projects = False
+    parallel_setup = True
 
     def __init__(self, app, project):
         Extension.__init__(self, app, project)
-        self.__all_paths = []
+        self.__cache = None
+        self.__stop_words = set()
+        self.__fragment_bundles = 0
+        self.__trie_prefix_length = 0
+        self.__jobs = 0
+        self.__symbols_only = False
+        self.__trie_symlinks = True
         self.script = os.path.abspath(os.path.join(HERE, 'trie.js'))
+        self.fragments_script = os.path.abspath(
+            os.path.join(HERE, 'fragments.js'))
+        self.trie_shards_script = os.path.abspath(
+            os.path.join(HERE, 'trie_shards.js'))
+
+    @staticmethod
+    def add_arguments(parser):
+        group = parser.add_argument_group('Search extension', DESCRIPTION)
+        group.add_argument('--search-fragment-bundles', type=int, default=0,
+                           help='Pack the search fragments in this number '
+                           'of bundles, instead of writing each to its own '
+                           'file. The theme then needs to load them with '
+                           'hotdoc_fetch_fragment() from fragments.js',
+                           dest='search_fragment_bundles')
+        group.add_argument('--search-trie-prefix-length', type=int,
+                           default=0,
+                           help='Also split the search trie in shards '
+                           'holding the words starting with the same '
+                           'letters, this many of them. The theme then '
+                           'needs to load them with '
+                           'hotdoc_lookup_trie_shards() from trie_shards.js',
+                           dest='search_trie_prefix_length')
+        group.add_argument('--search-jobs', type=int, default=0,
+                           help='Number of threads writing the search '
+                           'index, 0 for one per CPU',
+                           dest='search_jobs')
+        group.add_argument('--search-symbols-only', action='store_true',
+                           help='Only index the names of the symbols and '
+                           'the titles of the pages, which is much faster '
+                           'than indexing the text of the pages',
+                           dest='search_symbols_only')
+        group.add_argument('--search-no-trie-symlinks', action='store_false',
+                           help='Do not link dumped.trie in each folder of '
+                           'the output. The theme then needs to locate it '
+                           'through the search-trie meta of the pages',
+                           dest='search_trie_symlinks')
+        group.add_argument('--search-queries', nargs='+', default=[],
+                           help='The queries the search-query command '
+                           'answers over the built index, read from the '
+                           'standard input by default',
+                           dest='search_queries')
+        group.add_argument('--search-max-results', type=int, default=10,
+                           help='The number of results the search-query '
+                           'command prints for each query',
+                           dest='search_max_results')
+        group.add_argument('--search-query-repeat', type=int, default=1,
+                           help='Run each query this many times, the '
+                           'search-query command reporting the median '
+                           'time they took',
+                           dest='search_query_repeat')
+
+    def parse_toplevel_config(self, config):
+        super(SearchExtension, self).parse_toplevel_config(config)
+        self.__fragment_bundles = config.get('search_fragment_bundles', 0)
+        if not isinstance(self.__fragment_bundles, int) or \
+                self.__fragment_bundles < 0:
+            error('invalid-config',
+                  'Invalid number of search fragment bundles: %s' %
+                  self.__fragment_bundles)
+        self.__trie_prefix_length = config.get('search_trie_prefix_length',
+                                               0)
+        if not isinstance(self.__trie_prefix_length, int) or \
+                self.__trie_prefix_length < 0:
+            error('invalid-config',
+                  'Invalid search trie prefix length: %s' %
+                  self.__trie_prefix_length)
+        self.__jobs = config.get('search_jobs', 0)
+        if not isinstance(self.__jobs, int) or self.__jobs < 0:
+            error('invalid-config',
+                  'Invalid number of search jobs: %s' % self.__jobs)
+        self.__symbols_only = bool(config.get('search_symbols_only', False))
+        self.__trie_symlinks = bool(config.get('search_trie_symlinks', True))
 
     def setup(self):
         super(SearchExtension, self).setup()
 
+        # The toplevel project's instance gathers the paths of all the pages
+        toplevel = self.app.project.extensions[self.extension_name]
         for ext in self.project.extensions.values():
             ext.formatter.formatting_page_signal.connect(
                 self.__formatting_page)
-
-        if not SearchExtension.connected:
+            if not toplevel.__symbols_only:
+                ext.formatter.written_page_signal.connect(
+                    toplevel.__written_page_cb)
+
+        if self is toplevel:
+            self.__stop_words = load_stop_words(
+                os.path.join(HERE, 'stopwords.txt'))
+            # Only the pages that changed since the previous build are parsed
+            self.__cache = PageCache(
+                os.path.join(self.project.get_persistent_folder(),
+                             'search-cache.db'), self.__stop_words)
             self.app.formatted_signal.connect(self.__build_index)
-            for ext in self.app.project.extensions.values():
-                ext.formatter.writing_page_signal.connect(
-                    self.__writing_page_cb)
-            SearchExtension.connected = True
-
-    def __connect_to_subprojects(self, project, toplevel=False):
-        if not toplevel:
-            for ext in project.extensions.values():
-                ext.formatter.writing_page_signal.connect(
-                    self.__writing_page_cb)
 
-        for subproj in project.subprojects.values():
-            self.__connect_to_subprojects(subproj)
+    def __written_page_cb(self, formatter, page, path, contents):
+        rel_path = os.path.relpath(path, os.path.join(self.app.output, 'html'))
+        if contents is None:
+            with open(path, 'rb') as _:
+                contents = _.read()
 
-    def __writing_page_cb(self, formatter, page, path, lxml_tree):
-        if not SearchExtension.__connected_all_projects:
-            self.__connect_to_subprojects(self.project, toplevel=True)
-            SearchExtension.__connected_all_projects = True
-
-        self.__all_paths.append(path)
+        # Indexed from its in-memory bytes, rather than read back when
+        # building the index. Pages may be written out several times, see
+        # `hotdoc run --watch`
+        self.__cache.get(rel_path, contents)
 
     def __build_index(self, app):  # pylint: disable=unused-argument
         html_dir = os.path.join(self.app.output, 'html')
-        search_dir = os.path.join(html_dir, 'assets', 'js', 'search')
-        fragments_dir = os.path.join(search_dir, 'hotdoc_fragments')
-
-        all_rel_paths = [os.path.relpath(p, html_dir)
-                         for p in self.__all_paths]
-
-        search.create_index(all_rel_paths, multiprocessing.cpu_count() + 1, search_dir,
-                            fragments_dir, html_dir, self.app.project.get_private_folder(),
-                            os.path.join(HERE, 'stopwords.txt'))
-
-        subdirs = next(os.walk(html_dir))[1]
-        subdirs.append(html_dir)
-
+        output_manifest = self.formatter.context.output_manifest
+
+        index = SearchIndex(self.__fragment_bundles,
+                            self.__trie_prefix_length,
+                            tmp_dir=self.project.get_private_folder())
+        if self.__symbols_only:
+            self.__add_symbols(index)
+        else:
+            for rel_path, page in self.__cache.get_pages():
+                index.add_page(rel_path, page)
+
+        outputs = index.write(html_dir, output_manifest,
+                              self.__jobs or os.cpu_count() or 1)
+        for rel_path in set(self.__cache.outputs) - set(outputs):
+            try:
+                os.remove(os.path.join(html_dir, rel_path))
+            except OSError:
+                pass
+        self.__cache.save(outputs)
+
+        if self.__trie_symlinks:
+            self.__link_trie(html_dir)
+
+    @staticmethod
+    def __link_trie(html_dir):
+        # Clients that do not read the search-trie meta of the pages look
+        # dumped.trie up next to them
         dumped_trie_path = os.path.join(html_dir, 'dumped.trie')
         # pylint: disable=unused-variable
         for root, dirs, files in os.walk(html_dir):
@@ -106,9 +198,50 @@ class SearchExtension(Extension):
                 symlink(os.path.relpath(
                     dumped_trie_path, os.path.join(root, dir_)), dest_trie)
 
+    def __gather_page_titles(self, project, titles):
+        for name, page in project.tree.get_pages().items():
+            subproj = project.subprojects.get(name)
+            if subproj:
+                self.__gather_page_titles(subproj, titles)
+            elif project.is_toplevel:
+                titles[page.link.ref] = page.get_title()
+            else:
+                titles[page.project_name + '/' + page.link.ref] = \
+                    page.get_title()
+
+    def __add_symbols(self, index):
+        stop_words = self.__stop_words
+        titles = {}
+        self.__gather_page_titles(self.app.project, titles)
+        for rel_path, title in titles.items():
+            index.add_url(rel_path, title, 'h1', [title], title,
+                          tokenize(title, stop_words))
+
+        # Symbols were given the paths of their pages when resolved
+        for symbol in self.app.database.get_all_symbols().values():
+            rel_path = (symbol.link.ref or '').split('#')[0]
+            title = titles.get(rel_path)
+            if title is None:
+                continue
+            name = symbol.make_name()
+            index.add_url(symbol.link.ref, title, 'symbol', [title], name,
+                          tokenize('%s %s' % (symbol.unique_name, name),
+                                   stop_words))
+
     # pylint: disable=unused-argument
     def __formatting_page(self, formatter, page):
         page.output_attrs['html']['scripts'].add(self.script)
+        # Lets the client find the trie relative to the page, rather than
+        # through a dumped.trie symlink in each folder of the output
+        root = os.path.relpath('.', os.path.dirname(page.build_path))
+        page.output_attrs['html']['meta']['search-trie'] = \
+            posixpath.normpath(posixpath.join(*root.split(os.sep),
+                                              'dumped.trie'))
+        toplevel = self.app.project.extensions[self.extension_name]
+        if toplevel.__fragment_bundles:
+            page.output_attrs['html']['scripts'].add(self.fragments_script)
+        if toplevel.__trie_prefix_length:
+            page.output_attrs['html']['scripts'].add(self.trie_shards_script)
 
 
 def get_extension_classes():
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import gzip
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from lxml import etree
+
+from hotdoc.extensions.search import indexer
+from hotdoc.extensions.search.indexer import (
+    SearchIndex, PageCache, parse_page, parse_page_contents,
+    load_stop_words)
+from hotdoc.extensions.search.query import SearchClient
+from hotdoc.extensions.search.trie import (
+    Trie, FrozenTrie, decode_words, encode_shard_js)
+from hotdoc.core.formatter import XSLT_PAGE_TRANSFORM
+from hotdoc.utils.output import OutputManifest
+
+
+HERE = os.path.dirname(__file__)
+
+PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>The page</title>
+</head>
+<body>
+<div id="main">
+<div id="page-wrapper">
+<h1 id="introduction">Introduction</h1>
+<p>The GstElement is the base of all the elements.</p>
+<h2 id="usage">Usage</h2>
+<ul><li>Call gst_init() first.</li></ul>
+<div class="gi-symbol gi-symbol-python" id="gst_init" data-hotdoc-id="x">
+<p>Initializes the library.</p>
+</div>
+</div>
+</div>
+</body>
+</html>
+'''
+
+
+def read_jsonp(path):
+    with open(path, 'r', encoding='utf-8') as _:
+        contents = _.read()
+    return json.loads(contents[contents.index('(') + 1:-2])
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.__test_dir = os.path.abspath(os.path.join(HERE, 'tmp-search'))
+        self.__html_dir = os.path.join(self.__test_dir, 'html')
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        os.makedirs(self.__html_dir)
+        self.__stop_words = load_stop_words(os.path.join(HERE,
+                                                         'stopwords.txt'))
+
+    def tearDown(self):
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+
+    def test_parse_page(self):
+        page = parse_page_contents(PAGE.encode('utf-8'), self.__stop_words)
+        self.assertEqual(page['title'], 'The page')
+        entries = [entry[:4] for entry in page['entries']]
+        self.assertEqual(entries, [
+            ['introduction', 'h1', 'default', ['Introduction']],
+            ['usage', 'h2', 'default', ['Introduction', 'Usage']],
+            ['introduction', 'p', 'default', ['Introduction']],
+            ['gst_init', 'p', 'python', ['Introduction', 'Usage']],
+            ['usage', 'ul', 'default', ['Introduction', 'Usage']]])
+        self.assertEqual(page['entries'][2][5],
+                         ['GstElement', 'gstelement', 'base', 'elements'])
+        self.assertEqual(page['entries'][4][5], ['Call', 'call', 'gst_init'])
+
+    def test_write(self):
+        index = SearchIndex()
+        index.add_page('index.html', parse_page_contents(
+            PAGE.encode('utf-8'), self.__stop_words))
+        outputs = index.write(self.__html_dir, OutputManifest())
+        search_dir = os.path.join(self.__html_dir, 'assets', 'js', 'search')
+
+        token = read_jsonp(os.path.join(search_dir, 'gst_init'))
+        self.assertEqual(token['token'], 'gst_init')
+        self.assertEqual(token['urls'], [
+            {'url': 'index.html#usage',
+             'node_type': 'ul',
+             'page': 'The page',
+             'sections': ['Introduction', 'Usage'],
+             'context': {'gi-language': ['default']}}])
+
+        token = read_jsonp(os.path.join(search_dir, 'initializes'))
+        self.assertEqual(token['urls'][0]['url'], 'index.html#gst_init')
+        self.assertEqual(token['urls'][0]['context'],
+                         {'gi-language': ['python']})
+
+        fragment = read_jsonp(os.path.join(
+            search_dir, 'hotdoc_fragments', 'index.html-introduction.fragment'))
+        self.assertEqual(fragment, {
+            'url': 'index.html#introduction',
+            'fragment': 'Introduction\nThe GstElement is the base of all '
+                        'the elements.\n'})
+
+        with open(os.path.join(self.__html_dir, 'dumped.trie'), 'rb') as _:
+            words = decode_words(_.read())
+        self.assertIn('GstElement', words)
+        self.assertIn('gstelement', words)
+        self.assertNotIn('the', words)
+        self.assertEqual(
+            sorted(outputs),
+            sorted([os.path.join('assets', 'js', 'search', word)
+                    for word in words] +
+                   [os.path.join('assets', 'js', 'search', 'hotdoc_fragments',
+                                 'index.html-%s.fragment' % id_)
+                    for id_ in ('introduction', 'usage', 'gst_init')]))
+
+    def test_payloads(self):
+        # The exact scripts the search client of the theme loads, in the
+        # format the former C indexer wrote them
+        index = SearchIndex()
+        index.add_page('sub/index.html', parse_page_contents(
+            PAGE.replace('The page', 'La página').encode('utf-8'),
+            self.__stop_words))
+        index.write(self.__html_dir, OutputManifest())
+        search_dir = os.path.join(self.__html_dir, 'assets', 'js', 'search')
+
+        with open(os.path.join(search_dir, 'initializes'), 'r',
+                  encoding='utf-8') as _:
+            self.assertEqual(
+                _.read(),
+                'urls_downloaded_cb({"token":"initializes","urls":['
+                '{"url":"sub/index.html#gst_init","node_type":"p",'
+                '"page":"La página","sections":["Introduction","Usage"],'
+                '"context":{"gi-language":["python"]}}]});')
+
+        with open(os.path.join(search_dir, 'hotdoc_fragments', 'sub',
+                               'index.html-gst_init.fragment'), 'r',
+                  encoding='utf-8') as _:
+            self.assertEqual(
+                _.read(),
+                'fragment_downloaded_cb({"url":"sub/index.html#gst_init",'
+                '"fragment":"Initializes the library.\\n"});')
+
+    def __make_page(self, i):
+        return parse_page_contents(
+            PAGE.replace('Initializes', 'Initializes %d' % i).encode(
+                'utf-8'), self.__stop_words)
+
+    def __read_index(self, fragment_bundles, max_records, jobs):
+        shutil.rmtree(self.__html_dir)
+        index = SearchIndex(fragment_bundles, max_records=max_records,
+                            tmp_dir=self.__test_dir)
+        for i in range(10):
+            index.add_page('page-%d.html' % i, self.__make_page(i))
+        outputs = index.write(self.__html_dir, OutputManifest(), jobs)
+
+        contents = {}
+        for path in outputs:
+            with open(os.path.join(self.__html_dir, path), 'rb') as _:
+                contents[path] = _.read()
+        with open(os.path.join(self.__html_dir, 'dumped.trie'), 'rb') as _:
+            contents['dumped.trie'] = _.read()
+        return contents
+
+    def test_spill(self):
+        for fragment_bundles in (0, 4):
+            expected = self.__read_index(fragment_bundles, 100000, 1)
+            self.assertIn('assets/js/search/initializes', expected)
+            self.assertEqual(
+                self.__read_index(fragment_bundles, 10, 4), expected)
+            self.assertEqual(os.listdir(self.__test_dir), ['html'])
+
+    def test_write_bundles(self):
+        index = SearchIndex(fragment_bundles=4)
+        for i in range(10):
+            index.add_page('page-%d.html' % i, self.__make_page(i))
+        outputs = index.write(self.__html_dir, OutputManifest())
+        fragments_dir = os.path.join(self.__html_dir, 'assets', 'js',
+                                     'search', 'hotdoc_fragments')
+
+        self.assertEqual(
+            sorted(os.listdir(fragments_dir)),
+            ['bundle-0.js', 'bundle-1.js', 'bundle-2.js', 'bundle-3.js',
+             'index.js'])
+        self.assertEqual(
+            len([path for path in outputs if 'hotdoc_fragments' in path]), 5)
+
+        offsets = read_jsonp(os.path.join(fragments_dir, 'index.js'))
+        self.assertEqual(offsets['bundles'], 4)
+        self.assertEqual(len(offsets['fragments']), 30)
+        for url, (bundle, offset, length) in offsets['fragments'].items():
+            with open(os.path.join(fragments_dir, 'bundle-%d.js' % bundle),
+                      'rb') as _:
+                _.seek(offset)
+                fragment = json.loads(_.read(length).decode('utf-8'))
+            self.assertEqual(fragment['url'], url)
+
+        fragment = offsets['fragments']['page-3.html#gst_init']
+        with open(os.path.join(fragments_dir,
+                               'bundle-%d.js' % fragment[0]), 'rb') as _:
+            contents = _.read().decode('utf-8')
+        self.assertTrue(contents.startswith(
+            'fragments_bundle_downloaded_cb(%d,[' % fragment[0]))
+        fragments = json.loads(contents[contents.index(',') + 1:-2])
+        self.assertIn({'url': 'page-3.html#gst_init',
+                       'fragment': 'Initializes 3 the library.\n'},
+                      fragments)
+
+    def test_write_trie_shards(self):
+        index = SearchIndex(trie_prefix_length=2)
+        index.add_page('index.html', parse_page_contents(
+            PAGE.encode('utf-8'), self.__stop_words))
+        outputs = index.write(self.__html_dir, OutputManifest())
+        trie_dir = os.path.join(self.__html_dir, 'assets', 'js', 'trie')
+
+        with open(os.path.join(self.__html_dir, 'dumped.trie'), 'rb') as _:
+            words = decode_words(_.read())
+
+        shards = read_jsonp(os.path.join(trie_dir, 'index.js'))
+        self.assertEqual(shards['prefix_length'], 2)
+        self.assertEqual(shards['shards']['Gs'], '4773')
+        self.assertEqual(sorted(shards['shards']),
+                         sorted({word[:2] for word in words}))
+
+        shard_words = []
+        for prefix, name in shards['shards'].items():
+            path = os.path.join(trie_dir, name)
+            with open(path + '.trie', 'rb') as _:
+                data = _.read()
+            with gzip.open(path + '.trie.gz', 'rb') as _:
+                self.assertEqual(_.read(), data)
+            with open(path + '.js', 'r', encoding='utf-8') as _:
+                self.assertEqual(_.read(), encode_shard_js(prefix, data))
+            for word in decode_words(data):
+                self.assertEqual(word[:2], prefix)
+                shard_words.append(word)
+            self.assertIn(os.path.join('assets', 'js', 'trie',
+                                       name + '.js.gz'), outputs)
+
+        self.assertEqual(sorted(shard_words), words)
+
+    def test_add_url(self):
+        index = SearchIndex()
+        index.add_url('api.html', 'The API', 'h1', ['The API'], 'The API',
+                      ['API', 'api'])
+        index.add_url('api.html#gst_init', 'The API', 'symbol', ['The API'],
+                      'gst_init', ['gst_init'])
+        index.write(self.__html_dir, OutputManifest())
+        search_dir = os.path.join(self.__html_dir, 'assets', 'js', 'search')
+
+        token = read_jsonp(os.path.join(search_dir, 'gst_init'))
+        self.assertEqual(token['urls'], [
+            {'url': 'api.html#gst_init',
+             'node_type': 'symbol',
+             'page': 'The API',
+             'sections': ['The API'],
+             'context': {'gi-language': ['default']}}])
+        fragment = read_jsonp(os.path.join(
+            search_dir, 'hotdoc_fragments', 'api.html.fragment'))
+        self.assertEqual(fragment['fragment'], 'The API\n')
+        with open(os.path.join(self.__html_dir, 'dumped.trie'), 'rb') as _:
+            self.assertEqual(decode_words(_.read()),
+                             ['API', 'api', 'gst_init'])
+
+    def test_query(self):
+        for fragment_bundles in (0, 4):
+            index = SearchIndex(fragment_bundles=fragment_bundles)
+            index.add_page('b.html', {'title': 'B', 'entries': [
+                ['intro', 'p', 'default', ['Intro'], 'Call gst_init.',
+                 ['Call', 'call', 'gst_init']],
+                ['gst_init', 'symbol', 'c', ['API'], 'gst_init',
+                 ['gst_init']]]})
+            index.add_page('a.html', {'title': 'A', 'entries': [
+                ['usage', 'h2', 'default', ['Usage'], 'Usage of gst_init',
+                 ['Usage', 'usage', 'gst_init']],
+                ['gst_deinit', 'p', 'default', ['API'], 'gst_deinit',
+                 ['gst_deinit']]]})
+            shutil.rmtree(self.__html_dir)
+            index.write(self.__html_dir, OutputManifest())
+            client = SearchClient(self.__html_dir)
+
+            # By node type priority, then by url
+            self.assertEqual(
+                [(result['url'], result['token'])
+                 for result in client.query('gst_init')],
+                [('b.html#gst_init', 'gst_init'),
+                 ('a.html#usage', 'gst_init'),
+                 ('b.html#intro', 'gst_init')])
+            self.assertEqual(client.lookup_words('gst_'),
+                             ['gst_init', 'gst_deinit'])
+            self.assertEqual(client.lookup_words('gst_unit'), ['gst_init'])
+            self.assertEqual(client.query('nothing'), [])
+            self.assertEqual(client.get_fragment('a.html#usage'),
+                             'Usage of gst_init\n')
+            self.assertIsNone(client.get_fragment('a.html#nothing'))
+
+    def test_cache(self):
+        cache_path = os.path.join(self.__test_dir, 'cache.db')
+        contents = PAGE.encode('utf-8')
+        cache = PageCache(cache_path, self.__stop_words)
+        page = cache.get('index.html', contents)
+        cache.save(['foo'])
+
+        cache = PageCache(cache_path, self.__stop_words)
+        self.assertEqual(cache.outputs, ['foo'])
+        with mock.patch.object(
+                indexer, 'parse_page_contents',
+                wraps=indexer.parse_page_contents) as parse:
+            self.assertEqual(cache.get('index.html', contents), page)
+            parse.assert_not_called()
+
+        with mock.patch.object(
+                indexer, 'parse_page_contents',
+                wraps=indexer.parse_page_contents) as parse:
+            cache.get('index.html',
+                      contents.replace(b'library', b'framework'))
+            parse.assert_called_once()
+        cache.save(['foo'])
+
+        # Changing the stop words invalidates the cache
+        cache = PageCache(cache_path, self.__stop_words | {'base'})
+        self.assertEqual(cache.outputs, [])
+
+    def test_cache_serialized(self):
+        # Serialized like the formatter does, a newline being added after
+        # the element ending the heading
+        doc = etree.fromstring(
+            PAGE.replace('Introduction</h1>',
+                         'Introduction to <code>GstElement</code></h1>'),
+            indexer.HTML_PARSER)
+        etree.FunctionNamespace('uri:hotdoc')['subpages'] = lambda _: []
+        transformed = etree.XSLT(XSLT_PAGE_TRANSFORM)(doc)
+        contents = '<!DOCTYPE html>\n%s' % str(transformed)
+        serialized_page = parse_page_contents(contents.encode('utf-8'),
+                                              self.__stop_words)
+        self.assertEqual(serialized_page['entries'][0][4],
+                         'Introduction to GstElement\n')
+        self.assertNotEqual(parse_page(transformed.getroot(),
+                                       self.__stop_words),
+                            serialized_page)
+
+        # Whether the page was written during this build or read back
+        # from disk when merging shards
+        cache_path = os.path.join(self.__test_dir, 'cache.db')
+        cache = PageCache(cache_path, self.__stop_words)
+        self.assertEqual(cache.get('index.html', contents), serialized_page)
+        cache.save([])
+        cache = PageCache(cache_path, self.__stop_words)
+        self.assertEqual(cache.get('index.html', contents.encode('utf-8')),
+                         serialized_page)
+
+    def test_cache_pages(self):
+        cache_path = os.path.join(self.__test_dir, 'cache.db')
+        cache = PageCache(cache_path, self.__stop_words)
+        page = cache.get('index.html', PAGE)
+        self.assertEqual(page, parse_page_contents(PAGE.encode('utf-8'),
+                                                   self.__stop_words))
+
+        # Only the current version of each page is saved
+        modified = PAGE.replace('library', 'framework')
+        cache.get('index.html', modified)
+        cache.save([])
+        cache = PageCache(cache_path, self.__stop_words)
+        with mock.patch.object(
+                indexer, 'parse_page_contents',
+                wraps=indexer.parse_page_contents) as parse:
+            cache.get('index.html', modified)
+            parse.assert_not_called()
+            cache.get('index.html', PAGE)
+            parse.assert_called_once()
+        self.assertEqual([rel_path for rel_path, _ in cache.get_pages()],
+                         ['index.html'])
+
+
+class TestTrie(unittest.TestCase):
+    def test_encode(self):
+        trie = Trie()
+        trie.add_word('ab')
+        trie.add_word('a')
+        trie.add_word('b')
+        data = trie.encode()
+        self.assertEqual(data, bytes.fromhex(
+            '0000031e'    # root, first child 1, last, letter 30
+            '000006e1'    # a, first child 3, final
+            '000001e2'    # b, last, final
+            '000001e2'))  # ab, last, final
+        self.assertEqual(decode_words(data), ['a', 'ab', 'b'])
+
+    def test_lookups(self):
+        trie = Trie()
+        for word in ('gst_init', 'gst_deinit', 'g10', 'g9', 'gtk', 'Gst'):
+            trie.add_word(word)
+        frozen = FrozenTrie(trie.encode())
+
+        node = frozen.lookup_node('gst')
+        self.assertFalse(frozen.is_final(node))
+        self.assertTrue(frozen.is_final(frozen.lookup_node('Gst')))
+        self.assertIsNone(frozen.lookup_node('gsx'))
+        self.assertEqual(frozen.lookup_completions(node, 5),
+                         ['gst_init', 'gst_deinit'])
+        # Digits are enumerated first, like the keys of javascript objects
+        self.assertEqual(frozen.lookup_completions(frozen.root, 3),
+                         ['g9', 'gtk', 'gst_init'])
+        self.assertEqual(frozen.lookup_submatches('init', 5),
+                         ['gst_init', 'gst_deinit'])
+        self.assertEqual(frozen.search('gsk', 1), {'gtk': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+The frozen trie of the search index words, as read by trie.js.
+
+The trie can also be split in shards, each holding the words starting
+with a given prefix, which trie_shards.js loads as the user types.
+
+`FrozenTrie` looks words up in an encoded trie the way trie.js does.
+"""
+
+import base64
+import json
+import struct
+
+
+LETTER_MASK = 0x7F
+FINAL_MASK = 1 << 7
+BFT_LAST_MASK = 1 << 8
+FIRST_CHILD_SHIFT = 9
+
+# The letter of the root node, only there for compatibility
+ROOT_LETTER = 30
+
+
+class Trie:
+    """
+    Words are encoded in breadth-first order, one big endian 32 bits
+    integer per node, holding the index of its first child, whether it
+    is the last of its siblings, whether it ends a word and its letter.
+    The children of a node are sorted by letter.
+
+    Only ASCII words can be encoded, which is all the tokenizer yields.
+    """
+
+    def __init__(self):
+        self.__root = {}
+        self.__final = set()
+
+    def add_word(self, word):
+        """
+        Adds @word to the trie.
+        """
+        node = self.__root
+        for letter in word:
+            node = node.setdefault(letter, {})
+        self.__final.add(id(node))
+
+    def encode(self):
+        """
+        Returns the encoded trie, as bytes.
+        """
+        final = self.__final
+        # Nodes are numbered in the order they are queued, the first
+        # child of a node is thus the first node queued after its siblings
+        queue = [(ROOT_LETTER, self.__root, BFT_LAST_MASK)]
+        nodes = []
+        for letter, node, flags in queue:
+            if not node:
+                nodes.append(flags | letter)
+                continue
+
+            nodes.append((len(queue) << FIRST_CHILD_SHIFT) | flags | letter)
+            letters = sorted(node) if len(node) > 1 else list(node)
+            last = letters[-1]
+            for child_letter in letters:
+                child = node[child_letter]
+                child_flags = FINAL_MASK if id(child) in final else 0
+                if child_letter == last:
+                    child_flags |= BFT_LAST_MASK
+                queue.append((ord(child_letter), child, child_flags))
+
+        return struct.pack('>%dI' % len(nodes), *nodes)
+
+
+def encode_js(data):
+    """
+    Wraps the encoded trie @data in the script setting `trie_data`.
+    """
+    return 'var trie_data="%s";' % base64.b64encode(data).decode('ascii')
+
+
+def get_shard_name(prefix):
+    """
+    Returns the name of the files of the shard holding the words that
+    start with @prefix, as file systems may not be case sensitive.
+    """
+    return prefix.encode('ascii').hex() or '_'
+
+
+def encode_shard_js(prefix, data):
+    """
+    Wraps the encoded trie @data of the shard of @prefix in the script
+    passing it to `trie_shard_downloaded_cb`.
+    """
+    return 'trie_shard_downloaded_cb(%s,"%s");' % (
+        json.dumps(prefix), base64.b64encode(data).decode('ascii'))
+
+
+def decode_words(data):
+    """
+    Returns the words of the encoded trie @data.
+    """
+    nodes = struct.unpack('>%dI' % (len(data) // 4), data)
+    words = []
+    stack = [(0, '')]
+    while stack:
+        index, prefix = stack.pop()
+        child_id = nodes[index] >> FIRST_CHILD_SHIFT
+        while child_id:
+            child = nodes[child_id]
+            word = prefix + chr(child & LETTER_MASK)
+            if child & FINAL_MASK:
+                words.append(word)
+            stack.append((child_id, word))
+            child_id = 0 if child & BFT_LAST_MASK else child_id + 1
+
+    return sorted(words)
+
+
+def _is_array_index(key):
+    return key.isdigit() and str(int(key)) == key and int(key) < 2 ** 32 - 1
+
+
+def _js_key_order(keys):
+    # Javascript enumerates the keys of objects that are array indices
+    # first, in numeric order, then the other keys in insertion order
+    indices = sorted((key for key in keys if _is_array_index(key)), key=int)
+    return indices + [key for key in keys if not _is_array_index(key)]
+
+
+class FrozenTrie:
+    """
+    The lookups of trie.js, over the encoded trie @data.
+
+    Nodes are (index, word) tuples, and the lookups return words in
+    the same order as trie.js.
+    """
+
+    def __init__(self, data):
+        self.__nodes = struct.unpack('>%dI' % (len(data) // 4), data)
+        self.root = (0, '')
+
+    def __get_edges(self, node):
+        index, word = node
+        edges = {}
+        child_id = self.__nodes[index] >> FIRST_CHILD_SHIFT
+        while child_id:
+            child = self.__nodes[child_id]
+            letter = chr(child & LETTER_MASK)
+            edges[letter] = (child_id, word + letter)
+            child_id = 0 if child & BFT_LAST_MASK else child_id + 1
+        return [edges[letter] for letter in _js_key_order(list(edges))]
+
+    def is_final(self, node):
+        """
+        Returns whether a word ends at @node.
+        """
+        return bool(self.__nodes[node[0]] & FINAL_MASK)
+
+    def lookup_node(self, word, start_node=None):
+        """
+        Returns the node reached by following the letters of @word from
+        @start_node, the root by default, or None.
+        """
+        node = self.root if start_node is None else start_node
+        for letter in word:
+            for edge in self.__get_edges(node):
+                if edge[1][-1] == letter:
+                    node = edge
+                    break
+            else:
+                return None
+        return node
+
+    def lookup_completions(self, start_node, max_completions):
+        """
+        Returns up to @max_completions words continuing the word of
+        @start_node.
+        """
+        completions = []
+        queue = [start_node]
+        while queue:
+            for node in self.__get_edges(queue.pop()):
+                if self.is_final(node):
+                    completions.append(node[1])
+                if len(completions) == max_completions:
+                    return completions
+                queue.append(node)
+        return completions
+
+    def __submatches_for_node(self, node, word, submatches, max_submatches):
+        match = self.lookup_node(word, node)
+        if match is None:
+            return
+
+        if self.is_final(match):
+            submatches.append(match[1])
+
+        if len(submatches) == max_submatches:
+            return
+
+        submatches += self.lookup_completions(
+            match, max_submatches - len(submatches))
+
+    def lookup_submatches(self, word, max_submatches):
+        """
+        Returns up to @max_submatches words containing @word.
+        """
+        submatches = []
+        self.__submatches_for_node(self.root, word, submatches,
+                                   max_submatches)
+        queue = [self.root]
+        while queue and len(submatches) < max_submatches:
+            for node in self.__get_edges(queue.pop()):
+                self.__submatches_for_node(node, word, submatches,
+                                           max_submatches)
+                if len(submatches) >= max_submatches:
+                    break
+                queue.append(node)
+        return submatches
+
+    def __search(self, node, word, previous_row, results, max_cost):
+        letter = node[1][-1]
+        current_row = [previous_row[0] + 1]
+        for column in range(1, len(word) + 1):
+            current_row.append(min(
+                current_row[column - 1] + 1,
+                previous_row[column] + 1,
+                previous_row[column - 1] + (word[column - 1] != letter)))
+
+        if current_row[-1] <= max_cost and self.is_final(node):
+            results[node[1]] = current_row[-1]
+
+        if min(current_row) <= max_cost:
+            for edge in self.__get_edges(node):
+                self.__search(edge, word, current_row, results, max_cost)
+
+    def search(self, word, max_cost):
+        """
+        Returns the words at most @max_cost edits away from @word, as a
+        dict mapping them to their distance.
+        """
+        corrections = {}
+        row = list(range(len(word) + 1))
+        for node in self.__get_edges(self.root):
+            self.__search(node, word, row, corrections, max_cost)
+        return {key: corrections[key]
+                for key in _js_key_order(list(corrections))}
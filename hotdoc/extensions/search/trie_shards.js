@@ -0,0 +1,156 @@
+/*
+ * Lazy loading of the trie shards, see the --search-trie-prefix-length
+ * option of hotdoc's search extension.
+ *
+ * Copyright 2026 Collabora Ltd.
+ *
+ * This library is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU Lesser General Public
+ * License as published by the Free Software Foundation; either
+ * version 2.1 of the License, or (at your option) any later version.
+ *
+ * This library is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public
+ * License along with this library; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+ */
+
+/*
+ * hotdoc_lookup_trie_shards(trie_dir, query, callback) calls
+ * callback([trie, ...]) with the Trie objects, see trie.js, of the
+ * shards that may hold words starting with query, loading the ones
+ * that were not loaded yet.
+ *
+ * Over HTTP, the raw .trie files are fetched, which the server may send
+ * compressed from their precompressed variants. Otherwise, the .js
+ * files holding the base64 encoded shards are loaded as scripts.
+ */
+
+var trie_shards_index = undefined;
+var trie_shards_waiting_index = [];
+var trie_shards = {};
+var trie_shards_waiting = {};
+
+function trie_shards_load_script(src) {
+	var script = document.createElement('script');
+	script.type = 'text/javascript';
+	script.src = src;
+	document.getElementsByTagName('head')[0].appendChild(script);
+}
+
+function trie_shards_index_downloaded_cb(index) {
+	trie_shards_index = index;
+
+	var waiting = trie_shards_waiting_index;
+	trie_shards_waiting_index = [];
+	for (var i = 0; i < waiting.length; i++) {
+		hotdoc_lookup_trie_shards.apply(null, waiting[i]);
+	}
+}
+
+function trie_shard_loaded(prefix, trie) {
+	trie_shards[prefix] = trie;
+
+	var waiting = trie_shards_waiting[prefix] || [];
+	delete trie_shards_waiting[prefix];
+	for (var i = 0; i < waiting.length; i++) {
+		waiting[i]();
+	}
+}
+
+function trie_shard_downloaded_cb(prefix, data) {
+	trie_shard_loaded(prefix, new Trie(data, true));
+}
+
+function trie_shards_fetch(trie_dir, prefix) {
+	var name = trie_shards_index.shards[prefix];
+	var request = new XMLHttpRequest();
+
+	request.open('GET', trie_dir + '/' + name + '.trie');
+	request.responseType = 'arraybuffer';
+	request.onload = function() {
+		if (request.status != 200) {
+			trie_shards_load_script(trie_dir + '/' + name + '.js');
+			return;
+		}
+
+		var bytes = new Uint8Array(request.response);
+		var data = '';
+		for (var i = 0; i < bytes.length; i += 8192) {
+			data += String.fromCharCode.apply(
+				null, bytes.subarray(i, i + 8192));
+		}
+		trie_shard_loaded(prefix, new Trie(data, false));
+	};
+	request.onerror = function() {
+		trie_shards_load_script(trie_dir + '/' + name + '.js');
+	};
+	request.send();
+}
+
+function trie_shards_load(trie_dir, prefix, done) {
+	if (trie_shards[prefix] !== undefined) {
+		done();
+		return;
+	}
+
+	if (trie_shards_waiting[prefix] !== undefined) {
+		trie_shards_waiting[prefix].push(done);
+		return;
+	}
+
+	trie_shards_waiting[prefix] = [done];
+	if (window.location.protocol.indexOf('http') == 0) {
+		trie_shards_fetch(trie_dir, prefix);
+	} else {
+		trie_shards_load_script(trie_dir + '/' +
+				trie_shards_index.shards[prefix] + '.js');
+	}
+}
+
+function hotdoc_lookup_trie_shards(trie_dir, query, callback) {
+	if (trie_shards_index === undefined) {
+		if (trie_shards_waiting_index.length == 0) {
+			trie_shards_load_script(trie_dir + '/index.js');
+		}
+		trie_shards_waiting_index.push([trie_dir, query, callback]);
+		return;
+	}
+
+	var query_prefix = query.slice(0, trie_shards_index.prefix_length);
+	var prefixes = [];
+	for (var prefix in trie_shards_index.shards) {
+		/* Queries shorter than the prefixes match several shards */
+		if (prefix.indexOf(query_prefix) == 0 ||
+				query_prefix.indexOf(prefix) == 0) {
+			prefixes.push(prefix);
+		}
+	}
+
+	var pending = prefixes.length;
+	var done = function() {
+		pending -= 1;
+		if (pending > 0) {
+			return;
+		}
+
+		var tries = [];
+		for (var i = 0; i < prefixes.length; i++) {
+			tries.push(trie_shards[prefixes[i]]);
+		}
+		callback(tries);
+	};
+
+	if (pending == 0) {
+		callback([]);
+		return;
+	}
+
+	for (var i = 0; i < prefixes.length; i++) {
+		trie_shards_load(trie_dir, prefixes[i], done);
+	}
+}
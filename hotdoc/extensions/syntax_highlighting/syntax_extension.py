@@ -21,10 +21,8 @@ A syntax highlighting module
 """
 import os
 
-from hotdoc.core.formatter import Formatter
 from hotdoc.core.extension import Extension
 
-from hotdoc.utils.utils import recursive_overwrite
 from hotdoc.utils.loggable import warn, Logger
 from hotdoc.core.exceptions import ConfigError
 
@@ -47,6 +45,7 @@ class SyntaxHighlightingExtension(Extension):
     """
     extension_name = 'syntax-highlighting-extension'
     argument_prefix = 'syntax-highlighting'
+    parallel_setup = True
     needs_licensing = False
 
     def __init__(self, app, project):
@@ -56,7 +55,8 @@ class SyntaxHighlightingExtension(Extension):
         self.keep_markup = False
 
     def __formatting_page_cb(self, formatter, page):
-        prism_theme = Formatter.theme_meta.get('prism-theme', 'prism-tomorrow')
+        theme_meta = formatter.context.theme_meta
+        prism_theme = theme_meta.get('prism-theme', 'prism-tomorrow')
         prism_theme_path = '%s.css' % os.path.join(
             HERE, 'prism', 'themes', prism_theme)
 
@@ -66,7 +66,7 @@ class SyntaxHighlightingExtension(Extension):
             warn('syntax-invalid-theme', 'Prism has no theme named %s' %
                  prism_theme)
 
-        prism_light_theme = Formatter.theme_meta.get(
+        prism_light_theme = theme_meta.get(
             'prism-light-theme', 'prism')
         prism_light_theme_path = '%s.css' % os.path.join(
             HERE, 'prism', 'themes', prism_light_theme)
@@ -97,7 +97,7 @@ class SyntaxHighlightingExtension(Extension):
         ipath = os.path.join(HERE, 'prism', 'components')
         for folder in self.__asset_folders:
             opath = os.path.join(self.app.output, folder)
-            recursive_overwrite(ipath, opath)
+            self.formatter.context.asset_sync.sync(ipath, opath)
 
     @classmethod
     def get_assets_licensing(cls):
@@ -131,6 +131,7 @@ def parse_choice_blacklist(blacklist):
 
 class TagExtension(Extension):
     extension_name = 'core-tags'
+    parallel_setup = True
 
     def __init__(self, app, project):
         super(TagExtension, self).__init__(app, project)
@@ -25,10 +25,12 @@ gtk-doc comment format.
 import os
 import re
 import html
+import json
 from collections import OrderedDict
 from itertools import zip_longest
 from lxml import etree
 
+import appdirs
 import yaml
 from yaml.constructor import ConstructorError
 
@@ -40,15 +42,13 @@ from hotdoc.utils.configurable import Configurable
 from hotdoc.parsers import cmark
 from hotdoc.utils.loggable import Logger, warn, info, debug
 from hotdoc.utils.utils import XDG_DATA_HOME, XDG_DATA_DIRS
+from hotdoc.utils.sqlite_utils import LazyConnection
 
 Logger.register_warning_code('gtk-doc', HotdocSourceException)
 Logger.register_warning_code('gtk-doc-bad-link', HotdocSourceException)
 Logger.register_warning_code('gtk-doc-bad-syntax', HotdocSourceException)
 
 
-GTKDOC_HREFS = {}
-
-
 GATHERED_GTKDOC_LINKS = False
 
 
@@ -578,81 +578,113 @@ GIDOC_ONLINE_OVERRIDES = {
 }
 
 
-def parse_devhelp_index(dir_):
-    path = os.path.join(dir_, os.path.basename(dir_) + '.devhelp2')
-    if not os.path.exists(path):
-        return False
-
-    try:
-        dh_root = etree.parse(path).getroot()
-    except etree.Error:
-        # No need to look for a sgml file
-        return True
-
-    debug('Parsing devhelp index at %s' % path)
+DEVHELP_KEYWORD_TAG = '{http://www.devhelp.net/book}keyword'
 
+def _get_devhelp_online(path, dh_root):
     online = dh_root.attrib.get('online')
     name = dh_root.attrib.get('name')
-    author = dh_root.attrib.get('author')
-    language = dh_root.attrib.get('language')
 
     if not online:
         if not name:
             info(
                 'Skipping devhelp index at %s, no online attribute and no name attribute', path)
-            return False
+            return None
         if name in GIDOC_ONLINE_OVERRIDES:
             online = GIDOC_ONLINE_OVERRIDES[name]
         else:
             online = 'https://developer.gnome.org/%s/unstable/' % name
 
+    return online
 
-    keywords = dh_root.findall('.//{http://www.devhelp.net/book}keyword')
-    for kw in keywords:
-        name = kw.attrib["name"]
-        type_ = kw.attrib['type']
-        link = kw.attrib['link']
 
-        if type_ in ['macro', 'function']:
-            name = name.rstrip(u' ()')
-        elif type_ in ['struct', 'enum', 'union']:
-            split = name.split(' ', 1)
-            if len(split) == 2:
-                name = split[1]
+def _add_devhelp_keyword(links, kw, online, author, language):
+    name = kw.attrib["name"]
+    type_ = kw.attrib['type']
+    link = kw.attrib['link']
+
+    if type_ in ['macro', 'function']:
+        name = name.rstrip(u' ()')
+    elif type_ in ['struct', 'enum', 'union']:
+        split = name.split(' ', 1)
+        if len(split) == 2:
+            name = split[1]
+        else:
+            name = split[0]
+    elif type_ in ['signal', 'property', 'field', 'member']:
+        # Heuristic to determine that the naming follows the gtk-doc "logic"
+        if '#' in link and (language.lower() == 'c' or author == 'hotdoc'):
+            anchor = link.split('#', 1)[1]
+            if author == 'hotdoc':
+                name = anchor
             else:
-                name = split[0]
-        elif type_ in ['signal', 'property', 'field', 'member']:
-            # Heuristic to determine that the naming follows the gtk-doc "logic"
-            if '#' in link and (language.lower() == 'c' or author == 'hotdoc'):
-                anchor = link.split('#', 1)[1]
-                if author == 'hotdoc':
-                    name = anchor
-                else:
-                    split = anchor.split('-', 1)
-                    if type_ == 'signal':
-                        name = '%s::%s' % (split[0], split[1].lstrip('-'))
-                    elif type_ == 'property':
-                        name = '%s:%s' % (split[0], split[1].lstrip('-'))
-                    elif type_ == 'field':
-                        name = '%s.%s' % (split[0], split[1].lstrip('-'))
-            # gi-doc
-            elif name.startswith('The ') and name.endswith(f' {type_}'):
-                name = name[len('The '):-len(f' {type_}')]
-        elif type_ in ['vfunc']:
-            if '#' in link and (language.lower() == 'c' or author == 'hotdoc'):
-                anchor = link.split('#', 1)[1]
-                if author == 'hotdoc':
-                    name = anchor
-                    GTKDOC_HREFS[name.replace('::', '.')] = online + link
-
-        GTKDOC_HREFS[name] = online + link
-
-    return True
+                split = anchor.split('-', 1)
+                if type_ == 'signal':
+                    name = '%s::%s' % (split[0], split[1].lstrip('-'))
+                elif type_ == 'property':
+                    name = '%s:%s' % (split[0], split[1].lstrip('-'))
+                elif type_ == 'field':
+                    name = '%s.%s' % (split[0], split[1].lstrip('-'))
+        # gi-doc
+        elif name.startswith('The ') and name.endswith(f' {type_}'):
+            name = name[len('The '):-len(f' {type_}')]
+    elif type_ in ['vfunc']:
+        if '#' in link and (language.lower() == 'c' or author == 'hotdoc'):
+            anchor = link.split('#', 1)[1]
+            if author == 'hotdoc':
+                name = anchor
+                links[name.replace('::', '.')] = online + link
+
+    links[name] = online + link
+
+
+def parse_devhelp_index(dir_):
+    """
+    Returns the links listed in the devhelp index of the book located
+    in @dir_, or None if no usable devhelp index was found.
+
+    The index is parsed incrementally, as some books are quite large.
+    """
+    path = os.path.join(dir_, os.path.basename(dir_) + '.devhelp2')
+    if not os.path.exists(path):
+        return None
+
+    debug('Parsing devhelp index at %s' % path)
+
+    links = {}
+    online = author = language = None
+    dh_root = None
+
+    try:
+        for event, elem in etree.iterparse(path, events=('start', 'end')):
+            if dh_root is None:
+                dh_root = elem
+                online = _get_devhelp_online(path, dh_root)
+                if online is None:
+                    return None
+                author = dh_root.attrib.get('author')
+                language = dh_root.attrib.get('language')
+            elif event == 'end' and elem.tag == DEVHELP_KEYWORD_TAG:
+                _add_devhelp_keyword(links, elem, online, author, language)
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    except etree.Error:
+        # No need to look for a sgml file
+        return {}
+
+    return links
 
 
 def parse_sgml_index(dir_):
+    """
+    Returns the links listed in the gtk-doc sgml index of the book located
+    in @dir_.
+
+    Raises:
+        IOError: if the book has no sgml index.
+    """
+    links = {}
     remote_prefix = ""
-    n_links = 0
     path = os.path.join(dir_, "index.sgml")
     with open(path, 'r') as f:
         for l in f:
@@ -672,18 +704,33 @@ def parse_sgml_index(dir_):
                 else:
                     href = filename
 
-                GTKDOC_HREFS[title] = href
-                n_links += 1
+                links[title] = href
 
+    return links
 
-def gather_links():
-    global GATHERED_GTKDOC_LINKS
 
-    if GATHERED_GTKDOC_LINKS:
-        return
+def _get_book_index_mtime(dir_):
+    mtimes = []
+    for fname in (os.path.basename(dir_) + '.devhelp2', 'index.sgml'):
+        try:
+            mtimes.append(os.path.getmtime(os.path.join(dir_, fname)))
+        except OSError:
+            mtimes.append(None)
+    return mtimes
 
-    GATHERED_GTKDOC_LINKS = True
 
+def _parse_book_links(dir_):
+    links = parse_devhelp_index(dir_)
+    if links is None:
+        try:
+            links = parse_sgml_index(dir_)
+        except IOError:
+            links = {}
+    return links
+
+
+def _list_book_dirs():
+    res = []
     # XDG_DATA_DIRS is preference-ordered, we reverse so that preferred
     # links override less-preferred ones
     for datadir in reversed([XDG_DATA_HOME] + XDG_DATA_DIRS):
@@ -695,16 +742,182 @@ def gather_links():
             for node in os.listdir(path):
                 dir_ = os.path.join(path, node)
                 if os.path.isdir(dir_):
-                    if not parse_devhelp_index(dir_):
-                        try:
-                            parse_sgml_index(dir_)
-                        except IOError:
-                            pass
+                    res.append(dir_)
+    return res
+
+
+def _get_external_links_db_path():
+    return os.path.join(appdirs.user_cache_dir("hotdoc", "hotdoc"),
+                        'external-links.db')
+
+
+class ExternalLinks:
+    """
+    Maps symbol names to the online location where they are documented,
+    as advertised by the devhelp and gtk-doc books installed on the system.
+
+    The links of all the books are stored in an SQLite database in the user
+    cache directory, each book only being re-parsed when its index files
+    were modified. Lookups are lazy: the books are only synchronized with
+    the database the first time a link is requested, and each lookup then
+    costs one indexed query.
+
+    Links can also be added explicitly, either as overrides, which take
+    precedence over the books, or as fallbacks, only used when no book
+    provides a link for a given name.
+    """
+
+    # Bump this whenever the way links are extracted from the books changes,
+    # so that stale databases get discarded
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path=None):
+        self.__db_path = db_path
+        self.__db = LazyConnection(self.__sync, 'external links database',
+                                   timeout=60)
+        self.__book_ranks = {}
+        self.__overrides = {}
+        self.__fallbacks = {}
+        self.__lookups = {}
+
+    def __setitem__(self, name, href):
+        self.__overrides[name] = href
+        self.__lookups.pop(name, None)
+
+    def __getitem__(self, name):
+        href = self.get(name)
+        if href is None:
+            raise KeyError(name)
+        return href
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def add_fallback(self, name, href):
+        """
+        Registers @href as the link for @name, unless one of the installed
+        books provides a link for it.
+        """
+        self.__fallbacks[name] = href
+        self.__lookups.pop(name, None)
+
+    def get(self, name, default=None):
+        """
+        Returns the online link for @name, or @default.
+        """
+        try:
+            href = self.__lookups[name]
+        except KeyError:
+            href = self.__overrides.get(name)
+            if href is None:
+                href = self.__lookup_books(name)
+            if href is None:
+                href = self.__fallbacks.get(name)
+            self.__lookups[name] = href
+
+        if href is None:
+            return default
+        return href
+
+    def reset(self):
+        """
+        Drops the registered links and the connection to the database.
+        """
+        self.__db.close()
+        self.__book_ranks = {}
+        self.__overrides = {}
+        self.__fallbacks = {}
+        self.__lookups = {}
+
+    def __lookup_books(self, name):
+        db = self.__get_db()
+
+        best_rank = -1
+        href = None
+        for book, book_href in db.execute(
+                'SELECT book, href FROM links WHERE name = ?', (name,)):
+            # Books that were not found on this system in this run may
+            # still be present in the database
+            rank = self.__book_ranks.get(book, -1)
+            if rank > best_rank:
+                best_rank = rank
+                href = book_href
+
+        return href
+
+    def __get_db(self):
+        return self.__db.get(
+            self.__db_path or _get_external_links_db_path())
+
+    def __create_schema(self, db):
+        version = db.execute('PRAGMA user_version').fetchone()[0]
+        if version == ExternalLinks.SCHEMA_VERSION:
+            return
+
+        with db:
+            db.execute('DROP TABLE IF EXISTS links')
+            db.execute('DROP TABLE IF EXISTS books')
+            db.execute('CREATE TABLE books '
+                       '(path TEXT PRIMARY KEY, mtimes TEXT NOT NULL)')
+            db.execute('CREATE TABLE links '
+                       '(name TEXT NOT NULL, href TEXT NOT NULL, '
+                       'book TEXT NOT NULL)')
+            db.execute('CREATE INDEX links_name ON links (name)')
+            db.execute('CREATE INDEX links_book ON links (book)')
+            db.execute('PRAGMA user_version = %d' %
+                       ExternalLinks.SCHEMA_VERSION)
+
+    def __sync(self, db):
+        self.__create_schema(db)
+
+        known_books = dict(db.execute('SELECT path, mtimes FROM books'))
+        stale_books = OrderedDict()
+        self.__book_ranks = {}
+
+        for rank, dir_ in enumerate(_list_book_dirs()):
+            self.__book_ranks[dir_] = rank
+            mtimes = json.dumps(_get_book_index_mtime(dir_))
+            if known_books.get(dir_) != mtimes:
+                stale_books[dir_] = mtimes
+
+        if not stale_books:
+            return
+
+        parsed = [(dir_, mtimes, _parse_book_links(dir_))
+                  for dir_, mtimes in stale_books.items()]
+
+        with db:
+            for dir_, mtimes, links in parsed:
+                db.execute('DELETE FROM links WHERE book = ?', (dir_,))
+                db.executemany(
+                    'INSERT INTO links (name, href, book) VALUES (?, ?, ?)',
+                    ((name, href, dir_) for name, href in links.items()))
+                db.execute(
+                    'INSERT OR REPLACE INTO books (path, mtimes) '
+                    'VALUES (?, ?)', (dir_, mtimes))
+
+
+GTKDOC_HREFS = ExternalLinks()
+
+
+def gather_links():
+    """
+    Registers the links hotdoc knows about but which are not advertised
+    by the installed books.
+
+    The books themselves are only looked at, lazily, the first time
+    `GTKDOC_HREFS` is queried.
+    """
+    global GATHERED_GTKDOC_LINKS
+
+    if GATHERED_GTKDOC_LINKS:
+        return
+
+    GATHERED_GTKDOC_LINKS = True
 
     # Newer GLib docs do not advertise links for those types
     for typename in ['gpointer', 'gconstpointer', 'gboolean', 'gint8', 'guint8', 'gint16', 'guint16', 'gint32', 'guint32', 'gchar', 'guchar', 'gshort', 'gushort', 'gint', 'guint', 'gfloat', 'gdouble', 'gsize', 'gssize', 'goffset', 'gintptr', 'guintptr', 'glong', 'gulong', 'gint64', 'guint64',]:
-        if not typename in GTKDOC_HREFS:
-            GTKDOC_HREFS[typename] = f"https://docs.gtk.org/glib/types.html#{typename}"
+        GTKDOC_HREFS.add_fallback(typename, f"https://docs.gtk.org/glib/types.html#{typename}")
 
     for numerical_type in 'INT', 'SHORT', 'LONG', 'INT8', 'INT16', 'INT32', 'INT64', 'SSIZE', 'OFFSET', 'FLOAT', 'DOUBLE':
         GTKDOC_HREFS[f'G_MIN{numerical_type}'] = f'https://web.mit.edu/barnowl/share/gtk-doc/html/glib/glib-Limits-of-Basic-Types.html#G-MIN{numerical_type}:CAPS'
@@ -729,8 +942,7 @@ def gather_links():
     GTKDOC_HREFS['G_GNUC_NO_INSTRUMENT'] = 'https://web.mit.edu/barnowl/share/gtk-doc/html/glib/glib-Miscellaneous-Macros.html#G-GNUC-NO-INSTRUMENT:CAPS'
 
     for define in ['TRUE', 'FALSE', 'NULL']:
-        if not define in GTKDOC_HREFS:
-            GTKDOC_HREFS[define] = f'https://web.mit.edu/barnowl/share/gtk-doc/html/glib/glib-Standard-Macros.html#{define}:CAPS'
+        GTKDOC_HREFS.add_fallback(define, f'https://web.mit.edu/barnowl/share/gtk-doc/html/glib/glib-Standard-Macros.html#{define}:CAPS')
 
 
 def search_online_links(resolver, name):
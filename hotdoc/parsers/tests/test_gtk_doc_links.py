@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import os
+import shutil
+import unittest
+
+from hotdoc.parsers import gtk_doc
+from hotdoc.parsers.gtk_doc import ExternalLinks
+from hotdoc.utils.utils import touch
+
+
+DEVHELP_BOOK = '''<?xml version="1.0"?>
+<book xmlns="http://www.devhelp.net/book" title="Foo" link="index.html"
+      author="" name="foo" version="2" language="c" online="%s">
+  <functions>
+    <keyword type="function" name="foo_bar ()" link="foo.html#foo-bar"/>
+    <keyword type="struct" name="struct Foo" link="foo.html#Foo"/>
+  </functions>
+</book>
+'''
+
+SGML_INDEX = '''<ONLINE href="https://bar.org">
+<ANCHOR id="bar-baz" href="bar/bar.html#bar-baz">
+'''
+
+
+class TestExternalLinks(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__test_dir = os.path.abspath(
+            os.path.join(here, 'tmp-external-links'))
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        self.__preferred_dir = os.path.join(self.__test_dir, 'preferred')
+        self.__fallback_dir = os.path.join(self.__test_dir, 'fallback')
+        self.__db_path = os.path.join(self.__test_dir, 'links.db')
+        self.__orig_data_dirs = gtk_doc.XDG_DATA_DIRS
+        self.__orig_data_home = gtk_doc.XDG_DATA_HOME
+        gtk_doc.XDG_DATA_DIRS = [self.__preferred_dir, self.__fallback_dir]
+        gtk_doc.XDG_DATA_HOME = os.path.join(self.__test_dir, 'home')
+
+    def tearDown(self):
+        gtk_doc.XDG_DATA_DIRS = self.__orig_data_dirs
+        gtk_doc.XDG_DATA_HOME = self.__orig_data_home
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+
+    def __add_devhelp_book(self, datadir, online):
+        bookdir = os.path.join(datadir, 'devhelp', 'books', 'foo')
+        os.makedirs(bookdir, exist_ok=True)
+        path = os.path.join(bookdir, 'foo.devhelp2')
+        with open(path, 'w') as _:
+            _.write(DEVHELP_BOOK % online)
+        return path
+
+    def __add_sgml_book(self, datadir):
+        bookdir = os.path.join(datadir, 'gtk-doc', 'html', 'bar')
+        os.makedirs(bookdir, exist_ok=True)
+        with open(os.path.join(bookdir, 'index.sgml'), 'w') as _:
+            _.write(SGML_INDEX)
+
+    def test_lookup(self):
+        self.__add_devhelp_book(self.__fallback_dir, 'https://foo.org/')
+        self.__add_sgml_book(self.__fallback_dir)
+
+        links = ExternalLinks(db_path=self.__db_path)
+        self.assertEqual(links.get('foo_bar'),
+                         'https://foo.org/foo.html#foo-bar')
+        self.assertEqual(links.get('Foo'), 'https://foo.org/foo.html#Foo')
+        self.assertEqual(links.get('bar_baz'),
+                         'https://bar.org/bar.html#bar-baz')
+        self.assertIsNone(links.get('nope'))
+        self.assertNotIn('nope', links)
+
+    def test_preferred_data_dir_wins(self):
+        self.__add_devhelp_book(self.__fallback_dir, 'https://old.org/')
+        self.__add_devhelp_book(self.__preferred_dir, 'https://new.org/')
+
+        links = ExternalLinks(db_path=self.__db_path)
+        self.assertEqual(links['foo_bar'],
+                         'https://new.org/foo.html#foo-bar')
+
+    def test_overrides_and_fallbacks(self):
+        self.__add_devhelp_book(self.__fallback_dir, 'https://foo.org/')
+
+        links = ExternalLinks(db_path=self.__db_path)
+        links.add_fallback('foo_bar', 'https://fallback.org')
+        links.add_fallback('gpointer', 'https://fallback.org')
+        links['Foo'] = 'https://override.org'
+
+        self.assertEqual(links['foo_bar'],
+                         'https://foo.org/foo.html#foo-bar')
+        self.assertEqual(links['gpointer'], 'https://fallback.org')
+        self.assertEqual(links['Foo'], 'https://override.org')
+
+    def test_modified_book_is_reparsed(self):
+        path = self.__add_devhelp_book(self.__fallback_dir,
+                                       'https://foo.org/')
+
+        links = ExternalLinks(db_path=self.__db_path)
+        self.assertEqual(links['foo_bar'],
+                         'https://foo.org/foo.html#foo-bar')
+
+        # Unchanged books are served from the database
+        links = ExternalLinks(db_path=self.__db_path)
+        self.assertEqual(links['foo_bar'],
+                         'https://foo.org/foo.html#foo-bar')
+
+        self.__add_devhelp_book(self.__fallback_dir, 'https://moved.org/')
+        touch(path)
+        links = ExternalLinks(db_path=self.__db_path)
+        self.assertEqual(links['foo_bar'],
+                         'https://moved.org/foo.html#foo-bar')
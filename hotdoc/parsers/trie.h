@@ -1,25 +0,0 @@
-/* Copyright (c) 2012 Artem Shinkarov <artyom.shinkaroff@gmail.com>
-   Permission to use, copy, modify, and distribute this software for any
-   purpose with or without fee is hereby granted, provided that the above
-   copyright notice and this permission notice appear in all copies.
-   THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
-   WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
-   MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
-   ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
-   WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
-   ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
-   OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.  */
-
-#ifndef TRIE_H_
-#define TRIE_H_
-
-#include <stdlib.h>
-
-struct trie;
-
-struct trie *trie_new ();
-void trie_free (struct trie *trie);
-void trie_add_word (struct trie *trie, const char *word, size_t length, ssize_t info);
-void trie_encode (struct trie *t, const char *trie_path, const char *trie_js_path);
-
-#endif
@@ -22,48 +22,82 @@
 
 import argparse
 import cProfile
+import fnmatch
 import json
+import multiprocessing
 import os
+import re
 import shutil
 import sys
+import time
 import traceback
 
 from urllib.parse import urlparse
 from collections import OrderedDict
 
 from hotdoc.core.project import Project, CoreExtension
+from hotdoc.core.formatter import FormattingContext
 from hotdoc.core.config import Config, load_config_json
 from hotdoc.core.exceptions import HotdocException
 from hotdoc.core.database import Database
-from hotdoc.core.links import LinkResolver, Link
-from hotdoc.utils.utils import all_subclasses, get_extension_classes, get_cat
+from hotdoc.core.links import (LinkResolver, Link, LinkInventory,
+                               LINK_INVENTORY)
+from hotdoc.utils.utils import (all_subclasses, get_extension_classes, get_cat,
+                                recursive_overwrite, OrderedSet)
 from hotdoc.utils.loggable import Logger, error, info
+from hotdoc.utils.watcher import Watcher
+from hotdoc.utils.output import OutputManifest
+from hotdoc.utils.server import PreviewServer
 from hotdoc.utils.setup_utils import VERSION
 from hotdoc.utils.configurable import Configurable
 from hotdoc.utils.signals import Signal
 
 
+# Written at the root of the output of `hotdoc run --shard`
+SHARD_MANIFEST = 'hotdoc-shard.json'
+SHARD_MANIFEST_VERSION = 1
+
+# The folder of the private folder kept across builds
+PERSISTENT_FOLDER = 'persistent'
+
+
 class Application(Configurable):
     """
     Banana banana
     """
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, extension_classes):
+    def __init__(self, extension_classes, engines=None):
+        """
+        Args:
+            extension_classes: list, the extension classes to use.
+            engines: dict, template engines shared with other
+                applications, see `formatter.FormattingContext`.
+        """
         self.extension_classes = OrderedDict(
             {CoreExtension.extension_name: CoreExtension})
         for ext_class in extension_classes:
             self.extension_classes[ext_class.extension_name] = ext_class
         self.output = None
         self.private_folder = None
+        self.persistent_folder = None
         self.database = None
         self.link_resolver = None
         self.dry = False
         self.hostname = None
         self.config = None
         self.project = None
+        self.shard = None
+        self.only_pages = []
+        self.only_pages_subpages = False
+        self.precompress = False
+        self.precompress_jobs = 0
+        self.link_inventory = None
+        self.formatting_context = FormattingContext(engines)
         self.formatted_signal = Signal()
         self.__all_projects = {}
+        self.__preview_paths = {}
+        self.__previewed_pages = set()
 
     @staticmethod
     def add_arguments(parser):
@@ -84,21 +118,120 @@ class Application(Configurable):
                             'for example <http://hotdoc.com>. When provided, '
                             'an XML sitemap will be generated for SEO '
                             'purposes.')
+        parser.add_argument('--shard', dest='shard', action='store',
+                            help='Only set up, format and write out the '
+                            'I-th of N slices of the subprojects, in the '
+                            'I/N form. Links to the subprojects of the '
+                            'other shards are resolved with the link '
+                            'inventories they wrote, see '
+                            '--link-inventories. The output of all the '
+                            'shards can then be combined with the merge '
+                            'command')
+        parser.add_argument('--merge-shards', dest='merge_shards',
+                            nargs='+', default=[],
+                            help='The output folders of the shards the '
+                            'merge command combines. Merging sets up '
+                            'every subproject again, for the extensions '
+                            'to index the pages of the shards')
+        parser.add_argument('--only-pages', dest='only_pages', nargs='+',
+                            default=[],
+                            help='Only format and write out the pages whose '
+                            'names or source paths match these glob '
+                            'patterns, the output of previous runs is kept '
+                            'for the other pages')
+        parser.add_argument('--only-pages-subpages',
+                            dest='only_pages_subpages', action='store_true',
+                            help='With --only-pages, also format and write '
+                            'out the subpages of the matching pages')
+        parser.add_argument('--watch', dest='watch', action='store_true',
+                            help='Keep running after building the '
+                            'documentation, and build it again when its '
+                            'sources change, not supported in batch mode')
+        parser.add_argument('--serve-address', dest='serve_address',
+                            default='localhost',
+                            help='The address the serve command listens on')
+        parser.add_argument('--serve-port', dest='serve_port', type=int,
+                            default=8000,
+                            help='The port the serve command listens on')
+        parser.add_argument('--precompress', dest='precompress',
+                            action='store_true',
+                            help='Also write gzip, and brotli when '
+                            'available, compressed variants of the html, '
+                            'javascript, css and search fragment files '
+                            'that changed, with .gz and .br suffixes')
+        parser.add_argument('--precompress-jobs', dest='precompress_jobs',
+                            type=int, default=0,
+                            help='Number of threads compressing the '
+                            'output with --precompress, 0 for one per CPU')
+        parser.add_argument('--link-inventories', dest='link_inventories',
+                            nargs='+', default=[],
+                            help='Link inventories (%s) written by the '
+                            'builds of other projects, or by the other '
+                            'shards of this one, to link to the symbols '
+                            'they document' % LINK_INVENTORY)
+
+    def parse_name_from_config(self, config):
+        """
+        Parses the name of the project from @config, and the location of
+        the private folder which depends on it, without creating the
+        extensions.
+        """
+        self.config = config
+        self.shard = self.__parse_shard(config.get('shard'))
+        self.project = Project(self)
+        self.project.parse_name_from_config(self.config)
+        private_folder = 'hotdoc-private-%s' % self.project.sanitized_name
+        if self.shard:
+            # Shards may be built concurrently from the same folder
+            private_folder += '-shard-%d-of-%d' % self.shard
+        self.private_folder = os.path.abspath(private_folder)
+        self.persistent_folder = os.path.join(self.private_folder,
+                                              PERSISTENT_FOLDER)
 
     def parse_config(self, config):
-        self.config = config
         self.output = config.get_path('output')
         self.dry = config.get('dry')
         self.hostname = config.get('hostname')
-        self.project = Project(self)
-        self.project.parse_name_from_config(self.config)
-        self.private_folder = os.path.abspath(
-            'hotdoc-private-%s' % self.project.sanitized_name)
-        shutil.rmtree(self.private_folder, ignore_errors=True)
+        self.only_pages = config.get('only_pages')
+        self.only_pages_subpages = config.get('only_pages_subpages')
+        self.precompress = config.get('precompress')
+        self.precompress_jobs = config.get('precompress_jobs', 0)
+        self.parse_name_from_config(config)
+        if not isinstance(self.precompress_jobs, int) or \
+                self.precompress_jobs < 0:
+            error('invalid-config',
+                  'Invalid number of precompress jobs: %s' %
+                  self.precompress_jobs)
+        if self.only_pages and self.shard:
+            error('invalid-config',
+                  '--only-pages and --shard are mutually exclusive')
+        if self.only_pages and not self.output:
+            error('invalid-config',
+                  '--only-pages requires an output folder, see --output')
+        self.__clean_private_folder()
+        if self.output and not self.dry:
+            self.formatting_context.output_manifest = OutputManifest(
+                self.output)
         self.project.parse_config(self.config, toplevel=True)
 
         self.__setup_private_folder()
         self.__setup_database()
+        self.link_inventory = LinkInventory(
+            self.config.get_paths('link_inventories'),
+            os.path.join(self.output, 'html') if self.output else None,
+            self.project.project_name)
+
+    @staticmethod
+    def __parse_shard(shard):
+        if not shard:
+            return None
+
+        match = re.match(r'^(\d+)/(\d+)$', shard)
+        if not match or not 0 < int(match.group(1)) <= int(match.group(2)):
+            error('invalid-config',
+                  'Invalid shard "%s", expected I/N with 0 < I <= N' % shard)
+
+        return int(match.group(1)), int(match.group(2))
 
     def run(self):
         """
@@ -107,19 +240,447 @@ class Application(Configurable):
         self.project.setup()
         self.__retrieve_all_projects(self.project)
 
-        self.link_resolver.get_link_signal.connect_after(self.__get_link_cb)
+        if self.only_pages:
+            self.__run_partial()
+            return
+
+        if self.shard:
+            self.__select_shard_pages()
+
+        self.__connect_link_cbs()
         self.project.format(self.link_resolver, self.output)
         self.project.write_out(self.output)
 
+        # Shards write the inventory of their subprojects, for the
+        # other shards to link to them
+        self.__write_link_inventory()
+        if self.shard:
+            self.__write_shard_manifest()
         # Generating an XML sitemap makes no sense without a hostname
+        elif self.hostname:
+            self.project.write_seo_sitemap(self.hostname, self.output)
+
+        self.__disconnect_link_cbs()
+
+        # Global artifacts are only generated when merging shards
+        if not self.shard:
+            self.formatted_signal(self)
+        self.__finish_output()
+        self.__persist()
+
+    def __run_partial(self):
+        # Artifacts depending on every page, such as the search index,
+        # are left as generated by the previous runs
+        selected = self.__select_pages(self.project)
+        if not selected:
+            error('invalid-config', 'No page matches --only-pages %s' %
+                  ' '.join(self.only_pages))
+
+        info('Formatting %d selected pages' % len(selected))
+        self.__write_out_pages(selected, set())
+
+        if not os.path.exists(os.path.join(self.output, 'html', 'assets')):
+            self.project.write_out_assets(self.output)
+
+        self.__finish_output()
+        self.__persist()
+
+    def __page_matches(self, name, page):
+        candidates = [name, page.name]
+        if page.source_file:
+            candidates += [page.source_file, os.path.relpath(page.source_file)]
+        return any(fnmatch.fnmatch(candidate, pattern)
+                   for pattern in self.only_pages
+                   for candidate in candidates)
+
+    def __select_pages(self, project):
+        selected = set()
+        for name, page in project.tree.get_pages().items():
+            subproj = project.subprojects.get(name)
+            if subproj:
+                selected |= self.__select_pages(subproj)
+            if self.__page_matches(name, page):
+                self.__select_page(project, page, selected)
+
+        return selected
+
+    def __select_page(self, project, page, selected):
+        subproj = project.subprojects.get(page.name)
+        if subproj:
+            # Subprojects are represented by their root page
+            project = subproj
+            page = subproj.tree.root
+
+        selected.add(page)
+        if not self.only_pages_subpages:
+            return
+
+        for subpage in project.tree.walk(parent=page):
+            if subpage.name in project.subprojects:
+                self.__select_page(project, subpage, selected)
+            else:
+                selected.add(subpage)
+
+    def merge(self, shard_folders):
+        """
+        Combines the output of `hotdoc run --shard` in @shard_folders,
+        formatting the pages of the toplevel project and generating
+        global artifacts, such as the navigation, the sitemap or
+        the search index.
+
+        Every subproject is set up again, for the extensions to index
+        the pages written out by the shards.
+        """
+        if not self.output:
+            error('invalid-config', 'No output folder to merge shards in, '
+                  'see --output')
+
+        self.project.setup()
+        self.__retrieve_all_projects(self.project)
+
+        manifests = self.__load_shard_manifests(shard_folders)
+
+        html_dir = os.path.join(self.output, 'html')
+        for folder in shard_folders:
+            info('Merging shard %s' % folder)
+            if not self.dry:
+                recursive_overwrite(os.path.join(folder, 'html'), html_dir,
+                                    self.__ignore_shard_files_cb)
+
+        pages = self.__get_pages_by_path()
+        written = []
+        for manifest in manifests:
+            for project_name, rel_path in manifest['written']:
+                written.append((self.__get_shard_page(pages, project_name,
+                                                      rel_path),
+                                os.path.join(html_dir, rel_path)))
+            for project_name, attrs in manifest['pages'].items():
+                for rel_path, page_attrs in attrs.items():
+                    _, page = self.__get_shard_page(pages, project_name,
+                                                    rel_path)
+                    page.title = page_attrs['title']
+                    page.short_description = page_attrs['short_description']
+
+        tree = self.project.tree
+        for page in tree.get_pages().values():
+            proj = self.project.subprojects.get(page.name)
+            if proj:
+                page.title = proj.tree.root.title
+                tree.skipped_pages.add(page)
+
+        self.__connect_link_cbs()
+        self.project.format(self.link_resolver, self.output)
+
+        # Let extensions know about the pages the shards wrote out
+        for (project, page), path in written:
+            formatter = project.extensions[page.extension_name].formatter
+            formatter.writing_page_signal(formatter, page, path, None)
+            formatter.written_page_signal(formatter, page, path, None)
+
+        self.project.write_out(self.output)
+        self.__write_link_inventory()
+
         if self.hostname:
             self.project.write_seo_sitemap(self.hostname, self.output)
 
-        self.link_resolver.get_link_signal.disconnect(self.__get_link_cb)
+        self.__disconnect_link_cbs()
 
         self.formatted_signal(self)
+        self.__finish_output()
         self.__persist()
 
+    def get_watched_paths(self):
+        """
+        Returns the paths of the configuration files, sitemaps, sources
+        and pages the documentation is built from.
+        """
+        paths = OrderedSet()
+        configs = [self.config] + [project.config for project in
+                                   self.__all_projects.values()]
+        for config in configs:
+            if config is not None:
+                paths |= OrderedSet(os.path.abspath(dep) for dep in
+                                    config.get_dependencies())
+
+        for project in self.__all_projects.values():
+            for page in project.tree.get_pages().values():
+                if not page.generated:
+                    paths.add(page.source_file)
+
+        return paths
+
+    def update_pages(self, paths):
+        """
+        Parses the markdown pages at @paths again, then only formats
+        and writes out these pages and the pages listing them.
+
+        Returns:
+            bool: False if some of @paths are not markdown pages or if
+                the pages cannot be updated on their own, in which case
+                the whole documentation needs to be built again.
+        """
+        updated = self.__reparse_pages(paths)
+        if updated is None:
+            return False
+
+        self.formatting_context.written_out_sitemaps.clear()
+        self.__write_out_pages(updated, updated)
+        self.__write_link_inventory()
+        self.formatted_signal(self)
+        self.__finish_output()
+
+        return True
+
+    def setup_preview(self):
+        """
+        Sets up the project and writes out its assets, its pages are then
+        formatted and written out on demand with `write_out_path`.
+        """
+        if not self.output:
+            self.output = os.path.join(self.private_folder, 'preview')
+            self.link_inventory.html_dir = os.path.join(self.output, 'html')
+
+        self.project.setup()
+        self.__retrieve_all_projects(self.project)
+        self.__index_preview_paths()
+
+        os.makedirs(os.path.join(self.output, 'html'), exist_ok=True)
+        self.project.write_out_assets(self.output)
+
+    def write_out_path(self, rel_path):
+        """
+        Formats and writes out the page at @rel_path in the html output,
+        unless it already was since the project was set up or its pages
+        were invalidated.
+
+        Returns:
+            str: the path of the page to display instead of @rel_path,
+                if any, for example the root page for index.html.
+        """
+        page = self.__preview_paths.get(rel_path)
+        if page is None:
+            if rel_path != 'index.html':
+                return None
+            page = self.project.tree.root
+
+        if page not in self.__previewed_pages:
+            self.__write_out_pages({page}, set())
+            self.__previewed_pages.add(page)
+
+        if page.build_path != rel_path:
+            return page.build_path
+        return None
+
+    def invalidate_pages(self, paths):
+        """
+        Parses the markdown pages at @paths again, every page is then
+        formatted and written out again on demand, as pages list the
+        titles of their subpages.
+
+        Returns:
+            bool: False if the project needs to be set up again, see
+                `Application.update_pages`.
+        """
+        updated = self.__reparse_pages(paths)
+        if updated is None:
+            return False
+
+        self.formatting_context.written_out_sitemaps.clear()
+        self.__index_preview_paths()
+        return True
+
+    def __index_preview_paths(self):
+        self.__preview_paths = {
+            rel_path: page for (_, rel_path), (project, page) in
+            self.__get_pages_by_path().items()
+            if page.name not in project.subprojects}
+        self.__previewed_pages = set()
+
+    def __reparse_pages(self, paths):
+        updated = set()
+        found = set()
+        for project in self.__all_projects.values():
+            tree = project.tree
+            for name, page in list(tree.get_pages().items()):
+                if page.generated or page.source_file not in paths:
+                    continue
+                info('Updating page %s' % page.source_file)
+                page = tree.update_page(name, self.database,
+                                        self.link_resolver)
+                if page is None:
+                    return None
+                updated.add(page)
+                found.add(page.source_file)
+
+        if found != set(paths):
+            return None
+
+        return updated
+
+    def __write_out_pages(self, pages, listed):
+        self.__skip_other_pages(self.project, pages, listed)
+        self.__connect_link_cbs()
+        try:
+            self.project.format(self.link_resolver, self.output)
+            self.project.tree.write_out(self.output)
+        finally:
+            # The application may be kept around, see `watch`
+            self.__disconnect_link_cbs()
+            for project in self.__all_projects.values():
+                project.tree.skipped_pages = set()
+
+    def __skip_other_pages(self, project, pages, listed):
+        # Only @pages are formatted, along with the pages listing @listed
+        # as they display their titles and descriptions
+        tree = project.tree
+        all_pages = tree.get_pages()
+        listed = set(listed)
+        kept = set()
+        for name, page in all_pages.items():
+            subproj = project.subprojects.get(name)
+            if subproj and self.__skip_other_pages(subproj, pages, listed):
+                kept.add(page)
+                if subproj.tree.root in listed:
+                    listed.add(page)
+            elif page in pages:
+                kept.add(page)
+
+        for page in all_pages.values():
+            if any(all_pages.get(subpage) in listed
+                   for subpage in page.subpages):
+                kept.add(page)
+
+        tree.skipped_pages = set(all_pages.values()) - kept
+        return bool(kept)
+
+    def __select_shard_pages(self):
+        # Only the subprojects of this shard were set up, see
+        # `Project.add_subproject`. The pages of the toplevel project
+        # are formatted when merging, as they may list pages from
+        # any shard.
+        index, n_shards = self.shard
+        tree = self.project.tree
+        for name, page in tree.get_pages().items():
+            if name not in self.project.subprojects:
+                tree.skipped_pages.add(page)
+
+        n_selected = len(self.project.subprojects)
+        info('Formatting %d out of %d subprojects in shard %d/%d' %
+             (n_selected,
+              n_selected + len(self.project.other_shards_subprojects),
+              index, n_shards))
+
+    @staticmethod
+    def __get_page_path(project, page):
+        formatter = project.extensions[page.extension_name].formatter
+        return os.path.join(formatter.get_output_folder(page), page.link.ref)
+
+    def __get_pages_by_path(self):
+        # Output paths identify pages across machines, unlike page names
+        # which may be absolute paths to their sources
+        return {(name, self.__get_page_path(project, page)): (project, page)
+                for name, project in self.__all_projects.items()
+                for page in project.tree.get_pages().values()}
+
+    def __gather_shard_pages(self, project, pages, written):
+        attrs = pages.setdefault(project.project_name, OrderedDict())
+        for page in project.tree.walk():
+            rel_path = self.__get_page_path(project, page)
+            attrs[rel_path] = {'title': page.title,
+                               'short_description': page.short_description}
+
+            subproj = project.subprojects.get(page.name)
+            if subproj:
+                self.__gather_shard_pages(subproj, pages, written)
+            else:
+                written.append((project.project_name, rel_path))
+
+    def __write_shard_manifest(self):
+        if self.dry or not self.output:
+            return
+
+        pages = OrderedDict()
+        written = []
+        tree = self.project.tree
+        for page in tree.walk():
+            subproj = self.project.subprojects.get(page.name)
+            if subproj and page not in tree.skipped_pages:
+                self.__gather_shard_pages(subproj, pages, written)
+
+        index, n_shards = self.shard
+        with open(os.path.join(self.output, SHARD_MANIFEST), 'w',
+                  encoding='utf-8') as _:
+            json.dump({'version': SHARD_MANIFEST_VERSION,
+                       'shard': index,
+                       'n_shards': n_shards,
+                       'pages': pages,
+                       'written': written}, _, indent=1)
+
+    def __load_shard_manifests(self, shard_folders):
+        manifests = []
+        for folder in shard_folders:
+            path = os.path.join(folder, SHARD_MANIFEST)
+            try:
+                with open(path, 'r', encoding='utf-8') as _:
+                    manifest = json.load(_)
+            except (OSError, ValueError) as exc:
+                error('setup-issue',
+                      'Could not load shard manifest %s: %s' % (path, exc))
+
+            if manifest.get('version') != SHARD_MANIFEST_VERSION:
+                error('setup-issue',
+                      'Shard manifest %s was written by an incompatible '
+                      'version of hotdoc' % path)
+            manifests.append(manifest)
+
+        shards = sorted((manifest['shard'], manifest['n_shards'])
+                        for manifest in manifests)
+        if not shards or \
+                shards != [(i + 1, shards[0][1]) for i in range(shards[0][1])]:
+            error('setup-issue',
+                  'Expected the output of shards 1 to N, got %s' %
+                  ', '.join('%d/%d' % shard for shard in shards))
+
+        return manifests
+
+    @staticmethod
+    def __get_shard_page(pages, project_name, rel_path):
+        res = pages.get((project_name, rel_path))
+        if res is None:
+            error('setup-issue',
+                  'Page %s of project %s in a shard manifest is unknown, '
+                  'shards must be built from the same sources' %
+                  (rel_path, project_name))
+        return res
+
+    # pylint: disable=unused-argument
+    @staticmethod
+    def __ignore_shard_files_cb(src, files):
+        # The search index and the link inventory are built when merging
+        ignored = {'dumped.trie', LINK_INVENTORY}
+        if os.path.basename(src) == 'js':
+            ignored.add('search')
+        return ignored
+
+    def __connect_link_cbs(self):
+        self.link_resolver.get_link_signal.connect_after(self.__get_link_cb)
+        # Links to other builds come last, local symbols take precedence
+        self.link_resolver.get_link_signal.connect_after(
+            self.link_inventory.get_link_cb)
+
+    def __disconnect_link_cbs(self):
+        self.link_resolver.get_link_signal.disconnect(self.__get_link_cb)
+        self.link_resolver.get_link_signal.disconnect(
+            self.link_inventory.get_link_cb)
+
+    def __write_link_inventory(self):
+        if self.dry or not self.output:
+            return
+
+        self.formatting_context.output_manifest.write(
+            os.path.join(self.output, 'html', LINK_INVENTORY),
+            LinkInventory.dumps(self.project, self.hostname, self.shard))
+
     def __get_link_cb(self, link_resolver, name):
         url_components = urlparse(name)
 
@@ -143,6 +704,22 @@ class Application(Configurable):
         for subproj in project.subprojects.values():
             self.__retrieve_all_projects(subproj)
 
+    def __finish_output(self):
+        output_manifest = self.formatting_context.output_manifest
+        if self.precompress:
+            output_manifest.precompress(
+                jobs=self.precompress_jobs or os.cpu_count() or 1)
+        output_manifest.save()
+
+        asset_sync = self.formatting_context.asset_sync
+        if asset_sync.copied_files or asset_sync.skipped_files:
+            info('Copied %d assets (%d bytes), skipped %d unchanged '
+                 'assets (%d bytes)' % (
+                     asset_sync.copied_files, asset_sync.copied_bytes,
+                     asset_sync.skipped_files, asset_sync.skipped_bytes),
+                 'assets')
+        asset_sync.reset_stats()
+
     def __persist(self):
         if self.dry:
             return
@@ -156,7 +733,21 @@ class Application(Configurable):
         """
         Banana banana
         """
-        self.project.finalize()
+        if self.project is not None:
+            self.project.finalize()
+
+    def __clean_private_folder(self):
+        if not os.path.isdir(self.private_folder):
+            return
+
+        for name in os.listdir(self.private_folder):
+            if name == PERSISTENT_FOLDER:
+                continue
+            path = os.path.join(self.private_folder, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
 
     def __setup_private_folder(self):
         if os.path.exists(self.private_folder):
@@ -180,7 +771,7 @@ class Application(Configurable):
             self.__dump_project_deps_file(subproj, deps_file, empty_targets)
 
     def __dump_deps_file(self, project):
-        dest = self.config.get('deps_file_dest', None)
+        dest = self.config.get_path('deps_file_dest')
         target = self.config.get('deps_file_target')
 
         if dest is None:
@@ -271,6 +862,272 @@ def create_default_layout(config):
             pass
 
 
+def _report_unknown_error():
+    print("An unknown error happened while building the documentation"
+          " and hotdoc cannot recover from it. Please report "
+          "a bug with this error message and the steps to "
+          "reproduce it")
+    traceback.print_exc()
+
+
+def _build(app, config):
+    try:
+        app.parse_config(config)
+        app.run()
+    except HotdocException:
+        return len(Logger.get_issues()), False
+    except Exception:  # pylint: disable=broad-except
+        _report_unknown_error()
+        return 1, False
+    return Logger.n_fatal_warnings, True
+
+
+def _watch_update(app, changed):
+    try:
+        if not app.update_pages(changed):
+            return None, False
+    except HotdocException:
+        return len(Logger.get_issues()), False
+    except Exception:  # pylint: disable=broad-except
+        _report_unknown_error()
+        return 1, False
+    return Logger.n_fatal_warnings, True
+
+
+def watch(config, ext_classes):
+    """
+    Builds the documentation, then builds it again whenever the files
+    it depends on change, until interrupted.
+
+    The process and what it caches stay warm between builds, and when
+    only markdown pages changed, they are updated in place without
+    setting up the project again.
+
+    Returns:
+        int: the result of the last build.
+    """
+    app = None
+    res = 0
+    try:
+        while True:
+            if app is None:
+                app = Application(ext_classes)
+                res, up_to_date = _build(app, config)
+                watcher = Watcher(app.get_watched_paths())
+
+            info('Watching %d files for changes' % len(watcher.paths))
+            changed = watcher.wait()
+
+            # Each build reports its own issues
+            Logger.journal = []
+            Logger.n_fatal_warnings = 0
+
+            if up_to_date:
+                res, up_to_date = _watch_update(app, changed)
+                # Failed updates leave the project in an unknown state,
+                # it is then built again on the next change
+                if res is not None:
+                    continue
+
+            app.finalize()
+            app = None
+            config = config.reload()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if app is not None:
+            app.finalize()
+
+    return res
+
+
+class Preview:
+    """
+    Formats and writes out pages when they are requested, for
+    `hotdoc serve`.
+
+    The project is set up again when files it depends on change, except
+    when only markdown pages changed.
+    """
+
+    def __init__(self, config, ext_classes):
+        self.__config = config
+        self.__ext_classes = ext_classes
+        self.__watcher = None
+        self.__last_poll = 0
+        self.app = None
+
+    def load(self):
+        """
+        Sets up the project, if needed again.
+        """
+        if self.app is not None:
+            self.app.finalize()
+            self.app = None
+            self.__config = self.__config.reload()
+
+        Logger.journal = []
+        Logger.n_fatal_warnings = 0
+
+        app = Application(self.__ext_classes)
+        try:
+            app.parse_config(self.__config)
+            app.setup_preview()
+        finally:
+            self.__watcher = Watcher(app.get_watched_paths())
+            self.__last_poll = time.monotonic()
+        self.app = app
+
+    def __update(self):
+        now = time.monotonic()
+        if now - self.__last_poll < self.__watcher.interval:
+            return
+        self.__last_poll = now
+
+        changed = self.__watcher.poll()
+        if not changed:
+            return
+
+        try:
+            if self.app.invalidate_pages(changed):
+                return
+        except HotdocException:
+            pass
+        self.load()
+
+    def write_out_path_cb(self, rel_path):
+        """
+        Banana banana
+        """
+        if self.app is None:
+            self.load()
+        else:
+            self.__update()
+        return self.app.write_out_path(rel_path)
+
+    @property
+    def html_dir(self):
+        """
+        Banana banana
+        """
+        return os.path.join(self.app.output, 'html')
+
+
+def serve(config, ext_classes):
+    """
+    Serves the documentation over HTTP, formatting and writing out pages
+    when they are first requested, until interrupted.
+    """
+    preview = Preview(config, ext_classes)
+    try:
+        preview.load()
+    except HotdocException:
+        return len(Logger.get_issues())
+
+    address = (config.get('serve_address'), config.get('serve_port'))
+    try:
+        server = PreviewServer(address, preview.html_dir,
+                               preview.write_out_path_cb)
+    except OSError as exc:
+        print('Could not listen on %s:%d: %s' % (address + (exc,)))
+        preview.app.finalize()
+        return 1
+
+    print('Serving the documentation at http://%s:%d/' % address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if preview.app is not None:
+            preview.app.finalize()
+
+    return 0
+
+
+def get_batch_conf_files(conf_files, manifest):
+    """
+    Returns the configuration files to build in batch mode, @conf_files
+    followed by those listed in the @manifest file, one per line and
+    relative to it.
+    """
+    res = list(conf_files)
+    if manifest:
+        manifest_dir = os.path.dirname(manifest)
+        with open(manifest, 'r', encoding='utf-8') as _:
+            for line in _:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    res.append(os.path.join(manifest_dir, line))
+    return res
+
+
+# Configurations built by batch workers, which inherit this list when
+# forked
+_BATCH_CONFIGS = []
+
+# Template engines shared by the applications each batch worker builds
+_BATCH_ENGINES = {}
+
+
+def _batch_build(config, ext_classes, engines):
+    info('Building %s' % config.conf_file)
+
+    # Each configuration reports its own issues
+    Logger.journal = []
+    Logger.n_fatal_warnings = 0
+
+    app = Application(ext_classes, engines=engines)
+    try:
+        res, _ = _build(app, config)
+    finally:
+        app.finalize()
+    return res
+
+
+def _batch_build_in_worker(index):
+    config, ext_classes = _BATCH_CONFIGS[index]
+    return _batch_build(config, ext_classes, _BATCH_ENGINES)
+
+
+def batch(configs, ext_classes, jobs=1):
+    """
+    Builds the documentation of several configurations in a single
+    invocation, each with its own output and dependencies file.
+
+    The configurations are built one after the other, or by @jobs
+    worker processes, 0 meaning one per CPU. The applications built
+    by a process share the template engines they compile, and the
+    process-wide caches of the external links and of the parsed GIR
+    files.
+
+    Returns:
+        int: the sum of the results of the builds.
+    """
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        context = None
+
+    jobs = min(jobs or os.cpu_count() or 1, len(configs))
+    if jobs < 2 or context is None:
+        engines = {}
+        return sum(_batch_build(config, ext_classes, engines)
+                   for config in configs)
+
+    info('Building %d configurations with %d jobs' % (len(configs), jobs))
+    _BATCH_CONFIGS[:] = [(config, ext_classes) for config in configs]
+    try:
+        with context.Pool(jobs) as pool:
+            results = pool.map(_batch_build_in_worker,
+                               range(len(configs)), chunksize=1)
+    finally:
+        del _BATCH_CONFIGS[:]
+
+    return sum(results)
+
+
 # pylint: disable=too-many-branches
 # pylint: disable=too-many-statements
 def execute_command(parser, config, ext_classes):
@@ -284,23 +1141,44 @@ def execute_command(parser, config, ext_classes):
 
     if cmd == 'help':
         parser.print_help()
-    elif cmd == 'run' or get_private_folder:  # git.mk backward compat
+    elif cmd == 'run' and config.get('watch') and not get_private_folder:
+        if config.get('batch') or config.get('batch_manifest'):
+            print('--watch cannot be used in batch mode')
+            return 1
+        res = watch(config, ext_classes)
+    elif cmd == 'run' and (config.get('batch') or
+                           config.get('batch_manifest')):
+        jobs = config.get('batch_jobs')
+        if not isinstance(jobs, int) or jobs < 0:
+            print('Invalid number of batch jobs: %s' % jobs)
+            return 1
+        conf_files = get_batch_conf_files(
+            config.get_paths('batch'), config.get_path('batch_manifest'))
+        res = batch([config.for_conf_file(conf_file)
+                     for conf_file in conf_files], ext_classes, jobs)
+    elif cmd == 'serve':
+        res = serve(config, ext_classes)
+    elif cmd == 'search-query':
+        # The search extension is only imported when needed, see run()
+        from hotdoc.extensions.search.query import search_query
+        res = search_query(config)
+    elif cmd in ('run', 'merge') or get_private_folder:  # git.mk backward compat
         app = Application(ext_classes)
         try:
-            app.parse_config(config)
             if get_private_folder:
+                app.parse_name_from_config(config)
                 print(app.private_folder)
                 return res
-            app.run()
+            app.parse_config(config)
+            if cmd == 'merge':
+                app.merge(config.get_paths('merge_shards'))
+            else:
+                app.run()
             res = Logger.n_fatal_warnings
         except HotdocException:
             res = len(Logger.get_issues())
         except Exception:  # pylint: disable=broad-except
-            print("An unknown error happened while building the documentation"
-                  " and hotdoc cannot recover from it. Please report "
-                  "a bug with this error message and the steps to "
-                  "reproduce it")
-            traceback.print_exc()
+            _report_unknown_error()
             res = 1
         finally:
             app.finalize()
@@ -315,9 +1193,7 @@ def execute_command(parser, config, ext_classes):
         if config.get('version'):
             print(VERSION)
         elif config.get('makefile_path'):
-            here = os.path.dirname(__file__)
-            path = os.path.join(here, 'utils', 'hotdoc.mk')
-            print(os.path.abspath(path))
+            print(_get_makefile_path())
         elif config.get('get_conf_path'):
             key = config.get('get_conf_path')
             path = config.get_path(key, rel_to_cwd=True)
@@ -336,14 +1212,7 @@ def execute_command(parser, config, ext_classes):
     return res
 
 
-# pylint: disable=too-many-branches
-# pylint: disable=too-many-locals
-# pylint: disable=too-many-statements
-def run(args, verbose=False):
-    """
-    Banana banana
-    """
-
+def _create_parser():
     parser = argparse.ArgumentParser(
         formatter_class=argparse.RawDescriptionHelpFormatter,
         add_help=False)
@@ -357,29 +1226,30 @@ def run(args, verbose=False):
                         help='An extra extension to load and use')
     parser.add_argument('--conf-file', help='Path to the config file',
                         dest='conf_file')
-    tmpargs, _args = parser.parse_known_args(args)
-
-    json_conf = None
-    if tmpargs.conf_file:
-        json_conf = load_config_json(tmpargs.conf_file)
-        tmpargs.extra_extension_path += json_conf.get('extra_extension_path',
-                                                      [])
-        tmpargs.extra_extension += json_conf.get('extra_extension', [])
-
-    # We only get these once, doing this now means all
-    # installed extensions will show up as Configurable subclasses.
-    try:
-        ext_classes = get_extension_classes(
-            sort=True,
-            extra_extension_paths=tmpargs.extra_extension_path,
-            extra_extensions=tmpargs.extra_extension,
-        )
-    except HotdocException:
-        return 1
-
-    parser.add_argument('command', action="store",
-                        choices=('run', 'conf', 'init', 'help'),
-                        nargs="?")
+    parser.add_argument('--batch', nargs='+', default=[], dest='batch',
+                        help='Build the documentation of these config '
+                        'files in a single invocation, the other command '
+                        'line arguments applying to all of them')
+    parser.add_argument('--batch-manifest', dest='batch_manifest',
+                        help='A file listing config files to build as '
+                        'with --batch, one per line')
+    parser.add_argument('--batch-jobs', type=int, default=1,
+                        dest='batch_jobs',
+                        help='Number of config files to build in '
+                        'parallel in batch mode, 0 for one per CPU')
+    return parser
+
+
+def _add_arguments(parser, with_command=True):
+    """
+    Adds the arguments of the commands and of the `Configurable`
+    subclasses imported so far to @parser.
+    """
+    if with_command:
+        parser.add_argument('command', action="store",
+                            choices=('run', 'merge', 'serve', 'conf',
+                                     'init', 'help', 'search-query'),
+                            nargs="?")
     parser.add_argument('--output-conf-file',
                         help='Path where to save the updated conf'
                         ' file',
@@ -420,7 +1290,9 @@ def run(args, verbose=False):
             klass.add_arguments(parser)
             add_args_methods.add(klass.add_arguments)
 
-    known_args, _ = parser.parse_known_args(args)
+
+def _parse_args(parser, args):
+    known_args, unknown_args = parser.parse_known_args(args)
 
     defaults = {}
     actual_args = {}
@@ -430,6 +1302,122 @@ def run(args, verbose=False):
         if parser.get_default(key) is not None:
             defaults[key] = value
 
+    return known_args, unknown_args, actual_args, defaults
+
+
+def _create_config(known_args, actual_args, defaults, json_conf=None):
+    if getattr(known_args, 'command', None) != 'init':
+        conf_file = actual_args.get('conf_file')
+        if conf_file is None and os.path.exists('hotdoc.json'):
+            conf_file = 'hotdoc.json'
+    else:
+        conf_file = ''
+
+    return Config(command_line_args=actual_args,
+                  conf_file=conf_file,
+                  defaults=defaults,
+                  json_conf=json_conf)
+
+
+def _get_makefile_path():
+    here = os.path.dirname(__file__)
+    return os.path.abspath(os.path.join(here, 'utils', 'hotdoc.mk'))
+
+
+def _answer_query(config):
+    """
+    Answers the queries of build systems which do not depend on the
+    extensions, such as --get-private-folder, without loading them.
+
+    Returns:
+        int: the result, or `None` if @config is not such a query.
+    """
+    if config.get('get_private_folder'):
+        app = Application([])
+        try:
+            app.parse_name_from_config(config)
+        except HotdocException:
+            return len(Logger.get_issues())
+        print(app.private_folder)
+    elif config.get('version'):
+        print(VERSION)
+    elif config.get('makefile_path'):
+        print(_get_makefile_path())
+    elif config.get('get_conf_path'):
+        path = config.get_path(config.get('get_conf_path'), rel_to_cwd=True)
+        # The extensions may provide a default
+        if path is None:
+            return None
+        print(path)
+    elif config.get('get_conf_key'):
+        value = config.get(config.get('get_conf_key'), None)
+        if value is None:
+            return None
+        print(value)
+    else:
+        return None
+
+    return 0
+
+
+# pylint: disable=too-many-branches
+# pylint: disable=too-many-locals
+def run(args, verbose=False):
+    """
+    Banana banana
+    """
+
+    # Importing the extensions and their dependencies is slow, they are
+    # only loaded when the arguments are not all known without them or
+    # the command depends on them
+    parser = _create_parser()
+    _add_arguments(parser, with_command=False)
+    known_args, unknown_args, actual_args, defaults = _parse_args(
+        parser, args)
+    if not unknown_args:
+        res = _answer_query(_create_config(known_args, actual_args,
+                                           defaults))
+        if res is not None:
+            return res
+
+    parser = _create_parser()
+    tmpargs, _args = parser.parse_known_args(args)
+
+    json_conf = None
+    if tmpargs.conf_file:
+        json_conf = load_config_json(tmpargs.conf_file)
+        tmpargs.extra_extension_path += json_conf.get('extra_extension_path',
+                                                      [])
+        tmpargs.extra_extension += json_conf.get('extra_extension', [])
+
+    # The extensions of all the batch config files are loaded
+    try:
+        batch_conf_files = get_batch_conf_files(tmpargs.batch,
+                                                tmpargs.batch_manifest)
+    except OSError as exc:
+        print('Could not read the batch manifest: %s' % exc)
+        return 1
+    for batch_conf_file in batch_conf_files:
+        batch_json_conf = load_config_json(batch_conf_file)
+        tmpargs.extra_extension_path += batch_json_conf.get(
+            'extra_extension_path', [])
+        tmpargs.extra_extension += batch_json_conf.get(
+            'extra_extension', [])
+
+    # We only get these once, doing this now means all
+    # installed extensions will show up as Configurable subclasses.
+    try:
+        ext_classes = get_extension_classes(
+            sort=True,
+            extra_extension_paths=tmpargs.extra_extension_path,
+            extra_extensions=tmpargs.extra_extension,
+        )
+    except HotdocException:
+        return 1
+
+    _add_arguments(parser)
+    known_args, _, actual_args, defaults = _parse_args(parser, args)
+
     if known_args.has_extensions:
         res = 0
         for extension_name in known_args.has_extensions:
@@ -452,17 +1440,7 @@ def run(args, verbose=False):
             print(" - %s " % extension)
         return 0
 
-    if known_args.command != 'init':
-        conf_file = actual_args.get('conf_file')
-        if conf_file is None and os.path.exists('hotdoc.json'):
-            conf_file = 'hotdoc.json'
-    else:
-        conf_file = ''
-
-    config = Config(command_line_args=actual_args,
-                    conf_file=conf_file,
-                    defaults=defaults,
-                    json_conf=json_conf)
+    config = _create_config(known_args, actual_args, defaults, json_conf)
 
     Logger.parse_config(config)
 
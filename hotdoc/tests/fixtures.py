@@ -28,6 +28,7 @@ from hotdoc.utils.utils import touch
 from hotdoc.utils.utils import get_extension_classes
 from hotdoc.run_hotdoc import Application
 from hotdoc.core.database import Database
+from hotdoc.core.formatter import FormattingContext
 from hotdoc.core.links import LinkResolver
 from hotdoc.core.tree import Tree
 
@@ -54,6 +55,7 @@ class HotdocTest(unittest.TestCase):
         self.link_resolver = LinkResolver(self.database)
         self.sanitized_name = 'test-project-0.1'
         self.tree = Tree(self, self)
+        self.formatting_context = FormattingContext()
 
     def tearDown(self):
         self._remove_tmp_dirs()
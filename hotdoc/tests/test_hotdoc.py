@@ -24,12 +24,17 @@ import os
 import shutil
 import json
 import io
+import re
+import threading
+import urllib.request
 
 from contextlib import redirect_stdout
 
-from hotdoc.utils.utils import touch
+from hotdoc.core.config import Config
+from hotdoc.utils.utils import touch, get_extension_classes
 from hotdoc.utils.loggable import Logger
-from hotdoc.run_hotdoc import run
+from hotdoc.utils.server import PreviewServer
+from hotdoc.run_hotdoc import run, Preview
 
 
 class TestHotdoc(unittest.TestCase):
@@ -107,6 +112,328 @@ class TestHotdoc(unittest.TestCase):
 
         self.assertOutput(1)
 
+    def test_shards(self):
+        index_path = self.__create_md_file('index.markdown',
+                                           "## A very simple index\n")
+        sitemap = ['index.markdown']
+        for name in ('sub1', 'sub2', 'sub3'):
+            sub_index_path = self.__create_md_file(
+                '%s.markdown' % name, "## The %s index\n" % name)
+            sub_sitemap_path = self.__create_sitemap(
+                '%s.txt' % name, '%s.markdown' % name)
+            self.__create_conf_file('%s.json' % name,
+                                    {'index': sub_index_path,
+                                     'project_name': name,
+                                     'project_version': '0.1',
+                                     'sitemap': sub_sitemap_path})
+            sitemap.append('\t%s.json' % name)
+        sitemap_path = self.__create_sitemap('sitemap.txt',
+                                             '\n'.join(sitemap))
+        self.__create_conf_file('hotdoc.json',
+                                {'index': index_path,
+                                 'project_name': 'test-project',
+                                 'project_version': '0.1',
+                                 'include_paths': [self._test_dir],
+                                 'sitemap': sitemap_path})
+
+        shard_dirs = []
+        for shard in ('1/2', '2/2'):
+            shard_dir = os.path.join(self.__output_dir,
+                                     'shard%s' % shard[0])
+            self.assertEqual(
+                run(['run', '--shard', shard, '--output', shard_dir]), 0)
+            shard_dirs.append(shard_dir)
+
+        written = set()
+        for shard_dir in shard_dirs:
+            with open(os.path.join(shard_dir, 'hotdoc-shard.json')) as _:
+                manifest = json.load(_)
+            written |= {rel_path for _, rel_path in manifest['written']}
+            self.assertFalse(os.path.exists(
+                os.path.join(shard_dir, 'html', 'index.html')))
+            with open(os.path.join(shard_dir, 'html',
+                                   'hotdoc-links.json')) as _:
+                inventory = json.load(_)
+            self.assertEqual(inventory['shard'], [manifest['shard'], 2])
+            # The subprojects of the other shard are not set up
+            self.assertEqual(
+                {name for name in inventory['links'] if name.startswith('sub')},
+                {'sub1', 'sub3'} if manifest['shard'] == 1 else {'sub2'})
+        self.assertEqual(written, {'sub1/sub1.html', 'sub2/sub2.html',
+                                   'sub3/sub3.html'})
+
+        merged_dir = os.path.join(self.__output_dir, 'merged')
+        self.assertEqual(run(['merge', '--output', merged_dir,
+                              '--merge-shards'] + shard_dirs), 0)
+        for rel_path in written | {'index.html'}:
+            self.assertTrue(os.path.exists(
+                os.path.join(merged_dir, 'html', rel_path)))
+        with open(os.path.join(merged_dir, 'html', 'hotdoc-links.json')) as _:
+            inventory = json.load(_)
+        self.assertIsNone(inventory['shard'])
+        self.assertLessEqual({'sub1', 'sub2', 'sub3'}, set(inventory['links']))
+
+        self.assertEqual(run(['merge', '--output', merged_dir,
+                              '--merge-shards', shard_dirs[0]]), 1)
+        Logger.reset()
+        Logger.silent = True
+        self.assertEqual(run(['merge', '--merge-shards'] + shard_dirs), 1)
+        self.assertEqual([issue.code for issue in Logger.get_issues()],
+                         ['invalid-config'])
+
+    def test_search_trie_path(self):
+        index_path = self.__create_md_file('index.markdown',
+                                           "## A very simple index\n")
+        sub_index_path = self.__create_md_file('sub.markdown',
+                                               "## The sub index\n")
+        sub_sitemap_path = self.__create_sitemap('sub.txt', 'sub.markdown')
+        self.__create_conf_file('sub.json',
+                                {'index': sub_index_path,
+                                 'project_name': 'sub',
+                                 'project_version': '0.1',
+                                 'sitemap': sub_sitemap_path})
+        sitemap_path = self.__create_sitemap('sitemap.txt',
+                                             'index.markdown\n\tsub.json')
+        self.__create_conf_file('hotdoc.json',
+                                {'index': index_path,
+                                 'project_name': 'test-project',
+                                 'project_version': '0.1',
+                                 'include_paths': [self._test_dir],
+                                 'sitemap': sitemap_path,
+                                 'output': self.__output_dir})
+        self.assertEqual(run(['run']), 0)
+
+        html_dir = os.path.join(self.__output_dir, 'html')
+        for rel_path, trie_path in (('index.html', 'dumped.trie'),
+                                    ('sub/sub.html', '../dumped.trie')):
+            with open(os.path.join(html_dir, rel_path)) as _:
+                self.assertIn('data-hd-key="search-trie" '
+                              'data-hd-value="%s"' % trie_path, _.read())
+        sub_trie_path = os.path.join(html_dir, 'sub', 'dumped.trie')
+        self.assertEqual(os.readlink(sub_trie_path), '../dumped.trie')
+
+        shutil.rmtree(self.__output_dir)
+        self.assertEqual(run(['--search-no-trie-symlinks', 'run']), 0)
+        self.assertTrue(os.path.exists(
+            os.path.join(html_dir, 'dumped.trie')))
+        self.assertFalse(os.path.lexists(sub_trie_path))
+
+    def test_only_pages(self):
+        index_path = self.__create_md_file('index.markdown',
+                                           "## A very simple index\n")
+        for name in ('page', 'subpage', 'other'):
+            self.__create_md_file('%s.markdown' % name, "## A page\n")
+        sitemap_path = self.__create_sitemap(
+            'sitemap.txt', 'index.markdown\n\tpage.markdown\n'
+            '\t\tsubpage.markdown\n\tother.markdown\n')
+        args = ['--index', index_path,
+                '--output', self.__output_dir,
+                '--project-name', 'test-project',
+                '--project-version', '0.1',
+                '--sitemap', sitemap_path,
+                'run']
+        self.assertEqual(run(args), 0)
+
+        html_dir = os.path.join(self.__output_dir, 'html')
+        paths = {name: os.path.join(html_dir, '%s.html' % name)
+                 for name in ('index', 'page', 'subpage', 'other')}
+        for path in paths.values():
+            os.remove(path)
+
+        self.assertEqual(run(args + ['--only-pages', 'page.*']), 0)
+        self.assertEqual({name for name, path in paths.items()
+                          if os.path.exists(path)}, {'page'})
+
+        self.assertEqual(run(args + ['--only-pages-subpages', '--only-pages',
+                                     os.path.join(self.__md_dir, 'p*')]), 0)
+        self.assertEqual({name for name, path in paths.items()
+                          if os.path.exists(path)}, {'page', 'subpage'})
+
+        self.assertEqual(run(args + ['--only-pages', 'nothing.*']), 1)
+
+        Logger.reset()
+        Logger.silent = True
+        args.remove('--output')
+        args.remove(self.__output_dir)
+        self.assertEqual(run(args + ['--only-pages', 'page.*']), 1)
+        self.assertEqual([issue.code for issue in Logger.get_issues()],
+                         ['invalid-config'])
+
+    def test_applications_do_not_share_state(self):
+        index_path = self.__create_md_file('index.markdown',
+                                           "## A very simple index\n")
+        sitemap_path = self.__create_sitemap('sitemap.txt',
+                                             'index.markdown\n')
+        theme_dir = os.path.join(self._test_dir, 'extra-theme')
+        os.mkdir(theme_dir)
+        touch(os.path.join(theme_dir, 'extra.css'))
+        args = ['--index', index_path,
+                '--output', self.__output_dir,
+                '--project-name', 'test-project',
+                '--project-version', '0.1',
+                '--sitemap', sitemap_path,
+                'run']
+        extra_path = os.path.join(self.__output_dir, 'html', 'assets',
+                                  'extra.css')
+
+        self.assertEqual(run(args + ['--html-extra-theme', theme_dir]), 0)
+        self.assertTrue(os.path.exists(extra_path))
+
+        shutil.rmtree(self.__output_dir)
+        self.assertEqual(run(args), 0)
+        self.assertFalse(os.path.exists(extra_path))
+
+    def test_batch(self):
+        conf_files = []
+        for name in ('first', 'second'):
+            index_path = self.__create_md_file(
+                '%s.markdown' % name, "## The %s project\n" % name)
+            sitemap_path = self.__create_sitemap(
+                '%s-sitemap.txt' % name, '%s.markdown\n' % name)
+            conf_files.append(self.__create_conf_file(
+                '%s.json' % name,
+                {'index': index_path,
+                 'sitemap': sitemap_path,
+                 'project_name': name,
+                 'project_version': '0.1',
+                 'output': os.path.join(self.__output_dir, name),
+                 'deps_file_dest': '%s.d' % name}))
+
+        manifest = self.__create_sitemap('manifest.txt', 'second.json\n')
+        for jobs in ('1', '2'):
+            shutil.rmtree(self.__output_dir, ignore_errors=True)
+            self.assertEqual(run(['--batch', conf_files[0],
+                                  '--batch-manifest', manifest,
+                                  '--batch-jobs', jobs, 'run']), 0)
+            for name in ('first', 'second'):
+                self.assertTrue(os.path.exists(os.path.join(
+                    self.__output_dir, name, 'html', '%s.html' % name)))
+                self.assertTrue(os.path.exists(os.path.join(
+                    self._test_dir, '%s.d' % name)))
+
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(run(['--batch', conf_files[0], '--watch',
+                                  'run']), 1)
+
+    def test_output_manifest(self):
+        index_path = self.__create_md_file('index.markdown',
+                                           "## A very simple index\n")
+        sitemap_path = self.__create_sitemap('sitemap.txt',
+                                             'index.markdown\n')
+        args = ['--index', index_path,
+                '--output', self.__output_dir,
+                '--project-name', 'test-project',
+                '--project-version', '0.1',
+                '--sitemap', sitemap_path,
+                'run']
+        page_path = os.path.join(self.__output_dir, 'html', 'index.html')
+        manifest_path = os.path.join(self.__output_dir, 'hotdoc-output.json')
+
+        self.assertEqual(run(args), 0)
+        with open(manifest_path) as _:
+            manifest = json.load(_)
+        self.assertIn('html/index.html', manifest['files'])
+        self.assertIn('html/index.html', manifest['changed'])
+        mtime = os.stat(page_path).st_mtime_ns
+
+        self.assertEqual(run(args), 0)
+        with open(manifest_path) as _:
+            manifest = json.load(_)
+        self.assertEqual(manifest['changed'], [])
+        self.assertEqual(os.stat(page_path).st_mtime_ns, mtime)
+
+        theme_dir = os.path.join(self._test_dir, 'extra-theme')
+        os.mkdir(theme_dir)
+        touch(os.path.join(theme_dir, 'extra.css'))
+        self.assertEqual(run(args + ['--html-extra-theme', theme_dir]), 0)
+        with open(manifest_path) as _:
+            manifest = json.load(_)
+        self.assertIn('html/assets/extra.css', manifest['changed'])
+        self.assertIn('html/assets/extra.css', manifest['files'])
+
+    def test_bundle_assets(self):
+        index_path = self.__create_md_file('index.markdown',
+                                           "## A very simple index\n")
+        sitemap_path = self.__create_sitemap('sitemap.txt',
+                                             'index.markdown\n')
+        self.assertEqual(run(['--index', index_path,
+                              '--output', self.__output_dir,
+                              '--project-name', 'test-project',
+                              '--project-version', '0.1',
+                              '--sitemap', sitemap_path,
+                              '--html-bundle-assets',
+                              'run']), 0)
+
+        html_dir = os.path.join(self.__output_dir, 'html')
+        with open(os.path.join(html_dir, 'index.html')) as _:
+            contents = _.read()
+        scripts = re.findall(r'<script src="(assets/js/[^"]+)"', contents)
+        self.assertEqual(len(scripts), 1)
+        self.assertRegex(scripts[0], r'bundle-[0-9a-f]{16}\.js$')
+        self.assertTrue(os.path.exists(os.path.join(html_dir, scripts[0])))
+        self.assertFalse(os.path.exists(
+            os.path.join(html_dir, 'assets', 'js', 'css.escape.js')))
+
+    def test_serve(self):
+        index_path = self.__create_md_file('home.markdown',
+                                           "## A very simple index\n")
+        self.__create_md_file('page.markdown', "## A page\n")
+        self.__create_md_file('other.markdown', "## Another page\n")
+        sitemap_path = self.__create_sitemap(
+            'sitemap.txt', 'home.markdown\n\tpage.markdown\n'
+            '\tother.markdown\n')
+        config = Config(command_line_args={'index': index_path,
+                                           'output': self.__output_dir,
+                                           'project_name': 'test-project',
+                                           'project_version': '0.1',
+                                           'sitemap': sitemap_path})
+
+        preview = Preview(config, get_extension_classes(sort=True))
+        preview.load()
+        html_dir = os.path.join(self.__output_dir, 'html')
+        self.assertFalse(os.path.exists(os.path.join(html_dir, 'page.html')))
+
+        server = PreviewServer(('localhost', 0), preview.html_dir,
+                               preview.write_out_path_cb)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            url = 'http://localhost:%d/' % server.server_address[1]
+            with urllib.request.urlopen(url) as response:
+                self.assertEqual(response.geturl(), url + 'home.html')
+            with urllib.request.urlopen(url + 'page.html') as response:
+                self.assertEqual(response.status, 200)
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+            preview.app.finalize()
+
+        self.assertTrue(os.path.exists(os.path.join(html_dir, 'home.html')))
+        self.assertTrue(os.path.exists(os.path.join(html_dir, 'page.html')))
+        self.assertFalse(os.path.exists(os.path.join(html_dir, 'other.html')))
+
+    def test_link_inventory(self):
+        index_path = self.__create_md_file('index.markdown',
+                                           "## A very simple index\n")
+        sitemap_path = self.__create_sitemap('sitemap.txt', 'index.markdown')
+        args = ['--index', index_path,
+                '--output', self.__output_dir,
+                '--project-name', 'test-project',
+                '--project-version', '0.1',
+                '--hostname', 'https://example.com/',
+                '--sitemap', sitemap_path,
+                'run']
+        self.assertEqual(run(args), 0)
+
+        inventory_path = os.path.join(self.__output_dir, 'html',
+                                      'hotdoc-links.json')
+        with open(inventory_path) as _:
+            inventory = json.load(_)
+        self.assertEqual(inventory['project'], 'test-project')
+        self.assertEqual(inventory['base_url'], 'https://example.com/')
+        self.assertEqual(inventory['links']['test-project'][0], 'index.html')
+
     def test_error(self):
         args = ['--index', os.path.join(self.__md_dir, 'index.markdown'),
                 '--output', self.__output_dir,
@@ -242,3 +569,27 @@ class TestHotdoc(unittest.TestCase):
         self.assertEqual(res, 0)
         path = f.getvalue().strip()
         self.assertTrue(os.path.basename(path).startswith('hotdoc-private'))
+
+    def test_queries_do_not_load_extensions(self):
+        marker = os.path.join(self._test_dir, 'loaded')
+        ext_path = os.path.join(self._test_dir, 'marker_extension.py')
+        with open(ext_path, 'w') as _:
+            _.write("open(%r, 'w').close()\n"
+                    "def get_extension_classes():\n"
+                    "    return []\n" % marker)
+
+        args = ['--extra-extension', ext_path,
+                '--project-name', 'test-project',
+                '--project-version', '0.1']
+
+        f = io.StringIO()
+        with redirect_stdout(f):
+            self.assertEqual(run(args + ['--get-private-folder']), 0)
+            self.assertEqual(run(args + ['--get-conf-key',
+                                         'project_name']), 0)
+        self.assertEqual(f.getvalue().splitlines()[1], 'test-project')
+        self.assertFalse(os.path.exists(marker))
+
+        with redirect_stdout(f):
+            self.assertEqual(run(args + ['--list-extensions']), 0)
+        self.assertTrue(os.path.exists(marker))
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Synchronization of the assets with the output folder.
+"""
+
+import hashlib
+import os
+import shutil
+import stat
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from hotdoc.utils.setup_utils import symlink
+from hotdoc.utils.loggable import debug
+
+
+# From linux/fs.h
+FICLONE = 0x40049409
+
+COPY_MODES = ('copy', 'hardlink', 'reflink')
+CHECK_MODES = ('mtime', 'hash')
+
+
+def _hash_file(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as _:
+        for chunk in iter(lambda: _.read(65536), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class AssetSync:
+    """
+    Copies assets to the output, like `utils.recursive_overwrite`, but
+    skips the files that did not change since they were last copied.
+
+    Args:
+        copy_mode: str, one of `COPY_MODES`. Hardlinks and reflinks fall
+            back to copies where the file system does not support them.
+            Hardlinked files must not be modified in place, as they are
+            shared with their source.
+        check: str, one of `CHECK_MODES`, whether the files are compared
+            by size and modification time, or by contents.
+        output_manifest: `output.OutputManifest`, records the copied
+            files. Files with a different modification time but the same
+            size are then compared with the hash it recorded, and left
+            untouched if their contents did not change.
+    """
+
+    def __init__(self, copy_mode='copy', check='mtime',
+                 output_manifest=None):
+        assert copy_mode in COPY_MODES
+        assert check in CHECK_MODES
+        self.copy_mode = copy_mode
+        self.check = check
+        self.output_manifest = output_manifest
+        self.copied_files = 0
+        self.copied_bytes = 0
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+
+    def reset_stats(self):
+        """
+        Resets the counts of copied and skipped files.
+        """
+        self.copied_files = 0
+        self.copied_bytes = 0
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+
+    def __is_up_to_date(self, src, src_stat, dest):
+        try:
+            dest_stat = os.lstat(dest)
+        except OSError:
+            return False
+
+        if os.path.samestat(src_stat, dest_stat):
+            return True
+
+        if not stat.S_ISREG(dest_stat.st_mode):
+            return False
+
+        if dest_stat.st_size != src_stat.st_size:
+            return False
+
+        if self.check == 'mtime' and \
+                dest_stat.st_mtime_ns == src_stat.st_mtime_ns:
+            return True
+
+        if self.output_manifest is not None:
+            return _hash_file(src) == self.output_manifest.get_hash(dest)
+
+        if self.check == 'hash':
+            return _hash_file(src) == _hash_file(dest)
+
+        return False
+
+    @staticmethod
+    def __reflink(src, dest):
+        if fcntl is None:
+            return False
+
+        with open(src, 'rb') as src_file, open(dest, 'wb') as dest_file:
+            try:
+                fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+            except OSError:
+                return False
+
+        return True
+
+    def __write(self, src, src_stat, dest):
+        if os.path.lexists(dest):
+            # Never write through a hardlink to the previous source
+            os.remove(dest)
+
+        if self.copy_mode == 'hardlink':
+            try:
+                os.link(src, dest)
+                return
+            except OSError as exc:
+                debug('Could not hardlink %s: %s' % (src, exc), 'assets')
+        elif self.copy_mode == 'reflink':
+            if self.__reflink(src, dest):
+                os.utime(dest, ns=(src_stat.st_atime_ns,
+                                   src_stat.st_mtime_ns))
+                return
+            debug('Could not reflink %s' % src, 'assets')
+
+        shutil.copyfile(src, dest)
+        os.utime(dest, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+    def sync_file(self, src, dest):
+        """
+        Copies @src to @dest, unless @dest is up to date.
+        """
+        src_stat = os.stat(src)
+        if self.__is_up_to_date(src, src_stat, dest):
+            self.skipped_files += 1
+            self.skipped_bytes += src_stat.st_size
+        else:
+            self.__write(src, src_stat, dest)
+            self.copied_files += 1
+            self.copied_bytes += src_stat.st_size
+
+        if self.output_manifest is not None:
+            self.output_manifest.record(dest)
+
+    def sync(self, src, dest, ignore=None):
+        """
+        Copies the file or folder at @src to @dest, only overwriting
+        the files that changed.
+
+        Args:
+            src: str, the path to copy.
+            dest: str, the path to copy to.
+            ignore: callable, see `shutil.copytree`.
+        """
+        if os.path.islink(src):
+            linkto = os.readlink(src)
+            if os.path.islink(dest) and os.readlink(dest) == linkto:
+                return
+            if os.path.lexists(dest):
+                os.remove(dest)
+            symlink(linkto, dest)
+        elif os.path.isdir(src):
+            if not os.path.isdir(dest):
+                os.makedirs(dest)
+            files = os.listdir(src)
+            if ignore is not None:
+                ignored = ignore(src, files)
+            else:
+                ignored = set()
+            for _ in files:
+                if _ not in ignored:
+                    self.sync(os.path.join(src, _), os.path.join(dest, _),
+                              ignore)
+        else:
+            self.sync_file(src, dest)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Bundling of the scripts and stylesheets of the pages.
+"""
+
+import hashlib
+import os
+import threading
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+from hotdoc.utils.loggable import debug
+
+
+# Scripts may not end with a semicolon, or with a line comment
+SEPARATORS = {'.js': b'\n;\n', '.css': b'\n'}
+
+
+def _minify(contents, extension):
+    if extension == '.js' and rjsmin is not None:
+        return rjsmin.jsmin(contents.decode('utf-8')).encode('utf-8')
+    if extension == '.css' and rcssmin is not None:
+        return rcssmin.cssmin(contents.decode('utf-8')).encode('utf-8')
+    return contents
+
+
+class AssetBundler:
+    """
+    Concatenates lists of scripts or stylesheets into bundles named
+    after the hash of their contents, so that they can be cached
+    forever by the browsers, and that a single file is requested for
+    all of them.
+
+    Pages with the same assets share the same bundle. Bundles are
+    minified when the rjsmin and rcssmin modules are available.
+
+    Stylesheets are expected to be copied next to their bundle, as
+    relative urls in them are not rewritten, and to have no @import or
+    @charset rules, which are only valid at the start of a stylesheet.
+
+    Args:
+        folder: str, the folder the bundles are written to.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        # {(extension, path, ...): bundle path}
+        self.__bundles = {}
+        # Pages may be formatted from several threads
+        self.__lock = threading.Lock()
+
+    def get_bundle(self, paths, extension):
+        """
+        Returns the path of the bundle of the files at @paths, in that
+        order, creating it if needed. Files that do not exist are left
+        out, like `formatter.Formatter.copy_assets` does.
+
+        Args:
+            paths: list, the paths of the files.
+            extension: str, .js or .css, the extension of the bundle.
+        """
+        key = (extension,) + tuple(paths)
+        with self.__lock:
+            bundle = self.__bundles.get(key)
+            if bundle is None:
+                bundle = self.__create_bundle(paths, extension)
+                self.__bundles[key] = bundle
+        return bundle
+
+    def __create_bundle(self, paths, extension):
+        chunks = []
+        for path in paths:
+            try:
+                with open(path, 'rb') as _:
+                    chunks.append(_minify(_.read(), extension))
+            except FileNotFoundError:
+                continue
+
+        contents = SEPARATORS[extension].join(chunks)
+        name = 'bundle-%s%s' % (hashlib.sha1(contents).hexdigest()[:16],
+                                extension)
+        bundle = os.path.join(self.folder, name)
+        if not os.path.exists(bundle):
+            os.makedirs(self.folder, exist_ok=True)
+            with open(bundle, 'wb') as _:
+                _.write(contents)
+
+        debug('Bundled %d files in %s' % (len(chunks), name), 'bundles')
+        return bundle
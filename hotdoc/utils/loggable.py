@@ -217,15 +217,28 @@ class Logger(Configurable):
     @staticmethod
     def _log(code, message, level, domain):
         """Call this to add an entry in the journal"""
-        entry = LogEntry(level, domain, code, message)
+        Logger.__add_entry(LogEntry(level, domain, code, message))
+
+    @staticmethod
+    def __add_entry(entry):
         Logger.journal.append(entry)
 
         if Logger.silent:
             return
 
-        if level >= Logger._verbosity:
+        if entry.level >= Logger._verbosity:
             _print_entry(entry)
 
+    @staticmethod
+    def merge_journal(entries, n_fatal_warnings=0):
+        """
+        Call this to add entries logged by another process to the journal,
+        they are printed as if they had been logged by this one.
+        """
+        for entry in entries:
+            Logger.__add_entry(LogEntry(*entry))
+        Logger.n_fatal_warnings += n_fatal_warnings
+
     @staticmethod
     def error(code, message, **kwargs):
         """Call this to raise an exception and have it stored in the journal"""
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Writing of the output files, leaving untouched the ones that did not change.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from hotdoc.utils.loggable import debug
+
+
+# Written at the root of the output folder
+OUTPUT_MANIFEST = 'hotdoc-output.json'
+OUTPUT_MANIFEST_VERSION = 1
+
+# The output files `OutputManifest.precompress` compresses by default
+PRECOMPRESSED_SUFFIXES = ('.html', '.js', '.css', '.fragment')
+
+
+def _hash_file(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as _:
+        for chunk in iter(lambda: _.read(65536), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+# Where /proc is not available, see _get_umask
+_UMASK = None
+_UMASK_LOCK = threading.Lock()
+
+
+def _get_umask():
+    try:
+        with open('/proc/self/status', 'r', encoding='utf-8') as _:
+            for line in _:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+
+    # os.umask can only read the umask by setting it, for the whole
+    # process, so this is only done once, with a restrictive one
+    global _UMASK  # pylint: disable=global-statement
+    with _UMASK_LOCK:
+        if _UMASK is None:
+            _UMASK = os.umask(0o077)
+            os.umask(_UMASK)
+    return _UMASK
+
+
+def _replace_file(path, contents):
+    dirname = os.path.dirname(path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname)
+    with os.fdopen(fd, 'wb') as _:
+        _.write(contents)
+    # mkstemp creates files only readable by their owner
+    os.chmod(tmp_path, 0o666 & ~_get_umask())
+    # Never writes through hardlinks
+    os.replace(tmp_path, path)
+
+
+class OutputManifest:
+    """
+    Keeps track of the hashes of the files in the output folder.
+
+    Files written with `write` are only replaced when their contents
+    change, so that their modification time can be relied upon by
+    deployment tools. The manifest is saved at the root of the output
+    folder, and lists the hash of each file, and the files that changed
+    or were removed since it was last saved:
+
+        {
+            "version": 1,
+            "files": {"html/index.html": {"sha1": ..., "size": ...,
+                                          "mtime_ns": ...},
+                      "html/index.html.gz": {..., "source_sha1": ...},
+                      ...},
+            "changed": ["html/index.html", ...],
+            "removed": [...]
+        }
+
+    Paths are relative to the output folder. Files can be written
+    concurrently from several threads.
+
+    Args:
+        output: str, the output folder. When None, files are still only
+            written when their contents change, but nothing is recorded.
+    """
+
+    def __init__(self, output=None):
+        self.output = output
+        self.__files = {}
+        self.__previous_hashes = {}
+        self.__changed = set()
+        self.__loaded = False
+        # Files may be written from several threads
+        self.__lock = threading.RLock()
+
+    @property
+    def path(self):
+        """
+        The path of the manifest.
+        """
+        return os.path.join(self.output, OUTPUT_MANIFEST)
+
+    def __load(self):
+        with self.__lock:
+            if self.__loaded or not self.output:
+                return
+
+            self.__loaded = True
+            try:
+                with open(self.path, 'r', encoding='utf-8') as _:
+                    contents = json.load(_)
+            except (OSError, ValueError):
+                return
+
+            if contents.get('version') != OUTPUT_MANIFEST_VERSION:
+                return
+
+            self.__files = contents['files']
+            self.__previous_hashes = {
+                rel_path: entry['sha1']
+                for rel_path, entry in self.__files.items()}
+
+    def __relpath(self, path):
+        return os.path.relpath(path, self.output).replace(os.sep, '/')
+
+    def __record(self, rel_path, path, sha1):
+        stat = os.stat(path)
+        with self.__lock:
+            self.__files[rel_path] = {'sha1': sha1, 'size': stat.st_size,
+                                      'mtime_ns': stat.st_mtime_ns}
+            if self.__previous_hashes.get(rel_path) != sha1:
+                self.__changed.add(rel_path)
+
+    def get_hash(self, path):
+        """
+        Returns the sha1 hex digest of the output file at @path, only
+        reading it if it was modified since it was last recorded, or
+        None if it does not exist.
+        """
+        self.__load()
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        entry = self.output and self.__files.get(self.__relpath(path))
+        if entry and entry['size'] == stat.st_size and \
+                entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha1']
+
+        return _hash_file(path)
+
+    def record(self, path):
+        """
+        Records the hash of the output file at @path, written without
+        `write`.
+        """
+        if self.output:
+            self.__record(self.__relpath(path), path, self.get_hash(path))
+
+    def write(self, path, contents):
+        """
+        Writes @contents to the output file at @path, unless it already
+        has these contents.
+
+        Args:
+            path: str, the path of the file.
+            contents: str or bytes, the contents, str is encoded to UTF-8.
+
+        Returns:
+            bool: Whether the file was written.
+        """
+        if isinstance(contents, str):
+            contents = contents.encode('utf-8')
+
+        sha1 = hashlib.sha1(contents).hexdigest()
+        written = self.get_hash(path) != sha1
+        if written:
+            _replace_file(path, contents)
+
+        if self.output:
+            self.__record(self.__relpath(path), path, sha1)
+
+        return written
+
+    def __compress(self, rel_path):
+        path = os.path.join(self.output, rel_path)
+        try:
+            with open(path, 'rb') as _:
+                contents = _.read()
+        except OSError:
+            # Removed since it was recorded
+            return
+
+        source_sha1 = hashlib.sha1(contents).hexdigest()
+        variants = {'.gz': lambda: gzip.compress(contents, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = lambda: brotli.compress(contents)
+
+        for extension, compress in variants.items():
+            # No timestamp, so that unchanged files are left untouched
+            self.write(path + extension, compress())
+            with self.__lock:
+                self.__files[rel_path + extension]['source_sha1'] = \
+                    source_sha1
+
+    def precompress(self, suffixes=PRECOMPRESSED_SUFFIXES, jobs=1):
+        """
+        Writes the gzip, and brotli when available, compressed variants
+        of the recorded output files ending with one of @suffixes next
+        to them, with a .gz or .br suffix, for servers that can send them
+        as is.
+
+        Only the files whose variants were not compressed from their
+        current contents, as recorded in the manifest, are compressed, by
+        a pool of @jobs threads. The variants of removed files are
+        removed.
+
+        Returns:
+            int: The number of files that were compressed.
+        """
+        if not self.output:
+            return 0
+
+        self.__load()
+        extensions = ['.gz'] + (['.br'] if brotli is not None else [])
+        with self.__lock:
+            rel_paths = [
+                rel_path for rel_path, entry in self.__files.items()
+                if rel_path.endswith(suffixes) and any(
+                    self.__files.get(rel_path + extension, {}).get(
+                        'source_sha1') != entry['sha1']
+                    for extension in extensions)]
+            variants = [rel_path for rel_path in self.__files
+                        if rel_path.endswith(('.gz', '.br')) and
+                        rel_path[:-3].endswith(suffixes)]
+
+        for rel_path in variants:
+            path = os.path.join(self.output, rel_path)
+            if not os.path.exists(path[:-3]):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        if jobs == 1:
+            for rel_path in rel_paths:
+                self.__compress(rel_path)
+        else:
+            with ThreadPoolExecutor(jobs) as executor:
+                list(executor.map(self.__compress, rel_paths))
+
+        debug('Compressed %d output files' % len(rel_paths), 'output')
+        return len(rel_paths)
+
+    def save(self):
+        """
+        Saves the manifest, listing the files that changed since it was
+        last saved.
+        """
+        if not self.output:
+            return
+
+        self.__load()
+        removed = sorted(rel_path for rel_path in self.__files
+                         if not os.path.exists(
+                             os.path.join(self.output, rel_path)))
+        for rel_path in removed:
+            del self.__files[rel_path]
+
+        debug('%d output files changed, %d removed' % (len(self.__changed),
+                                                       len(removed)),
+              'output')
+        _replace_file(self.path, json.dumps(
+            {'version': OUTPUT_MANIFEST_VERSION,
+             'files': self.__files,
+             'changed': sorted(self.__changed),
+             'removed': removed},
+            indent=1, sort_keys=True).encode('utf-8'))
+
+        self.__previous_hashes = {
+            rel_path: entry['sha1']
+            for rel_path, entry in self.__files.items()}
+        self.__changed = set()
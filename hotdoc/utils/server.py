@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+HTTP server for `hotdoc serve`.
+"""
+
+import functools
+import http.server
+import posixpath
+import urllib.parse
+
+from hotdoc.core.exceptions import HotdocException
+from hotdoc.utils.loggable import debug
+
+
+class PreviewRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves the files of the html output, letting the server write out
+    the requested pages first.
+    """
+
+    def send_head(self):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        rel_path = posixpath.normpath(path).lstrip('/')
+        if not rel_path or path.endswith('/'):
+            rel_path = posixpath.join(rel_path, 'index.html')
+
+        try:
+            redirect = self.server.write_out_path_cb(rel_path)
+        except HotdocException as exc:
+            self.send_error(500, 'Could not write out %s: %s' %
+                            (rel_path, exc))
+            return None
+
+        if redirect:
+            self.send_response(302)
+            self.send_header('Location', '/' + redirect)
+            self.end_headers()
+            return None
+
+        return super().send_head()
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args):
+        debug(format % args, 'server')
+
+
+class PreviewServer(http.server.HTTPServer):
+    """
+    Requests are handled one at a time, as pages can not be formatted
+    concurrently.
+
+    Args:
+        address: tuple, the (host, port) to listen on.
+        directory: str, the html output folder.
+        write_out_path_cb: callable, called with the path of each
+            requested file relative to @directory before serving it.
+            It may return another path to redirect to.
+    """
+
+    def __init__(self, address, directory, write_out_path_cb):
+        self.write_out_path_cb = write_out_path_cb
+        super().__init__(
+            address,
+            functools.partial(PreviewRequestHandler, directory=directory))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Helpers for the SQLite databases hotdoc caches data in.
+"""
+
+import os
+import sqlite3
+
+from hotdoc.utils.loggable import debug
+
+
+class LazyConnection:
+    """
+    Opens an SQLite database when first used, and again in forked
+    processes, as connections cannot be shared with them.
+
+    When the database cannot be used, an in-memory one is used instead,
+    so databases opened this way should only hold caches.
+
+    Args:
+        init_func: callable, called with each new connection to create
+            or check the schema, may raise `sqlite3.Error`.
+        description: str, what the database holds, for debug messages.
+        timeout: float, see `sqlite3.connect`.
+        domain: str, the domain of the debug messages.
+    """
+
+    def __init__(self, init_func, description, timeout=5.0, domain='core'):
+        self.__init_func = init_func
+        self.__description = description
+        self.__timeout = timeout
+        self.__domain = domain
+        self.__db = None
+        self.__pid = None
+
+    def get(self, path):
+        """
+        Returns the connection of the current process, opening the
+        database at @path if needed.
+        """
+        if self.__db is not None and self.__pid == os.getpid():
+            return self.__db
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            db = sqlite3.connect(path, timeout=self.__timeout)
+            self.__init_func(db)
+        except (OSError, sqlite3.Error) as exc:
+            debug('Could not use the %s at %s (%s), keeping it in memory' %
+                  (self.__description, path, exc), self.__domain)
+            db = sqlite3.connect(':memory:')
+            self.__init_func(db)
+
+        self.__db = db
+        self.__pid = os.getpid()
+        return db
+
+    def close(self):
+        """
+        Closes the connection, the database is opened again when next
+        used.
+        """
+        if self.__db is not None:
+            self.__db.close()
+        self.__db = None
+        self.__pid = None
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Template engine caching the code of the compiled templates on disk.
+"""
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from types import ModuleType
+
+import wheezy.template
+from wheezy.template.comp import adjust_source_lineno
+from wheezy.template.engine import Engine, complement_syntax_error
+
+from hotdoc.utils.loggable import debug
+
+
+class CachingEngine(Engine):
+    """
+    A wheezy.template `Engine` storing the code objects it compiles in
+    @cache_dir, so that other processes, and later runs, only need to
+    compile the templates that changed.
+
+    Each template has one cache file, named after its path, the kind of
+    code it compiles to, the Python implementation and the version of
+    wheezy.template, and storing the hash of the source it was compiled
+    from.
+    """
+
+    def __init__(self, loader, extensions, cache_dir):
+        super().__init__(loader, extensions)
+        self.cache_dir = cache_dir
+
+    def __get_cache_path(self, path, kind):
+        key = '\0'.join((path, kind, sys.implementation.cache_tag,
+                         wheezy.template.__version__,
+                         str(self.compiler.source_lineno)))
+        return os.path.join(
+            self.cache_dir,
+            hashlib.sha256(key.encode('utf-8')).hexdigest() + '.marshal')
+
+    @staticmethod
+    def __load(cache_path, digest):
+        try:
+            with open(cache_path, 'rb') as _:
+                cached_digest, code = marshal.load(_)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if cached_digest != digest:
+            return None
+
+        return code
+
+    def __store(self, cache_path, digest, code):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as _:
+                marshal.dump((digest, code), _)
+            # Concurrent builds may store the same template
+            os.replace(tmp_path, cache_path)
+        except OSError as exc:
+            debug('Could not cache compiled template: %s' % exc,
+                  'templates')
+
+    def __compile(self, name, kind, build):
+        path = self.loader.get_fullname(name)
+        template_source = self.loader.load(name)
+        if template_source is None:
+            raise IOError('Template "%s" not found.' % name)
+
+        digest = hashlib.sha256(template_source.encode('utf-8')).hexdigest()
+        cache_path = self.__get_cache_path(path, kind)
+        code = self.__load(cache_path, digest)
+        if code is not None:
+            return code
+
+        tokens = self.lexer.tokenize(template_source)
+        nodes = self.parser.parse(tokens)
+        source = build(nodes)
+        node = adjust_source_lineno(source, name, self.compiler.source_lineno)
+        try:
+            code = compile(node, name, 'exec')
+        except SyntaxError as exc:
+            raise complement_syntax_error(exc, template_source, source)
+
+        self.__store(cache_path, digest, code)
+        return code
+
+    def compile_template(self, name):
+        with self.lock:
+            if name in self.renders:
+                return
+
+            code = self.__compile(name, 'render', self.builder.build_render)
+            local_vars = {}
+            exec(code, self.global_vars, local_vars)  # pylint: disable=exec-used
+            render_template = local_vars['render']
+            self.renders[name] = render_template
+            self.templates[name] = self.template_class(name, render_template)
+
+    def compile_import(self, name):
+        with self.lock:
+            if name in self.modules:
+                return
+
+            code = self.__compile(name, 'module', self.builder.build_module)
+            module = ModuleType(name)
+            module.__dict__.update(self.global_vars)
+            exec(code, module.__dict__)  # pylint: disable=exec-used
+            self.modules[name] = module
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import os
+import shutil
+import unittest
+
+from hotdoc.utils.assets import AssetSync
+from hotdoc.utils.output import OutputManifest
+
+
+class TestAssetSync(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__test_dir = os.path.abspath(os.path.join(here, 'tmp-assets'))
+        self.__src_dir = os.path.join(self.__test_dir, 'src')
+        self.__dest_dir = os.path.join(self.__test_dir, 'dest')
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        os.makedirs(os.path.join(self.__src_dir, 'js'))
+
+    def tearDown(self):
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+
+    def __create_file(self, name, contents):
+        path = os.path.join(self.__src_dir, name)
+        with open(path, 'w') as _:
+            _.write(contents)
+        return path
+
+    def __read_dest(self, name):
+        with open(os.path.join(self.__dest_dir, name)) as _:
+            return _.read()
+
+    def __assert_stats(self, asset_sync, copied, skipped):
+        self.assertEqual((asset_sync.copied_files, asset_sync.skipped_files),
+                         (copied, skipped))
+        asset_sync.reset_stats()
+
+    def test_sync(self):
+        self.__create_file('style.css', 'body {}')
+        self.__create_file(os.path.join('js', 'script.js'), 'foo();')
+        asset_sync = AssetSync()
+
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.__assert_stats(asset_sync, 2, 0)
+        self.assertEqual(self.__read_dest(os.path.join('js', 'script.js')),
+                         'foo();')
+
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.__assert_stats(asset_sync, 0, 2)
+
+        self.__create_file('style.css', 'body {color: red;}')
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.__assert_stats(asset_sync, 1, 1)
+        self.assertEqual(self.__read_dest('style.css'), 'body {color: red;}')
+
+    def test_ignore(self):
+        self.__create_file('style.css', 'body {}')
+        self.__create_file(os.path.join('js', 'script.js'), 'foo();')
+        AssetSync().sync(self.__src_dir, self.__dest_dir,
+                         lambda src, files: {'js'})
+        self.assertEqual(os.listdir(self.__dest_dir), ['style.css'])
+
+    def test_hash_check(self):
+        path = self.__create_file('style.css', 'body {}')
+        asset_sync = AssetSync(check='hash')
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.__assert_stats(asset_sync, 1, 0)
+
+        os.utime(path, ns=(0, 0))
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.__assert_stats(asset_sync, 0, 1)
+
+    def test_output_manifest(self):
+        path = self.__create_file('style.css', 'body {}')
+        asset_sync = AssetSync(output_manifest=OutputManifest(self.__dest_dir))
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.__assert_stats(asset_sync, 1, 0)
+        dest = os.path.join(self.__dest_dir, 'style.css')
+        mtime = os.stat(dest).st_mtime_ns
+
+        # Identical files are left untouched
+        os.utime(path, ns=(0, 0))
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.__assert_stats(asset_sync, 0, 1)
+        self.assertEqual(os.stat(dest).st_mtime_ns, mtime)
+
+    def test_hardlink(self):
+        path = self.__create_file('style.css', 'body {}')
+        asset_sync = AssetSync(copy_mode='hardlink')
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        dest = os.path.join(self.__dest_dir, 'style.css')
+        self.assertTrue(os.path.samefile(path, dest))
+
+        # Editors usually replace the files they save
+        os.remove(path)
+        self.__create_file('style.css', 'body {color: red;}')
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.assertTrue(os.path.samefile(path, dest))
+
+        # Switching back to copies does not modify the source
+        AssetSync().sync_file(
+            self.__create_file('other.css', 'p {}'), dest)
+        self.assertEqual(self.__read_dest('style.css'), 'p {}')
+        with open(path) as _:
+            self.assertEqual(_.read(), 'body {color: red;}')
+
+    def test_reflink(self):
+        # Falls back to copies on file systems not supporting reflinks
+        path = self.__create_file('style.css', 'body {}')
+        asset_sync = AssetSync(copy_mode='reflink')
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.assertFalse(os.path.samefile(
+            path, os.path.join(self.__dest_dir, 'style.css')))
+        self.assertEqual(self.__read_dest('style.css'), 'body {}')
+
+        asset_sync.reset_stats()
+        asset_sync.sync(self.__src_dir, self.__dest_dir)
+        self.__assert_stats(asset_sync, 0, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from hotdoc.utils import bundles
+from hotdoc.utils.bundles import AssetBundler
+
+
+class TestAssetBundler(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__test_dir = os.path.abspath(os.path.join(here, 'tmp-bundles'))
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        os.mkdir(self.__test_dir)
+        self.__bundles_dir = os.path.join(self.__test_dir, 'bundles')
+
+    def tearDown(self):
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+
+    def __create_file(self, name, contents):
+        path = os.path.join(self.__test_dir, name)
+        with open(path, 'w') as _:
+            _.write(contents)
+        return path
+
+    @mock.patch.object(bundles, 'rjsmin', None)
+    def test_get_bundle(self):
+        first = self.__create_file('first.js', 'var a = 1 // one')
+        second = self.__create_file('second.js', 'var b = 2')
+        missing = os.path.join(self.__test_dir, 'missing.js')
+        bundler = AssetBundler(self.__bundles_dir)
+
+        bundle = bundler.get_bundle([first, missing, second], '.js')
+        self.assertEqual(os.path.dirname(bundle), self.__bundles_dir)
+        self.assertRegex(os.path.basename(bundle),
+                         r'^bundle-[0-9a-f]{16}\.js$')
+        with open(bundle) as _:
+            self.assertEqual(_.read(), 'var a = 1 // one\n;\nvar b = 2')
+
+        # Pages with the same assets share their bundle
+        self.assertEqual(bundler.get_bundle([first, missing, second], '.js'),
+                         bundle)
+        self.assertNotEqual(bundler.get_bundle([second, first], '.js'),
+                            bundle)
+
+        # Named after their contents
+        other_bundler = AssetBundler(self.__bundles_dir)
+        self.assertEqual(other_bundler.get_bundle([first, second], '.js'),
+                         bundle)
+        self.__create_file('second.js', 'var b = 3')
+        self.assertNotEqual(
+            AssetBundler(self.__bundles_dir).get_bundle([first, second],
+                                                        '.js'),
+            bundle)
+
+    @mock.patch.object(bundles, 'rcssmin', None)
+    def test_get_bundle_css(self):
+        first = self.__create_file('first.css', 'body {}')
+        second = self.__create_file('second.css', 'p {}')
+        bundle = AssetBundler(self.__bundles_dir).get_bundle(
+            [first, second], '.css')
+        self.assertTrue(bundle.endswith('.css'))
+        with open(bundle) as _:
+            self.assertEqual(_.read(), 'body {}\np {}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import gzip
+import json
+import os
+import shutil
+import stat
+import unittest
+
+from hotdoc.utils.output import OutputManifest, OUTPUT_MANIFEST
+
+
+class TestOutputManifest(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__test_dir = os.path.abspath(os.path.join(here, 'tmp-output'))
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        os.mkdir(self.__test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+
+    def __load_manifest(self):
+        with open(os.path.join(self.__test_dir, OUTPUT_MANIFEST)) as _:
+            return json.load(_)
+
+    def test_write(self):
+        path = os.path.join(self.__test_dir, 'html', 'index.html')
+        other_path = os.path.join(self.__test_dir, 'html', 'other.html')
+        manifest = OutputManifest(self.__test_dir)
+        self.assertTrue(manifest.write(path, 'index'))
+        self.assertTrue(manifest.write(other_path, b'other'))
+        manifest.save()
+        contents = self.__load_manifest()
+        self.assertEqual(contents['changed'],
+                         ['html/index.html', 'html/other.html'])
+        self.assertEqual(sorted(contents['files']),
+                         ['html/index.html', 'html/other.html'])
+        mtime = os.stat(path).st_mtime_ns
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode),
+                         0o666 & ~umask)
+
+        manifest = OutputManifest(self.__test_dir)
+        self.assertFalse(manifest.write(path, 'index'))
+        self.assertTrue(manifest.write(other_path, 'modified'))
+        manifest.save()
+        self.assertEqual(self.__load_manifest()['changed'],
+                         ['html/other.html'])
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+    def test_umask(self):
+        path = os.path.join(self.__test_dir, 'index.html')
+        umask = os.umask(0o027)
+        try:
+            OutputManifest(self.__test_dir).write(path, 'index')
+        finally:
+            os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o640)
+
+    def test_removed(self):
+        path = os.path.join(self.__test_dir, 'index.html')
+        manifest = OutputManifest(self.__test_dir)
+        manifest.write(path, 'index')
+        manifest.save()
+
+        os.remove(path)
+        manifest = OutputManifest(self.__test_dir)
+        manifest.save()
+        contents = self.__load_manifest()
+        self.assertEqual(contents['removed'], ['index.html'])
+        self.assertEqual(contents['files'], {})
+
+    def test_record(self):
+        path = os.path.join(self.__test_dir, 'style.css')
+        with open(path, 'w') as _:
+            _.write('body {}')
+        manifest = OutputManifest(self.__test_dir)
+        manifest.record(path)
+        manifest.save()
+        contents = self.__load_manifest()
+        self.assertEqual(contents['changed'], ['style.css'])
+        self.assertEqual(contents['files']['style.css']['size'], 7)
+
+    def test_precompress(self):
+        path = os.path.join(self.__test_dir, 'html', 'index.html')
+        other_path = os.path.join(self.__test_dir, 'html', 'other.html')
+        data_path = os.path.join(self.__test_dir, 'html', 'data.json')
+        manifest = OutputManifest(self.__test_dir)
+        manifest.write(path, 'index')
+        manifest.write(other_path, 'other')
+        manifest.write(data_path, '{}')
+        self.assertEqual(manifest.precompress(jobs=2), 2)
+        manifest.save()
+        with gzip.open(path + '.gz') as _:
+            self.assertEqual(_.read(), b'index')
+        self.assertFalse(os.path.exists(data_path + '.gz'))
+        self.assertIn('html/index.html.gz', self.__load_manifest()['files'])
+        mtime = os.stat(path + '.gz').st_mtime_ns
+
+        # Only the files that changed are compressed again
+        manifest = OutputManifest(self.__test_dir)
+        manifest.write(path, 'index')
+        manifest.write(other_path, 'modified')
+        self.assertEqual(manifest.precompress(), 1)
+        manifest.save()
+        self.assertEqual(os.stat(path + '.gz').st_mtime_ns, mtime)
+        with gzip.open(other_path + '.gz') as _:
+            self.assertEqual(_.read(), b'modified')
+
+        # Including by builds that did not compress them
+        manifest = OutputManifest(self.__test_dir)
+        manifest.write(other_path, 'modified again')
+        manifest.save()
+        manifest = OutputManifest(self.__test_dir)
+        manifest.write(other_path, 'modified again')
+        self.assertEqual(manifest.precompress(), 1)
+        manifest.save()
+        with gzip.open(other_path + '.gz') as _:
+            self.assertEqual(_.read(), b'modified again')
+
+        os.remove(other_path)
+        manifest = OutputManifest(self.__test_dir)
+        self.assertEqual(manifest.precompress(), 0)
+        self.assertFalse(os.path.exists(other_path + '.gz'))
+
+    def test_no_output(self):
+        path = os.path.join(self.__test_dir, 'index.html')
+        manifest = OutputManifest()
+        self.assertTrue(manifest.write(path, 'index'))
+        self.assertFalse(manifest.write(path, 'index'))
+        manifest.save()
+        self.assertFalse(os.path.exists(
+            os.path.join(self.__test_dir, OUTPUT_MANIFEST)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from hotdoc.utils.sqlite_utils import LazyConnection
+
+
+def _create_schema(db):
+    db.execute('CREATE TABLE IF NOT EXISTS items (name TEXT)')
+
+
+class TestLazyConnection(unittest.TestCase):
+    def setUp(self):
+        self.__test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__test_dir)
+
+    def test_get(self):
+        path = os.path.join(self.__test_dir, 'cache', 'items.db')
+        connection = LazyConnection(_create_schema, 'items')
+        db = connection.get(path)
+        self.assertTrue(os.path.exists(path))
+        self.assertIs(connection.get(path), db)
+
+        connection.close()
+        self.assertIsNot(connection.get(path), db)
+
+    def test_in_memory(self):
+        blocker = os.path.join(self.__test_dir, 'file')
+        with open(blocker, 'w') as _:
+            _.write('')
+
+        connection = LazyConnection(_create_schema, 'items')
+        db = connection.get(os.path.join(blocker, 'items.db'))
+        db.execute("INSERT INTO items VALUES ('foo')")
+        self.assertEqual(db.execute('SELECT name FROM items').fetchall(),
+                         [('foo',)])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires fork')
+    def test_fork(self):
+        path = os.path.join(self.__test_dir, 'items.db')
+        connection = LazyConnection(_create_schema, 'items')
+        db = connection.get(path)
+
+        pid = os.fork()
+        if pid == 0:
+            # pylint: disable=protected-access
+            os._exit(0 if connection.get(path) is not db else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        self.assertIs(connection.get(path), db)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import os
+import shutil
+import unittest
+
+from wheezy.template.ext.core import CoreExtension
+from wheezy.template.loader import FileLoader
+
+from hotdoc.utils.templates import CachingEngine
+
+
+class TestCachingEngine(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__test_dir = os.path.abspath(os.path.join(here, 'tmp-templates'))
+        self.__templates_dir = os.path.join(self.__test_dir, 'templates')
+        self.__cache_dir = os.path.join(self.__test_dir, 'cache')
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        os.makedirs(self.__templates_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+
+    def __create_template(self, name, contents):
+        with open(os.path.join(self.__templates_dir, name), 'w') as _:
+            _.write(contents)
+
+    def __create_engine(self):
+        engine = CachingEngine(
+            loader=FileLoader([self.__templates_dir], encoding='UTF-8'),
+            extensions=[CoreExtension()],
+            cache_dir=self.__cache_dir)
+        engine.compiler.source_lineno = 0
+        return engine
+
+    def __render(self, template_name, **kwargs):
+        return self.__create_engine().get_template(template_name).render(kwargs)
+
+    def test_cache(self):
+        self.__create_template('macros.html', '@def greet(name):\nHi @name!\n@end')
+        self.__create_template(
+            'page.html',
+            '@require(name)\n@import "macros.html" as macros\n'
+            '@macros.greet(name)')
+        self.assertEqual(self.__render('page.html', name='a').strip(),
+                         'Hi a!')
+        self.assertEqual(len(os.listdir(self.__cache_dir)), 2)
+
+        self.assertEqual(self.__render('page.html', name='b').strip(),
+                         'Hi b!')
+        self.assertEqual(len(os.listdir(self.__cache_dir)), 2)
+
+    def test_invalidation(self):
+        self.__create_template('page.html', '@require(name)\nHello @name')
+        self.assertEqual(self.__render('page.html', name='a').strip(),
+                         'Hello a')
+
+        self.__create_template('page.html', '@require(name)\nBye @name')
+        self.assertEqual(self.__render('page.html', name='a').strip(),
+                         'Bye a')
+
+        self.__create_template('page.html', '@require(name)\nHello @name')
+        self.assertEqual(self.__render('page.html', name='a').strip(),
+                         'Hello a')
+        self.assertEqual(len(os.listdir(self.__cache_dir)), 1)
+
+    def test_unwritable_cache(self):
+        with open(self.__cache_dir, 'w') as _:
+            _.write('not a folder')
+        self.__create_template('page.html', '@require(name)\nHello @name')
+        self.assertEqual(self.__render('page.html', name='a').strip(),
+                         'Hello a')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import os
+import shutil
+import unittest
+
+from hotdoc.utils.utils import touch
+from hotdoc.utils.watcher import Watcher
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__test_dir = os.path.abspath(os.path.join(here, 'tmp-watcher'))
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+        os.mkdir(self.__test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.__test_dir, ignore_errors=True)
+
+    def __create_file(self, name, contents):
+        path = os.path.join(self.__test_dir, name)
+        with open(path, 'w') as _:
+            _.write(contents)
+        return path
+
+    def test_poll(self):
+        a = self.__create_file('a.md', 'a')
+        b = self.__create_file('b.md', 'b')
+        c = os.path.join(self.__test_dir, 'c.md')
+        watcher = Watcher([a, b, c], interval=0.01)
+        self.assertEqual(watcher.poll(), set())
+
+        self.__create_file('a.md', 'aa')
+        self.__create_file('c.md', 'c')
+        self.assertEqual(watcher.poll(), {a, c})
+        self.assertEqual(watcher.poll(), set())
+
+        touch(b)
+        os.remove(c)
+        self.assertEqual(watcher.wait(), {b, c})
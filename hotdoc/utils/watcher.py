@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2026 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Detection of modified files, for `hotdoc run --watch`.
+"""
+
+import os
+import time
+
+
+class Watcher:
+    """
+    Detects modifications of a set of files by periodically comparing
+    their modification times and sizes, which is portable and cheap
+    enough for the number of files a documentation project depends on.
+    """
+
+    def __init__(self, paths, interval=0.5):
+        self.interval = interval
+        self.__stamps = {path: self.__stat(path) for path in paths}
+
+    @staticmethod
+    def __stat(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def paths(self):
+        """
+        The watched paths.
+        """
+        return list(self.__stamps.keys())
+
+    def poll(self):
+        """
+        Returns the set of the paths that were modified, created or
+        removed since the previous call.
+        """
+        changed = set()
+        for path, stamp in self.__stamps.items():
+            new_stamp = self.__stat(path)
+            if new_stamp != stamp:
+                self.__stamps[path] = new_stamp
+                changed.add(path)
+        return changed
+
+    def wait(self):
+        """
+        Blocks until some paths are modified, and returns them once no
+        further modifications happened for `interval`, as editors
+        usually write files in several steps.
+        """
+        changed = set()
+        while True:
+            time.sleep(self.interval)
+            new_changes = self.poll()
+            if not new_changes and changed:
+                return changed
+            changed |= new_changes
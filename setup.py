@@ -39,7 +39,7 @@ from setuptools.command.develop import develop
 from setuptools.command.sdist import sdist
 
 from hotdoc.utils.setup_utils import (
-    VERSION, require_clean_submodules, symlink, pkgconfig)
+    VERSION, require_clean_submodules, symlink)
 
 SOURCE_DIR = os.path.abspath(os.path.dirname(__file__))
 CMARK_DIR = os.path.join(SOURCE_DIR, 'cmark')
@@ -126,22 +126,6 @@ CMARK_MODULE = CMarkExtension('hotdoc.parsers.cmark',
                               define_macros=[
                                   ('LIBDIR', '"%s"' % CMARK_BUILD_DIR)])
 
-# We build our search index in C for performance reasons
-
-SEARCH_SOURCES = [os.path.join('hotdoc', 'parsers', 'search_module.c'),
-                  os.path.join('hotdoc', 'parsers', 'trie.c')]
-
-try:
-    search_flags = pkgconfig('libxml-2.0', 'glib-2.0', 'json-glib-1.0')
-except Exception as e:
-    print("libxml-2.0, glib-2.0 and json-glib-1.0 are required: %s" % str(e))
-    sys.exit(1)
-
-print(search_flags)
-
-SEARCH_MODULE = Extension('hotdoc.parsers.search',
-                          sources=SEARCH_SOURCES, **search_flags)
-
 # The default theme
 
 THEME_SRC_DIR = os.path.join(SOURCE_DIR, 'hotdoc', 'hotdoc_bootstrap_theme')
@@ -268,7 +252,8 @@ if sys.version_info[1] >= 5:
 EXTRAS_REQUIRE = {
     'dev': ['git-pylint-commit-hook',
             'git-pep8-commit-hook'],
-    'feedgen': ['feedgen']
+    'feedgen': ['feedgen'],
+    'minify': ['rjsmin', 'rcssmin']
 }
 
 # Extensions
@@ -277,7 +262,7 @@ SYN_EXT_DIR = os.path.join(SOURCE_DIR, 'hotdoc', 'extensions',
                            'syntax_highlighting')
 require_clean_submodules(SYN_EXT_DIR, ['prism'])
 
-ext_modules = [CMARK_MODULE, SEARCH_MODULE]
+ext_modules = [CMARK_MODULE]
 
 PACKAGE_DATA = {
     'hotdoc.core': ['templates/*', 'assets/*'],